@@ -0,0 +1,188 @@
+# alloc_budget.py
+# Allocation budget check for steady state ticks, per state. Every state is entered on a headless engine and held there
+# (DRAGGING with a swinging cursor, FALLING from high up...), then the blocks ticks leave allocated are counted:
+#   tick  blocks the worst single tick left allocated (sys.getallocatedblocks before and after it)
+#   kept  blocks left behind per 1000 ticks, from a tracemalloc snapshot diff over the second half of the measured ticks.
+#         a counter leaving the small int range or a free list growing keeps a block once, a leak keeps them in both
+#         halves. over budget prints the lines that allocated them
+# Blocks allocated and freed again inside a tick (a Vec2 from one arithmetic step) cant be counted, CPython keeps no
+# allocation counter. refcounting frees those before a collection could see them, the ones that stay are what the gc
+# ends up walking.
+# Ticks that change state, play a transition animation or come right after entering a state are not steady, they
+# are skipped. Exit code 1 when a state goes over its budget, so it can run before merging. tests/test_alloc_budget.py
+# runs the same check.
+#   python alloc_budget.py [--ticks N] [--seed N] [--suggest]
+
+import sys, math, random, argparse, tracemalloc
+
+from data.states import STATES
+from data.render_config import RENDER_CONFIG
+
+from engine.pet_engine import headless_engine
+from engine import trace
+
+DT = 1 / RENDER_CONFIG.get("logic_FPS", 60)
+TICKS = 3000  # measured ticks per state
+WARMUP = 3  # ticks after entering a state that dont count
+PREROLL = 1000  # ticks held before measuring, so caches (frame sizes...) are already filled
+
+# blocks the worst steady tick of a state may leave allocated (--suggest prints new ones), and kept blocks per 1000 ticks
+BUDGETS = {
+    "IDLE": 4,
+    "BLINK": 4,
+    "LOOKING_AROUND": 4,
+    "ROLL": 4,
+    "DRAGGING": 4,
+    "FALLING": 4,
+    "VERY_WORRIED": 4,
+    "TROLLING": 4,
+}
+DEFAULT_BUDGET = 4
+KEPT_BUDGET = 100  # measured 1 to 27 (ROLL, trace ring entries changing size). a leak is a block per tick or so, 1000 and up
+SNAPSHOT_FILTERS = [tracemalloc.Filter(False, tracemalloc.__file__)]  # the snapshot bookkeeping itself
+
+
+class Holder:  # puts the engine into one state and keeps it there
+    def __init__(self, engine, state, rng):
+        self.engine = engine
+        self.state = state
+        self.rng = rng
+        self.t = 0
+
+    def enter(self):
+        engine = self.engine
+        world = engine.world
+        engine.cancel_drag()
+        engine.mover.active = False
+
+        if self.state == "DRAGGING":  # hold the mouse on the pet until it turns into a drag
+            engine.force_state("IDLE")
+            x, y = engine.anchor.x, engine.anchor.y - engine.hitbox_height / 2
+            engine.press(x, y)
+            for _ in range(30):
+                engine.update(DT)
+                if engine.state_name == "DRAGGING":
+                    break
+            return
+
+        if self.state == "FALLING":  # from up high, so there is something to fall
+            engine.mover.set_position(self.rng.uniform(300, world.width - 300), world.bottom - 600)
+            engine.anchor.x, engine.anchor.y = engine.mover.pos.x, engine.mover.pos.y
+
+        engine.force_state(self.state)
+
+    def input(self):  # per tick input while held
+        if self.state == "DRAGGING":
+            world = self.engine.world
+            self.t += DT
+            self.engine.move(world.left + world.width / 2 + 250 * math.sin(self.t * 5), world.bottom - 300)
+
+
+def measure(state, ticks, seed):
+    random.seed(seed)
+    engine = headless_engine()
+    holder = Holder(engine, state, random.Random(seed))
+
+    for _ in range(trace.ring.size):  # a full ring, so trace events replace old ones instead of piling up
+        trace.emit(trace.PULSE)
+
+    for _ in range(PREROLL):
+        if engine.state_name != state:
+            holder.enter()
+        holder.input()
+        engine.update(DT)
+
+    measured = skipped = 0
+    worst = total = 0
+    late = ticks // 2  # measured ticks before kept starts counting
+    settle = 0
+    first = None
+
+    while measured < ticks:
+        if engine.state_name != state:
+            holder.enter()
+            settle = WARMUP
+            continue
+
+        if measured == late and first is None:
+            tracemalloc.start()
+            first = tracemalloc.take_snapshot()
+
+        holder.input()
+        before_state = engine.state_name
+        was_transition = engine.state_machine.in_transition
+
+        before = sys.getallocatedblocks()
+        engine.update(DT)
+        blocks = sys.getallocatedblocks() - before
+
+        steady = (settle == 0 and engine.state_name == before_state
+                  and not was_transition and not engine.state_machine.in_transition)
+        settle = max(0, settle - 1)
+        if not steady:
+            skipped += 1
+            continue
+
+        total += blocks
+        if blocks > worst:
+            worst = blocks
+        measured += 1
+
+    last = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    diff = [d for d in last.filter_traces(SNAPSHOT_FILTERS).compare_to(first.filter_traces(SNAPSHOT_FILTERS), "traceback")  # type: ignore
+            if d.count_diff > 0]
+    kept = sum(d.count_diff for d in diff)
+
+    return {"ticks": measured, "skipped": skipped, "tick_max": worst, "tick_mean": total / measured,
+            "kept_per_1000": kept / (measured - late) * 1000,
+            "kept_at": [(str(d.traceback), d.count_diff) for d in sorted(diff, key=lambda d: -d.count_diff)[:5]]}
+
+
+def over_budget(state, result):  # why a measured state is over its budget, empty if it isnt
+    problems = []
+    budget = BUDGETS.get(state, DEFAULT_BUDGET)
+    if result["tick_max"] > budget:
+        problems.append(f"a tick left {result['tick_max']} blocks allocated, budget {budget}")
+    if result["kept_per_1000"] > KEPT_BUDGET:
+        where = ", ".join(f"{line} x{count}" for line, count in result["kept_at"])
+        problems.append(f"kept {result['kept_per_1000']:.0f} blocks per 1000 ticks, budget {KEPT_BUDGET} ({where})")
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description="per state allocation budgets for steady ticks")
+    parser.add_argument("states", nargs="*", help="only these states")
+    parser.add_argument("--ticks", type=int, default=TICKS)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--suggest", action="store_true", help="print budgets with some headroom over what was measured")
+    args = parser.parse_args()
+
+    states = args.states or list(STATES)
+    results = {state: measure(state, args.ticks, args.seed) for state in states}
+
+    over = []
+    print(f"{'state':<16} {'ticks':>6} {'skipped':>8} {'tick max':>9} {'mean':>6} {'budget':>7} {'kept/1k':>8}")
+    for state, r in results.items():
+        problems = over_budget(state, r)
+        if problems:
+            over.append(state)
+        print(f"{state:<16} {r['ticks']:>6} {r['skipped']:>8} {r['tick_max']:>9} {r['tick_mean']:>6.2f} "
+              f"{BUDGETS.get(state, DEFAULT_BUDGET):>7} {r['kept_per_1000']:>8.1f}{'  OVER' if problems else ''}")
+        for problem in problems:
+            print(f"    {problem}")
+
+    if args.suggest:
+        print("BUDGETS = {")
+        for state, r in results.items():
+            print(f'    "{state}": {math.ceil(r["tick_max"] * 1.25) + 2},')
+        print("}")
+
+    if over:
+        print(f"[ALLOC BUDGET] over budget: {', '.join(over)}")
+        sys.exit(1)
+    print(f"[ALLOC BUDGET] {len(results)} states within budget")
+
+
+if __name__ == "__main__":
+    main()
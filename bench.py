@@ -0,0 +1,321 @@
+# bench.py
+# Microbenchmarks for what runs every logic tick: Vec2 math (new vectors and in place), the Mover integrators, drag physics, Animator, transition
+# checks over the shipped STATES, VariableManager and one whole headless engine tick. Everything is seeded, so two runs
+# do the same work and can be compared.
+#   python bench.py                      table of ns per tick and allocations per tick
+#   python bench.py --json               same as json (stdout), for scripts
+#   python bench.py --save               store the results as the baseline (machine specific, lives in cache/)
+#   python bench.py --check              compare with the baseline, exit code 1 if something got slower than --threshold
+#   python bench.py mover animator       only benchmarks whose name starts with one of these
+#
+# ns per tick is the fastest of --repeat runs (least disturbed by the rest of the system).
+# CPython doesnt count allocations, so "allocations" are measured with tracemalloc in a separate pass: alloc_bytes is how
+# far memory peaked during the tick above where the tick left it (temporaries like Vec2 results, 48 bytes each),
+# kept_blocks / kept_bytes are the memory blocks a tick leaves behind and their size, from tracemalloc snapshots taken
+# before and after the ticks (should be 0, anything else grows forever).
+
+import os, sys, gc, json, time, random, argparse, tracemalloc
+
+from data.states import STATES
+from data.animations import ANIMATIONS
+from data.variables import VARIABLES
+from data.render_config import RENDER_CONFIG
+
+from engine.pet_engine import headless_engine
+from engine.enums import Flag, Pulse, MovementType
+from engine.vec2 import Vec2
+from engine.state_runtime import StateRuntime
+from engine.variable_manager import VariableManager
+from engine.config_compiler import load_configs
+
+LOGIC_FPS = RENDER_CONFIG.get("logic_FPS", 60)
+DT = 1 / LOGIC_FPS
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "cache", "bench_baseline.json")
+
+SEED = 1
+TICKS = 20000
+REPEAT = 5
+THRESHOLD = 0.10  # 10% slower than the baseline fails --check
+ALLOC_SLACK = 16  # bytes, smaller alloc_bytes increases are noise (dict resizes and such)
+
+
+# every benchmark: setup(rng) -> tick function, called once per tick. setup is not timed
+
+SCRATCH = Vec2()
+
+def vec2_bench(op):
+    def setup(rng):
+        points = [Vec2(rng.uniform(0, 1920), rng.uniform(0, 1040)) for _ in range(256)]
+        i = 0
+
+        def tick():
+            nonlocal i
+            i = (i + 1) & 255
+            op(points[i], points[i - 1])
+        return tick
+    return setup
+
+
+def mover_bench(movement_type, method):
+    def setup(rng):
+        engine = headless_engine()
+        mover = engine.mover
+        world = engine.world
+        update = getattr(mover, method)
+        targets = [(rng.uniform(100, world.width - 100), rng.uniform(100, world.bottom)) for _ in range(64)]
+        i = 0
+
+        def start():  # next target from where the last move ended
+            nonlocal i
+            i = (i + 1) & 63
+            x, y = targets[i]
+            if movement_type == MovementType.JUMP:
+                y = mover.pos.y
+            mover.move_to(x, y, movement_type)
+
+        start()
+
+        def tick():
+            if update(DT) or not mover.active:
+                start()
+        return tick
+    return setup
+
+
+def drag_setup(rng):
+    engine = headless_engine()
+    mover = engine.mover
+    world = engine.world
+    margin = engine.hitbox_width
+    path = [Vec2(rng.uniform(margin, world.width - margin), rng.uniform(world.top, world.bottom - 10)) for _ in range(256)]
+    mover.begin_drag(path[0])
+    i = 0
+
+    def tick():
+        nonlocal i
+        i = (i + 1) & 255
+        mover.update_drag_target(path[i], DT)
+    return tick
+
+
+def animator_bench(holds):
+    def setup(rng):
+        engine = headless_engine()
+        animator = engine.animator
+        name = STATES["IDLE"]["animation"]  # animation names are lowercase, state names arent
+        frames = engine.frames.get(name)
+        animator.set(frames=frames, fps=12, loop=True, times_to_loop=1, holds={1: 3, 3: 2} if holds else None, name=name)
+        pulses = engine.state_machine.state.pulses
+
+        def tick():
+            animator.update(DT)
+            pulses.clear()  # the state machine clears them every tick too
+        return tick
+    return setup
+
+
+def handle_events_bench(quiet):
+    def setup(rng):
+        random.seed(rng.random())  # chance rolls use the module random
+        variables = VariableManager(VARIABLES)
+        compiled = load_configs(STATES, ANIMATIONS, VARIABLES)
+        flags, pulses = list(Flag), list(Pulse)
+        runtimes = []
+        for _ in range(256):  # every shipped state with a random mix of flags, pulses and variable values
+            name = rng.choice(list(STATES))
+            runtime = StateRuntime(state_name=name, compiled=compiled[name], variables=variables)
+            runtime.flags = set(rng.sample(flags, rng.randint(0, 2)))
+            runtime.pulses = set() if quiet else set(rng.sample(pulses, rng.randint(0, 1)))
+            runtimes.append(runtime)
+        for var in variables.values:
+            variables.values[var] = rng.uniform(0, 150)
+        i = 0
+
+        def tick():  # quiet: no pulses and nothing changed since the last call, like most ticks
+            nonlocal i
+            i = (i + 1) & 255
+            runtimes[i].handle_events()
+        return tick
+    return setup
+
+
+def variables_setup(rng):
+    variables = VariableManager(VARIABLES)
+
+    def tick():
+        variables.update(DT)
+    return tick
+
+
+def engine_setup(rng):  # a whole logic tick, left alone (mostly idle animations and transitions)
+    random.seed(rng.random())
+    engine = headless_engine()
+    update = engine.update
+
+    def tick():
+        update(DT)
+    return tick
+
+
+BENCHES = {
+    "vec2.add": vec2_bench(lambda a, b: a + b),
+    "vec2.sub": vec2_bench(lambda a, b: a - b),
+    "vec2.mul": vec2_bench(lambda a, b: a * 0.5),
+    "vec2.normalized": vec2_bench(lambda a, b: a.normalized()),
+    "vec2.distance_to": vec2_bench(lambda a, b: a.distance_to(b)),
+    "vec2.lerp": vec2_bench(lambda a, b: a.lerp(b, 0.25)),
+    "vec2.iadd": vec2_bench(lambda a, b: a.iadd(b).isub(b)),  # in place ones go back and forth, so the points stay put
+    "vec2.add_scaled": vec2_bench(lambda a, b: a.add_scaled(b, 0.5).add_scaled(b, -0.5)),
+    "vec2.set_normalize": vec2_bench(lambda a, b: SCRATCH.set(b).isub(a).normalize()),
+    "vec2.distance_squared_to": vec2_bench(lambda a, b: a.distance_squared_to(b)),
+    "mover.linear": mover_bench(MovementType.LINEAR, "_update_linear"),
+    "mover.accelerating": mover_bench(MovementType.ACCELERATE, "_update_accelerating"),
+    "mover.lerp": mover_bench(MovementType.LERP, "_update_lerp"),
+    "mover.jump": mover_bench(MovementType.JUMP, "_update_jump"),
+    "mover.drag": drag_setup,
+    "animator.update": animator_bench(holds=False),
+    "animator.update_holds": animator_bench(holds=True),
+    "state_runtime.handle_events": handle_events_bench(quiet=False),
+    "state_runtime.handle_events_quiet": handle_events_bench(quiet=True),
+    "variables.update": variables_setup,
+    "engine.update": engine_setup,
+}
+
+
+def time_bench(setup, ticks, repeat, seed):
+    best = None
+    for _ in range(repeat):
+        tick = setup(random.Random(seed))
+        for _ in range(ticks // 10):  # warm up
+            tick()
+
+        gc.disable()
+        start = time.perf_counter_ns()
+        for _ in range(ticks):
+            tick()
+        ns = (time.perf_counter_ns() - start) / ticks
+        gc.enable()
+
+        best = ns if best is None else min(best, ns)
+    return best
+
+
+def peak_rise(tick, ticks):  # average of how far traced memory peaked above where the tick left it (= temporaries)
+    rise = 0
+    for _ in range(ticks):
+        tracemalloc.reset_peak()
+        tick()
+        current, peak = tracemalloc.get_traced_memory()  # both read before the result tuple is allocated
+        rise += peak - current
+    return rise / ticks
+
+
+SNAPSHOT_FILTERS = [tracemalloc.Filter(False, tracemalloc.__file__)]  # the snapshots own objects
+
+
+def alloc_bench(setup, ticks, seed):
+    tick = setup(random.Random(seed))
+    for _ in range(ticks // 10):  # warm up, first calls fill caches
+        tick()
+
+    ticks = min(ticks, 2000)  # tracemalloc makes every allocation slow
+    tracemalloc.start()
+    rise = peak_rise(tick, ticks)
+
+    gc.collect()
+    before = tracemalloc.take_snapshot()
+    for _ in range(ticks):
+        tick()
+    gc.collect()
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+
+    diff = after.filter_traces(SNAPSHOT_FILTERS).compare_to(before.filter_traces(SNAPSHOT_FILTERS), "filename")
+    kept_blocks = sum(stat.count_diff for stat in diff) / ticks
+    kept_bytes = sum(stat.size_diff for stat in diff) / ticks
+    return rise, kept_blocks, kept_bytes
+
+
+def run(names, ticks, repeat, seed):
+    results = {}
+    for name in names:
+        setup = BENCHES[name]
+        ns = time_bench(setup, ticks, repeat, seed)
+        alloc_bytes, kept_blocks, kept_bytes = alloc_bench(setup, ticks, seed)
+        results[name] = {"ns_per_tick": round(ns, 1), "alloc_bytes": round(alloc_bytes, 1),
+                         "kept_blocks": round(kept_blocks, 3), "kept_bytes": round(kept_bytes, 1)}
+    return results
+
+
+def compare(results, baseline, threshold):  # {name: (ns change, alloc change, regressed)}
+    changes = {}
+    for name, r in results.items():
+        base = baseline.get(name)
+        if not base:
+            continue
+        ns_change = r["ns_per_tick"] / base["ns_per_tick"] - 1 if base["ns_per_tick"] else 0.0
+        alloc_grew = r["alloc_bytes"] - base["alloc_bytes"]
+        regressed = ns_change > threshold or (alloc_grew > ALLOC_SLACK and r["alloc_bytes"] > base["alloc_bytes"] * (1 + threshold))
+        changes[name] = (ns_change, alloc_grew, regressed)
+    return changes
+
+
+def main():
+    parser = argparse.ArgumentParser(description="per tick engine microbenchmarks")
+    parser.add_argument("only", nargs="*", help="benchmark name prefixes")
+    parser.add_argument("--ticks", type=int, default=TICKS)
+    parser.add_argument("--repeat", type=int, default=REPEAT)
+    parser.add_argument("--seed", type=int, default=SEED)
+    parser.add_argument("--json", action="store_true", help="print json instead of a table")
+    parser.add_argument("--baseline", default=BASELINE)
+    parser.add_argument("--save", action="store_true", help="store the results as the baseline")
+    parser.add_argument("--check", action="store_true", help="exit code 1 on regressions")
+    parser.add_argument("--threshold", type=float, default=THRESHOLD, help="allowed slowdown, 0.1 = 10%%")
+    args = parser.parse_args()
+
+    names = [n for n in BENCHES if not args.only or any(n.startswith(p) for p in args.only)]
+    if not names:
+        parser.error(f"no benchmark matches {args.only}, there are: {', '.join(BENCHES)}")
+
+    results = run(names, args.ticks, args.repeat, args.seed)
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)["results"]
+    changes = compare(results, baseline, args.threshold)
+    regressions = [name for name, (_, _, regressed) in changes.items() if regressed]
+
+    if args.json:
+        print(json.dumps({
+            "python": sys.version.split()[0],
+            "seed": args.seed,
+            "ticks": args.ticks,
+            "results": results,
+            "vs_baseline": {name: {"ns_change": round(c[0], 4), "alloc_bytes_change": round(c[1], 1)} for name, c in changes.items()},
+            "regressions": regressions,
+        }, indent=2))
+    else:
+        print(f"{'benchmark':<30} {'ns/tick':>10} {'alloc B':>9} {'kept blk':>9} {'kept B':>8} {'vs baseline':>12}")
+        for name, r in results.items():
+            change = ""
+            if name in changes:
+                ns_change, _, regressed = changes[name]
+                change = f"{ns_change * 100:+.1f}%" + (" !" if regressed else "")
+            print(f"{name:<30} {r['ns_per_tick']:>10.1f} {r['alloc_bytes']:>9.1f} {r['kept_blocks']:>9.3f} {r['kept_bytes']:>8.1f} {change:>12}")
+        if regressions:
+            print(f"[BENCH] {len(regressions)} regressions over {args.threshold * 100:.0f}%: {', '.join(regressions)}")
+
+    if args.save:
+        os.makedirs(os.path.dirname(os.path.abspath(args.baseline)), exist_ok=True)
+        merged = dict(baseline, **results)  # saving a subset keeps the rest of the old baseline
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump({"python": sys.version.split()[0], "seed": args.seed, "results": merged}, f, indent=2)
+        print(f"[BENCH] baseline saved to {args.baseline}", file=sys.stderr)
+
+    if args.check and regressions:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,12 @@
 # animation data config, holds the animation folder path, default fps and loop(can be overriden in states.py)
 # "holds" specifies how long should certain frames last
+# "storage": "indexed" keeps frames as a 256 color palette + alpha when that is lossless, default is "argb". about a third
+# less resident memory with the mipmap chain and the few expanded frames counted (look_around at scale 0.5: 3082 -> 1966 KB)
+#
+# instead of "folder" an animation can be a single spritesheet with an aseprite json export (hash or array, not rotated):
+#     "sheet": "animations/name/sheet.png",
+#     "sheet_data": "animations/name/sheet.json",
+# frame durations from the json become "holds" (unless "holds" is given), trimmed exports keep their offsets
 
 # When adding animations dont forget to add them to repository <----
 
@@ -29,6 +36,7 @@ ANIMATIONS = {
         "folder": "animations/look_around",
         "fps": 8,
         "loop": True,
+        "storage": "indexed",
         "holds": {
             3: 10,
             8: 10,
@@ -46,6 +54,7 @@ ANIMATIONS = {
         "fps": 12,
         "loop": False,
         "times_to_loop": 3,
+        "storage": "indexed",
     },
 
     "standing_up": {
@@ -3,8 +3,38 @@ RENDER_CONFIG = {
 
     "logic_FPS": 60,
     "display_FPS": 60,
+    "max_catchup_steps": 5,  # logic steps run at most per timer callback when behind, older backlog is dropped
+    "scheduler": "deadline",  # "deadline" sleeps until the next frame / movement / threshold is due, "fixed" wakes every tick
+    "max_sleep": 1.0,  # seconds, longest the deadline scheduler sleeps
+    "profile": False,  # per phase tick timings (engine/profiler.py), PET_PROFILE=1 turns it on too
+    "profile_file": "cache/profile.json",  # written on quit and on SIGUSR1
+    "control_socket": None,  # unix socket path for inspecting / driving the pet (engine/control.py), PET_CONTROL=path works too
+    "trace": "all",  # event categories kept in the trace ring buffer (engine/trace.py): "all", "none" or "state,pulse,flag,anim,move,click,var,window"
+    "trace_size": 4096,  # events kept, older ones get overwritten
+    "trace_file": "cache/trace.json",  # written on SIGUSR2, "trace" on the control socket and on crashes
+    "trace_echo": False,  # also print every event (PET_TRACE_ECHO=1)
+    "gc_freeze": True,  # gc.freeze() after startup loading, collections stop walking configs and frames
+    "gc_defer_full": True,  # no automatic full collections, they run when the pet is about to sleep (engine/gc_policy.py)
+    "gc_full_interval": 60,  # seconds between those
+    "gc_idle_min": 0.1,  # seconds of planned sleep a full collection needs
+    "gc_max_defer": 600,  # seconds, runs anyway after this
+
+    "presence_source": "auto",  # "auto" (windows: lock screen / fullscreen / idle, elsewhere: cursor idle), "cursor", "fake" or "none"
+    "away_after": 3600,  # seconds without input before the user counts as away
+    "throttle_away": "LOW",  # FULL, LOW or FROZEN while the user is away
+    "throttle_hidden": "FROZEN",  # same, while the screen is locked or a fullscreen app covers the pet
+    "throttle_low_fps": 4,  # wakeups per second in LOW
+    "presence_poll_interval": 0.5,  # seconds between presence checks
+    "wake_radius": 150,  # px, cursor this close to the pet always runs it at full speed
 
     "pet_size_on_screen": 8.5,  # vertical scale of first sprite on the scren (in percent)
+    "mipmap_levels": 3,  # frames are decoded at the pet size, plus this many halvings (counting the base) for other scales
+    "trim_frames": True,  # crop frames to their visible pixels (drawn at the same spot), identical frames share memory
+    "indexed_hot_fraction": 0.25,  # share of the frames of an "indexed" animation (see animations.py) kept expanded for drawing
+    "frame_cache_file": "cache/frames.bin",  # decoded frames are kept here between launches, None to disable
+    "frame_cache_mb": 64,  # memory budget for decoded frames, least recently played animations get evicted above it
+    "decode_workers": 0,  # threads decoding pngs at startup and in the background, 0 = one per cpu core
+    "prefetch_hops": 2,  # animations reachable within this many state transitions get decoded in the background
 
     "default_facing": "RIGHT",
     "default_loop_option": False,  # True or False, will animations loop or now unless stated otherwise
@@ -12,6 +42,15 @@ RENDER_CONFIG = {
     "drag_offset_x": 0,
     "drag_offset_y": -1.4,
 
+    "rotation_step": 2,  # degrees, rotated frames are cached per step instead of re-rasterized every repaint
+    "sprite_cache_size": 256,  # mirrored / rotated frames kept in the cache at least, more when an animation needs more (frames * rotation steps * 2)
+    "sprite_cache_mb": 64,  # memory budget for those, past it an animation that doesnt fit draws the rest uncached
+
+    "window_margin": 4,  # px around the sprite, the window only covers what the current animation / rotation needs
+    "window_step": 16,  # px, window edges snap to this grid so it doesnt resize every tick
+    "window_shrink_ratio": 1.3,  # shrink once the window is this much bigger than needed...
+    "window_shrink_delay": 1.5,  # ...for this many seconds
+
     "max_angle": 360, # max angle when dragging. >360 is free spin
     "inertia": 1,
     "damping": 1.5,
@@ -16,6 +16,8 @@
 # "when": ["THIS_FLAG", "THAT_PULSE" ],  
 # ALSO WORKS
 # 
+# checked when the engine loads (engine/config_compiler.py): unknown flags, pulses, variables, states, animations and
+# keys written twice are errors instead of transitions that silently never fire
 #
 INITIAL_STATE = {"default": "IDLE"} #MUST HAVE
 
@@ -27,7 +29,7 @@ STATES = {
         "behaviour": "STATIONARY",
 
         "on_enter": [
-            {"var": "times_clicked", "op": "=", "value": 0},
+            {"var": "times_clicked_this_state", "op": "=", "value": 0},
         ],
 
         "transitions": [
@@ -109,28 +111,6 @@ STATES = {
         "exit_to": "IDLE"
     },
 
-    "ROLL": {
-        "animation": "roll",
-        "behaviour": "MOVE_RANDOM_X",
-        "settings": {
-            "gravity": 700,
-        },
-
-        "on_enter": [
-            {"var": "sitting_still_timer", "op": "=", "value": 0},
-        ],
-        
-        "transitions": [
-            {
-                "when": [{"flag":"MOVEMENT_FINISHED"},],
-                "to": "BLINK",
-                "chance": 0.1,
-            },
-        ],
-        "exit_when": ["MOVEMENT_FINISHED"],
-        "exit_to": "IDLE"
-    }, 
-
     "ROLL": {
         "animation": "roll",
         "behaviour": "JUMP",
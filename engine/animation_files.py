@@ -0,0 +1,156 @@
+# engine/animation_files.py
+# What is known about an animation without decoding it: its files, spritesheet data, frame sizes from the png headers.
+# No Qt in here, so the headless engine can use it. FrameStore (engine/frame_store.py) builds on AnimationFiles,
+# FrameSizes stands in for FrameStore when nothing gets drawn (same interface, frames only have a width and a height)
+
+import os, json, struct
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+
+def list_frame_files(folder):  # png files of one animation folder in name order
+    return [
+        os.path.join(folder, f)
+        for f in sorted(os.listdir(folder))
+        if f.lower().endswith(".png")
+    ]
+
+
+def load_sheet_data(path):  # aseprite json (hash or array export) -> list of (x, y, w, h, source_w, source_h, offset_x, offset_y, duration_ms)
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+
+    frames = data["frames"]
+    if isinstance(frames, dict):  # "hash" export, keys are in frame order
+        frames = list(frames.values())
+
+    result = []
+    for fr in frames:
+        if fr.get("rotated"):
+            raise RuntimeError(f"Rotated spritesheet frames are not supported ({path})")
+
+        r = fr["frame"]
+        source = fr.get("sourceSize", {"w": r["w"], "h": r["h"]})
+        offset = fr.get("spriteSourceSize", {"x": 0, "y": 0})  # where the (trimmed) rect sits inside the original frame
+        result.append((r["x"], r["y"], r["w"], r["h"], source["w"], source["h"], offset["x"], offset["y"], fr.get("duration", 100)))
+
+    if not result:
+        raise RuntimeError(f"No frames found in spritesheet data '{path}'")
+    return result
+
+
+def sheet_holds(sheet, fps):  # aseprite per-frame durations -> "holds" (1-based frame index -> ticks of 1/fps)
+    frame_ms = 1000 / fps if fps > 0 else 1000
+    holds = {}
+    for i, fr in enumerate(sheet):
+        ticks = max(1, round(fr[8] / frame_ms))
+        if ticks != 1:
+            holds[i + 1] = ticks
+    return holds
+
+
+def read_source_size(path):  # width and height from the png IHDR chunk, nothing else is read
+    with open(path, "rb") as f:
+        header = f.read(24)
+
+    if len(header) < 24 or header[:8] != PNG_SIGNATURE or header[12:16] != b"IHDR":
+        raise RuntimeError(f"Not a png file: '{path}'")
+    return struct.unpack(">II", header[16:24])
+
+
+def scaled_size(source_w, source_h, scale, dpr):  # logical size of a frame decoded at scale * dpr, rounded to physical pixels like decoding does
+    target = scale * dpr
+    return max(1, round(source_w * target)) / dpr, max(1, round(source_h * target)) / dpr
+
+
+class AnimationFiles:
+    def __init__(self, base_dir, configs):
+        self.base_dir = base_dir
+        self.configs = configs
+        self.sheets = {}  # name -> parsed spritesheet data, for animations that use "sheet"
+
+    def folder(self, name):
+        return os.path.join(self.base_dir, self.configs[name]["folder"])
+
+    def files(self, name):  # every source file of the animation (for spritesheets the image and its json)
+        cfg = self.configs[name]
+        if "sheet" in cfg:
+            return [os.path.join(self.base_dir, cfg["sheet"]), os.path.join(self.base_dir, cfg["sheet_data"])]
+
+        files = list_frame_files(self.folder(name))
+        if not files:
+            raise RuntimeError(f"No frames found for animation '{name}'")
+        return files
+
+    def sheet(self, name):  # None for folder animations
+        if "sheet" not in self.configs[name]:
+            return None
+        if name not in self.sheets:
+            self.sheets[name] = load_sheet_data(self.files(name)[1])
+        return self.sheets[name]
+
+    def sheet_holds(self, name, fps):  # holds from the aseprite frame durations, empty for folder animations
+        sheet = self.sheet(name)
+        return sheet_holds(sheet, fps) if sheet else {}
+
+    def source_sizes(self, name):  # size of every frame before any scaling, only reads png headers
+        sheet = self.sheet(name)
+        if sheet:
+            return [(fr[4], fr[5]) for fr in sheet]
+        return [read_source_size(path) for path in self.files(name)]
+
+    def source_size(self, name, index=0):
+        sheet = self.sheet(name)
+        if sheet:
+            return sheet[index][4], sheet[index][5]
+        return read_source_size(self.files(name)[index])
+
+    def source_bounds(self, name):  # biggest frame of the animation before scaling
+        sizes = self.source_sizes(name)
+        return max(w for w, _ in sizes), max(h for _, h in sizes)
+
+
+class FrameSize:  # a frame as far as the simulation cares
+    __slots__ = ("width", "height")
+
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+
+
+class FrameSizes(AnimationFiles):  # FrameStore without the pixels, for running the engine headless
+    def __init__(self, base_dir, configs):
+        super().__init__(base_dir, configs)
+        self.scale = 1.0
+        self.dpr = 1.0
+        self.frames = {}  # name -> [FrameSize]
+
+    def set_scale(self, scale, dpr=1.0):
+        self.scale = scale
+        self.dpr = dpr
+        self.frames.clear()
+
+    def get(self, name):
+        if name not in self.frames:
+            self.frames[name] = [FrameSize(*scaled_size(w, h, self.scale, self.dpr)) for w, h in self.source_sizes(name)]
+        return self.frames[name]
+
+    def get_bounds(self, name):
+        frames = self.get(name)
+        return max(f.width for f in frames), max(f.height for f in frames)
+
+    # nothing is decoded, so nothing to schedule
+    def load(self, name):
+        self.get(name)
+
+    def prefetch(self, names):
+        pass
+
+    def set_in_use(self, names):
+        pass
+
+    def poll(self):
+        pass
+
+    def next_deadline(self):
+        return None
@@ -1,19 +1,23 @@
 
 from engine.enums import Flag, Pulse, MovementType, Facing
+from engine import trace
 
 class Animator:  # contains different animation functions
     def __init__(self, pet):
         self.frames = []
+        self.name = None
         self.index = 0
         self.timer = 0
         self.loop = True
         self.ticks_left = 0
         self.done = False
+        self.dirty = True  # frame on screen changed since the pet last repainted, pet clears it
 
         self.pet = pet
 
-    def set(self, frames, fps, loop, times_to_loop, holds=None): #sets the animatios. receives a list of PixMap (frames), int (fps) and a bool(loop)
+    def set(self, frames, fps, loop, times_to_loop, holds=None, name=None): #sets the animatios. receives a list of Frame (frames), int (fps) and a bool(loop)
         self.frames = frames
+        self.name = name
         self.fps = fps if fps > 0 else 0.001
         self.loop = loop
         self.times_to_loop = times_to_loop
@@ -22,6 +26,7 @@ class Animator:  # contains different animation functions
         self.holds = holds or {}
         self.ticks_left = self.hold_for(0)
         self.done = False
+        self.dirty = True
         
     def update(self, dt): #iterates over the list of frames with the speed of fps, loops if loop==True
         if self.done or not self.frames:
@@ -35,27 +40,38 @@ class Animator:  # contains different animation functions
             self.ticks_left -= 1
 
             if self.ticks_left <= 0:
+                old_index = self.index
                 self.index += 1
 
                 # print(self.index)
 
                 if self.index >= len(self.frames):
-                    print("Animator: Pulse.ANIMATION_END ")
+                    if trace.anim: trace.emit(trace.ANIM_END, self.name)
                     self.pet.state_machine.pulse(Pulse.ANIMATION_END)  # if the index of the frame is more than we have frames, the animation is considered finished(for ease of connecting animations together), else - not
 
                     if self.loop or self.times_to_loop >= 2 :
                         self.index = 0
-                        self.times_to_loop -= 1
+                        if not self.loop:  # only counts for a set number of loops, a looping one would count down forever
+                            self.times_to_loop -= 1
                     else:
                         self.index = len(self.frames) - 1
-                        print("Animator: Flag.ANIMATION_FINISHED ")
+                        if trace.anim: trace.emit(trace.ANIM_FINISHED, self.name)
                         self.pet.state_machine.raise_flag(Flag.ANIMATION_FINISHED)
                         self.done = True
 
 
                 self.ticks_left = self.hold_for(self.index)
+                if self.index != old_index:
+                    self.dirty = True
 
 
+    def next_deadline(self):  # seconds until the frame changes (or the animation ends), None if it never will
+        if self.done or not self.frames:
+            return None
+
+        frame_time = 1 / self.fps
+        return max(0.0, frame_time - self.timer) + max(0, self.ticks_left - 1) * frame_time
+
     def hold_for(self, index):
         return self.holds.get(index + 1, 1)
 
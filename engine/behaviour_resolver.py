@@ -1,5 +1,4 @@
 import random
-from PySide6.QtWidgets import QApplication
 from engine.enums import MovementType
 from data.behaviours import BEHAVIOURS
 
@@ -51,19 +50,19 @@ class BehaviourResolver:
         raise ValueError(f"Unknown axis spec: {spec}")
     
     def _resolve_bound(self, name, axis):
-        screen = QApplication.primaryScreen().availableGeometry()
+        screen = self.pet.world
 
         if name == "screen.left":
             return self.pet.hitbox_width / 2
 
         if name == "screen.right":
-            return screen.width() - self.pet.hitbox_width / 2
+            return screen.width - self.pet.hitbox_width / 2
 
         if name == "screen.top":
             return self.pet.hitbox_height
 
         if name == "screen.bottom":
-            return screen.height()
+            return screen.height
 
         raise ValueError(f"Unknown bound: {name}")
 
@@ -1,11 +1,8 @@
-import sys, os, random, time, math
-from PySide6.QtWidgets import QApplication, QWidget
-from PySide6.QtGui import QPainter, QPixmap, QPen, QColor
-from PySide6.QtCore import Qt, QTimer, QPointF
-
 from engine.enums import Flag, Pulse, MovementType, Facing
+from engine.vec2 import Vec2
+from engine import trace
 
-# helper function to detect clicks or holds on pet sprite
+# helper function to detect clicks or holds on pet sprite. times are the engines simulated time, positions are Vec2 in screen pixels
 class ClickDetector:
     def __init__(self, pet):
         self.pet = pet
@@ -20,41 +17,50 @@ class ClickDetector:
         self.long_press_time = 0.1
         self.move_tolerance = 1   # CHANGE
 
-    def press(self, pos: QPointF):
-        self.press_time = time.monotonic()
+    def press(self, pos: Vec2):
+        self.press_time = self.pet.time
         self.press_pos = pos
         self.moved = False
         self.hold_triggered = False
 
-    def move(self, pos: QPointF):
+    def move(self, pos: Vec2):
         if not self.press_pos:
             return
 
-        if (pos - self.press_pos).manhattanLength() > self.move_tolerance:
+        if abs(pos.x - self.press_pos.x) + abs(pos.y - self.press_pos.y) > self.move_tolerance:
             self.moved = True
 
     def update(self):
         if self.press_time is None or self.hold_triggered:
             return
 
-        elapsed = time.monotonic() - self.press_time
+        elapsed = self.pet.time - self.press_time
 
         if elapsed >= self.long_press_time and not self.moved:
             self.hold_triggered = True
             self.sm.raise_flag(Flag.CLICK_HELD)
             self.sm.raise_flag(Flag.DRAGGING)
-            print("HOLDIIING")
+            if trace.click: trace.emit(trace.HOLD, self.press_pos.x, self.press_pos.y)  # type: ignore
 
         if self.moved:
             self.sm.raise_flag(Flag.DRAGGING)
 
+    def next_deadline(self):  # seconds until a held press turns into a long press, None when nothing is pressed
+        if self.press_time is None or self.hold_triggered:
+            return None
+
+        if self.moved:
+            return 0.0
+
+        return max(0.0, self.press_time + self.long_press_time - self.pet.time)
+
     def release(self):
         self.sm.remove_flag(Flag.DRAGGING)
 
         if self.press_time is None:
             return
 
-        duration = time.monotonic() - self.press_time
+        duration = self.pet.time - self.press_time
 
 
         self.press_time = None
@@ -63,7 +69,7 @@ class ClickDetector:
         if self.hold_triggered:
             self.sm.remove_flag(Flag.CLICK_HELD)
             self.sm.pulse(Pulse.LETGO)
-            print("stopped holding")
+            if trace.click: trace.emit(trace.LETGO, duration)
             return
 
         # if self.moved:
@@ -72,4 +78,4 @@ class ClickDetector:
         if duration <= self.click_time:
             self.sm.pulse(Pulse.CLICK)
             self.pet.variables.add("times_clicked_this_state", 1)
-            print("CLICK")
+            if trace.click: trace.emit(trace.CLICK, duration)
@@ -0,0 +1,377 @@
+# engine/config_compiler.py
+# Checks the data/ configs once when the engine loads and compiles STATES into objects the state machine can evaluate
+# every tick without looking anything up: flag and pulse names become Flag / Pulse members, var conditions become
+# (name, operator function, value), on_enter entries become Commands. Everything wrong is collected first (unknown
+# flags, pulses, variables, states, animations, behaviours, ops, misspelled keys, missing files, and keys written twice
+# in a dict literal, which python silently keeps only the last of) and raised together as one ConfigError.
+
+import os, ast, operator
+
+from data.behaviours import BEHAVIOURS
+
+from engine.enums import Flag, Pulse, MovementType
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_FILES = [os.path.join(BASE_DIR, "data", name) for name in ("states.py", "animations.py", "behaviours.py", "variables.py")]
+
+OPS = {"<": operator.lt, ">": operator.gt, "==": operator.eq, "<=": operator.le, ">=": operator.ge}
+
+# on_enter command kinds
+SET_VAR, ADD_VAR, SET_FLAG, CLEAR_FLAG = range(4)
+COMMAND_OPS = {"=": SET_VAR, "+=": ADD_VAR, "-=": ADD_VAR}
+
+ANIMATION_OVERRIDES = {"fps", "loop", "times_to_loop", "holds"}  # what states and transition_anim_cfg can override
+ANIMATION_KEYS = ANIMATION_OVERRIDES | {"folder", "sheet", "sheet_data", "storage"}
+STATE_KEYS = ANIMATION_OVERRIDES | {"animation", "behaviour", "settings", "on_enter", "transitions",
+                                    "exit_when", "exit_to", "exit_animation", "exit_animation_cfg"}
+TRANSITION_KEYS = {"when", "to", "chance", "transition_anim", "transition_anim_cfg"}
+SETTINGS_KEYS = {"acceleration", "max_speed", "slow_radius", "snap_distance", "jump_velocity", "gravity"}
+BEHAVIOUR_KEYS = {"movement", "target", "settings"}
+AXIS_KEYS = {"current": set(), "random": {"min", "max"}, "random_range": {"min", "max", "range"}, "fixed": {"to"}}
+BOUNDS = ("screen.left", "screen.right", "screen.top", "screen.bottom")
+VARIABLE_KEYS = {"value", "rate"}
+STORAGE = ("argb", "indexed")
+
+
+class ConfigError(ValueError):
+    def __init__(self, problems):
+        self.problems = problems
+        super().__init__(f"{len(problems)} config problems:\n  " + "\n  ".join(problems))
+
+
+class Transition:  # a "transitions" entry, or exit_when / exit_to
+    __slots__ = ("to", "chance", "flags", "pulses", "tests", "anim", "anim_cfg")
+
+    def __init__(self, to, chance, flags, pulses, tests, anim, anim_cfg):
+        self.to = to
+        self.chance = chance
+        self.flags = flags  # frozenset of Flag, all have to be raised
+        self.pulses = pulses  # frozenset of Pulse, all have to be pending
+        self.tests = tests  # ((variable, operator function, value), ...)
+        self.anim = anim
+        self.anim_cfg = anim_cfg
+
+    def check(self, flags, pulses, values):  # every condition holds, chance is not rolled here
+        if not self.flags <= flags or not self.pulses <= pulses:
+            return False
+        for name, op, value in self.tests:
+            if not op(values[name], value):
+                return False
+        return True
+
+
+class Command:  # an on_enter entry
+    __slots__ = ("kind", "target", "value")
+
+    def __init__(self, kind, target, value=None):
+        self.kind = kind
+        self.target = target  # variable name or Flag
+        self.value = value
+
+    def run(self, runtime):
+        if self.kind == ADD_VAR:
+            runtime.variables.add(self.target, self.value)
+        elif self.kind == SET_VAR:
+            runtime.variables.set(self.target, self.value)
+        elif self.kind == SET_FLAG:
+            runtime.raise_flag(self.target)  # not flags.add, raising DRAGGING pulses DRAGGING_STARTED and both get traced
+        elif self.kind == CLEAR_FLAG:
+            runtime.remove_flag(self.target)
+
+
+class CompiledState:
+    __slots__ = ("name", "config", "on_enter", "transitions", "exit", "steady", "by_pulse", "watch")
+
+    def __init__(self, name, config, on_enter, transitions, exit):
+        self.name = name
+        self.config = config  # the raw dict, animation / behaviour / settings are still read from it on enter
+        self.on_enter = on_enter  # (Command, ...)
+        self.transitions = transitions  # (Transition, ...) first match wins
+        self.exit = exit  # Transition or None
+
+        # index for StateRuntime.handle_events. pulses only last one tick, so a transition that needs one can only hold
+        # on a tick that pulse is pending. the flag / var only ("steady") ones can hold any tick, they are in every list
+        self.steady = tuple(t for t in transitions if not t.pulses)
+        self.by_pulse = {p: tuple(t for t in transitions if not t.pulses or p in t.pulses) for p in Pulse}  # in the original order
+
+        # (variable, value) pairs steady conditions compare against, crossing one of them can make a steady transition hold
+        watch = []
+        for t in self.steady + ((exit,) if exit and not exit.pulses else ()):
+            for var, _, value in t.tests:
+                if (var, value) not in watch:
+                    watch.append((var, value))
+        self.watch = tuple(watch)
+
+
+# ---------------- duplicate keys ---------------- #
+
+_duplicates = {}  # path -> problems, source files are only parsed once
+
+
+def duplicate_keys(path):  # dict literals in a python file that repeat a key, only the last one of those survives
+    if path in _duplicates:
+        return _duplicates[path]
+
+    with open(path, encoding="utf-8") as f:
+        tree = ast.parse(f.read(), path)
+    problems = []
+
+    def walk(node, where):
+        if isinstance(node, ast.Dict):
+            seen = {}
+            for key, value in zip(node.keys, node.values):
+                if not isinstance(key, ast.Constant):  # **spread or computed key
+                    walk(value, where)
+                    continue
+                if key.value in seen:
+                    problems.append(f"{os.path.basename(path)} line {key.lineno}: {where}[{key.value!r}] is written twice "
+                                    f"(first on line {seen[key.value]}), the first one is silently ignored")
+                else:
+                    seen[key.value] = key.lineno
+                walk(value, f"{where}[{key.value!r}]")
+        elif isinstance(node, (ast.List, ast.Tuple)):
+            for i, item in enumerate(node.elts):
+                walk(item, f"{where}[{i}]")
+
+    for node in tree.body:
+        if isinstance(node, ast.Assign) and len(node.targets) == 1 and isinstance(node.targets[0], ast.Name):
+            walk(node.value, node.targets[0].id)
+
+    _duplicates[path] = problems
+    return problems
+
+
+# ---------------- validation + compiling ---------------- #
+
+def is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def unknown_keys(cfg, known, where, problems):
+    for key in cfg:
+        if key not in known:
+            problems.append(f"{where}: unknown key {key!r}, expected one of {sorted(known)}")
+
+
+def compile_condition(cond, variables, where, problems):  # -> ("flag", Flag) / ("pulse", Pulse) / ("var", test) / None
+    if isinstance(cond, str):  # bare name, a flag or a pulse
+        flag, pulse = Flag.__members__.get(cond), Pulse.__members__.get(cond)
+        if flag and pulse:
+            problems.append(f"{where}: {cond!r} is both a Flag and a Pulse, write {{'flag': ...}} or {{'pulse': ...}}")
+        elif flag:
+            return "flag", flag
+        elif pulse:
+            return "pulse", pulse
+        else:
+            problems.append(f"{where}: {cond!r} is no Flag or Pulse")
+        return None
+
+    if not isinstance(cond, dict):
+        problems.append(f"{where}: condition has to be a name or a dict, got {cond!r}")
+        return None
+
+    if "flag" in cond:
+        unknown_keys(cond, {"flag"}, where, problems)
+        if cond["flag"] not in Flag.__members__:
+            problems.append(f"{where}: unknown flag {cond['flag']!r}")
+            return None
+        return "flag", Flag[cond["flag"]]
+
+    if "pulse" in cond:
+        unknown_keys(cond, {"pulse"}, where, problems)
+        if cond["pulse"] not in Pulse.__members__:
+            problems.append(f"{where}: unknown pulse {cond['pulse']!r}")
+            return None
+        return "pulse", Pulse[cond["pulse"]]
+
+    if "var" in cond:
+        unknown_keys(cond, {"var", "op", "value"}, where, problems)
+        ok = True
+        if cond["var"] not in variables:
+            problems.append(f"{where}: unknown variable {cond['var']!r}")
+            ok = False
+        if cond.get("op") not in OPS:
+            problems.append(f"{where}: op {cond.get('op')!r} is not one of {list(OPS)}")
+            ok = False
+        if not is_number(cond.get("value")):
+            problems.append(f"{where}: value {cond.get('value')!r} is not a number")
+            ok = False
+        return ("var", (cond["var"], OPS[cond["op"]], cond["value"])) if ok else None
+
+    problems.append(f"{where}: condition needs 'flag', 'pulse' or 'var', got {cond!r}")
+    return None
+
+
+def compile_transition(conditions, to, chance, anim, anim_cfg, ctx, where, problems):
+    states, animations, variables = ctx
+    if to not in states:
+        problems.append(f"{where}: goes to unknown state {to!r}")
+    if not is_number(chance) or not 0 <= chance <= 1:
+        problems.append(f"{where}: chance {chance!r} is not a number from 0 to 1")
+    if anim is not None and anim not in animations:
+        problems.append(f"{where}: unknown animation {anim!r}")
+    if anim_cfg:
+        unknown_keys(anim_cfg, ANIMATION_OVERRIDES, where, problems)
+    if not isinstance(conditions, (list, tuple)):
+        problems.append(f"{where}: conditions have to be a list, got {conditions!r}")
+        conditions = []
+
+    flags, pulses, tests = set(), set(), []
+    for i, cond in enumerate(conditions):
+        compiled = compile_condition(cond, variables, f"{where} condition {i}", problems)
+        if compiled is None:
+            continue
+        kind, value = compiled
+        if kind == "flag":
+            flags.add(value)
+        elif kind == "pulse":
+            pulses.add(value)
+        else:
+            tests.append(value)
+
+    return Transition(to, chance, frozenset(flags), frozenset(pulses), tuple(tests), anim, anim_cfg)
+
+
+def compile_command(cmd, variables, where, problems):
+    if not isinstance(cmd, dict):
+        problems.append(f"{where}: command has to be a dict, got {cmd!r}")
+        return None
+
+    if "var" in cmd:
+        unknown_keys(cmd, {"var", "op", "value"}, where, problems)
+        if cmd["var"] not in variables:
+            problems.append(f"{where}: unknown variable {cmd['var']!r}")
+        elif cmd.get("op") not in COMMAND_OPS:
+            problems.append(f"{where}: op {cmd.get('op')!r} is not one of {list(COMMAND_OPS)}")
+        elif not is_number(cmd.get("value")):
+            problems.append(f"{where}: value {cmd.get('value')!r} is not a number")
+        else:
+            value = -cmd["value"] if cmd["op"] == "-=" else cmd["value"]
+            return Command(COMMAND_OPS[cmd["op"]], cmd["var"], value)
+        return None
+
+    for key, kind in (("set_flag", SET_FLAG), ("clear_flag", CLEAR_FLAG)):
+        if key in cmd:
+            unknown_keys(cmd, {key}, where, problems)
+            if cmd[key] not in Flag.__members__:
+                problems.append(f"{where}: unknown flag {cmd[key]!r}")
+                return None
+            return Command(kind, Flag[cmd[key]])
+
+    problems.append(f"{where}: command needs 'var', 'set_flag' or 'clear_flag', got {cmd!r}")
+    return None
+
+
+def compile_state(name, cfg, ctx, behaviours, problems):
+    states, animations, variables = ctx
+    where = f"STATES[{name!r}]"
+    unknown_keys(cfg, STATE_KEYS, where, problems)
+
+    if cfg.get("animation") not in animations:
+        problems.append(f"{where}: unknown animation {cfg.get('animation')!r}")
+    if cfg.get("behaviour", "STATIONARY") not in behaviours:
+        problems.append(f"{where}: unknown behaviour {cfg.get('behaviour')!r}")
+    unknown_keys(cfg.get("settings", {}), SETTINGS_KEYS, f"{where} settings", problems)
+
+    on_enter = []
+    for i, cmd in enumerate(cfg.get("on_enter", [])):
+        command = compile_command(cmd, variables, f"{where} on_enter[{i}]", problems)
+        if command:
+            on_enter.append(command)
+
+    transitions = []
+    for i, t in enumerate(cfg.get("transitions", [])):
+        t_where = f"{where} transitions[{i}]"
+        unknown_keys(t, TRANSITION_KEYS, t_where, problems)
+        if "when" not in t or "to" not in t:
+            problems.append(f"{t_where}: needs 'when' and 'to'")
+            continue
+        transitions.append(compile_transition(t["when"], t["to"], t.get("chance", 1), t.get("transition_anim"),
+                                              t.get("transition_anim_cfg", {}), ctx, t_where, problems))
+
+    exit = None
+    if cfg.get("exit_when"):
+        if "exit_to" not in cfg:
+            problems.append(f"{where}: has exit_when but no exit_to")
+        else:
+            exit = compile_transition(cfg["exit_when"], cfg["exit_to"], 1, cfg.get("exit_animation"),
+                                      cfg.get("exit_animation_cfg"), ctx, f"{where} exit", problems)
+    elif "exit_to" in cfg:
+        problems.append(f"{where}: has exit_to but no exit_when")
+
+    return CompiledState(name, cfg, tuple(on_enter), tuple(transitions), exit)
+
+
+def check_behaviour(name, cfg, problems):
+    where = f"BEHAVIOURS[{name!r}]"
+    unknown_keys(cfg, BEHAVIOUR_KEYS, where, problems)
+    if cfg.get("movement", "STATIONARY") not in MovementType.__members__:
+        problems.append(f"{where}: unknown movement {cfg.get('movement')!r}")
+
+    target = cfg.get("target")
+    if not target:
+        return
+    for axis in ("x", "y"):
+        spec = target.get(axis)
+        if not isinstance(spec, dict) or spec.get("type") not in AXIS_KEYS:
+            problems.append(f"{where} target {axis}: needs a type from {list(AXIS_KEYS)}, got {spec!r}")
+            continue
+        unknown_keys(spec, AXIS_KEYS[spec["type"]] | {"type"}, f"{where} target {axis}", problems)
+        for key in AXIS_KEYS[spec["type"]]:
+            if key == "range":
+                if not isinstance(spec.get(key), int):
+                    problems.append(f"{where} target {axis}: range {spec.get(key)!r} is not a whole number")
+            elif spec.get(key) not in BOUNDS:
+                problems.append(f"{where} target {axis}: {key} {spec.get(key)!r} is not one of {list(BOUNDS)}")
+
+
+def check_animation(name, cfg, problems):
+    where = f"ANIMATIONS[{name!r}]"
+    unknown_keys(cfg, ANIMATION_KEYS, where, problems)
+    if cfg.get("storage", "argb") not in STORAGE:
+        problems.append(f"{where}: storage {cfg.get('storage')!r} is not one of {list(STORAGE)}")
+
+    if "sheet" in cfg:
+        paths = [cfg["sheet"], cfg.get("sheet_data")]
+        if not cfg.get("sheet_data"):
+            problems.append(f"{where}: a sheet needs its sheet_data json")
+            paths = paths[:1]
+        missing = [p for p in paths if not os.path.isfile(os.path.join(BASE_DIR, p))]
+    elif "folder" in cfg:
+        missing = [] if os.path.isdir(os.path.join(BASE_DIR, cfg["folder"])) else [cfg["folder"]]
+    else:
+        problems.append(f"{where}: needs a 'folder' or a 'sheet'")
+        missing = []
+    for path in missing:
+        problems.append(f"{where}: {path} does not exist")
+
+
+def check_variable(name, cfg, problems):
+    where = f"VARIABLES[{name!r}]"
+    unknown_keys(cfg, VARIABLE_KEYS, where, problems)
+    for key in VARIABLE_KEYS:
+        if key in cfg and not is_number(cfg[key]):
+            problems.append(f"{where}: {key} {cfg[key]!r} is not a number")
+
+
+def load_configs(states, animations, variables, behaviours=BEHAVIOURS, initial=None, sources=DATA_FILES):
+    # -> {state name: CompiledState}, or ConfigError with every problem found
+    problems = []
+    for path in sources:
+        problems += duplicate_keys(path)
+
+    if initial is not None and initial not in states:
+        problems.append(f"initial state {initial!r} is not in STATES")
+    for name, cfg in behaviours.items():
+        check_behaviour(name, cfg, problems)
+    for name, cfg in animations.items():
+        check_animation(name, cfg, problems)
+    for name, cfg in variables.items():
+        check_variable(name, cfg, problems)
+
+    ctx = (states, animations, variables)
+    compiled = {name: compile_state(name, cfg, ctx, behaviours, problems) for name, cfg in states.items()}
+
+    if problems:
+        raise ConfigError(problems)
+    return compiled
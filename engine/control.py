@@ -0,0 +1,192 @@
+# engine/control.py
+# Opt-in local control socket: look at and poke a running pet without a debugger. A unix domain socket served by an
+# asyncio loop on its own thread, one command per line, a batch ends with an empty line (or the client closing its side),
+# the reply is one line per command (metrics is several) followed by an empty line.
+#   metrics              prometheus text: state, flags, pulses, variables, tick / paint / cache stats
+#   pulse CLICK          raise a pulse for the next tick
+#   set worrying_meter 60
+#   state ROLL           switch state right away
+#   trace                write the trace ring buffer (engine/trace.py) to its file, reply is the path
+#   trace state,pulse    switch trace categories ("all", "none")
+# e.g.  printf 'set worrying_meter 60\npulse CLICK\n' | nc -NU /tmp/desktop_pet.sock
+# The socket thread never touches the pet. Batches go into a deque (append / popleft are atomic, no locks) that the Qt
+# thread drains once per timer callback, replies go back to the socket thread through the loop.
+
+import os, asyncio, tempfile, threading
+from collections import deque
+
+from engine.enums import Flag, Pulse
+from engine import trace
+
+
+def escape_label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def prometheus(metrics):  # [(name, type, help, [(labels, value) or (labels, value, suffix)])] -> prometheus text exposition format
+    lines = []                # suffix goes on the sample name, "_sum" / "_count" of a summary
+    for name, kind, help_text, samples in metrics:
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+        for labels, value, *suffix in samples:
+            sample = name + (suffix[0] if suffix else "")
+            if labels:
+                label_text = ",".join(f'{k}="{escape_label(v)}"' for k, v in labels.items())
+                lines.append(f"{sample}{{{label_text}}} {value}")
+            else:
+                lines.append(f"{sample} {value}")
+    return "\n".join(lines)
+
+
+def engine_metrics(engine):  # what the simulation itself can tell
+    runtime = engine.state_machine.state
+    return [
+        ("pet_state", "gauge", "1 for the current state", [({"state": name}, int(name == engine.state_name)) for name in engine.states]),
+        ("pet_in_transition", "gauge", "1 while a transition animation plays", [({}, int(engine.state_machine.in_transition))]),
+        ("pet_flag", "gauge", "1 for raised flags", [({"flag": f.name}, int(f in runtime.flags)) for f in Flag]),
+        ("pet_pulse", "gauge", "1 for pulses waiting for the next tick", [({"pulse": p.name}, int(p in runtime.pulses)) for p in Pulse]),
+        ("pet_variable", "gauge", "VariableManager values", [({"name": name}, value) for name, value in engine.variables.values.items()]),
+        ("pet_simulated_seconds_total", "counter", "simulated time", [({}, round(engine.time, 3))]),
+    ]
+
+
+def execute(engine, line, metrics):  # one command line -> reply text, runs on the Qt thread
+    words = line.split()
+    if not words:
+        return "error: empty command"
+
+    command, args = words[0].lower(), words[1:]
+    try:
+        if command == "metrics":
+            return metrics()
+        if command == "pulse" and len(args) == 1:
+            engine.raise_pulse(args[0])
+            return "ok"
+        if command == "set" and len(args) == 2:
+            engine.set_variable(args[0], float(args[1]))
+            return "ok"
+        if command == "state" and len(args) == 1:
+            engine.force_state(args[0])
+            return "ok"
+        if command == "trace" and not args:
+            return trace.dump()
+        if command == "trace" and len(args) == 1:
+            trace.enable(args[0])
+            return "ok"
+    except ValueError as e:
+        return f"error: {e}"
+    except Exception as e:  # a bug in one command shouldnt take the timer callback (and the client waiting on it) down
+        return f"error: {type(e).__name__}: {e}"
+
+    return f"error: unknown command '{line}' (metrics, pulse NAME, set VARIABLE VALUE, state NAME, trace [CATEGORIES])"
+
+
+class ControlServer:
+    def __init__(self, path, wake=None):
+        self.path = path
+        self.wake = wake  # called on the socket thread after queueing a batch, has to be thread safe (a queued Qt signal)
+        self.queue = deque()  # (lines, future) batches waiting for the Qt thread
+
+        self.loop = None
+        self.server = None
+        self.thread = None
+        self.ready = threading.Event()
+
+        self.connections = 0
+        self.batches = 0
+        self.commands = 0
+
+    def start(self):  # False where there are no unix sockets (windows)
+        if not hasattr(asyncio, "start_unix_server"):
+            print("[CONTROL] no unix domain sockets on this platform, control socket off")
+            return False
+
+        self.thread = threading.Thread(target=self._run, name="pet-control", daemon=True)
+        self.thread.start()
+        self.ready.wait(2)
+        return self.server is not None
+
+    def stop(self):
+        if self.loop and self.server:
+            self.loop.call_soon_threadsafe(self.server.close)
+        if self.path and os.path.exists(self.path):
+            os.unlink(self.path)
+
+    def drain(self, handle):  # Qt thread: runs every waiting batch through handle(line) -> reply
+        while self.queue:
+            lines, future = self.queue.popleft()
+            replies = []
+            try:
+                for line in lines:
+                    replies.append(handle(line))
+            finally:  # the client awaits this future, it gets resolved even when handle raises
+                replies += ["error: batch failed on the pet side"] * (len(lines) - len(replies))
+                self.batches += 1
+                self.commands += len(lines)
+                self.loop.call_soon_threadsafe(self._reply, future, replies)  # type: ignore
+
+    @staticmethod
+    def _reply(future, replies):
+        if not future.done():  # client may be gone
+            future.set_result(replies)
+
+    def _run(self):  # socket thread
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        try:
+            self.loop.run_until_complete(self._serve())
+        except Exception as e:
+            print(f"[CONTROL] stopped: {e}")
+        finally:
+            self.ready.set()
+
+    async def _serve(self):
+        # only this user can drive the pet. the socket is bound inside a fresh 0700 directory and only moved to its path
+        # once it is 0600, a chmod after binding would leave it open to everyone for a moment (and os.umask is per process)
+        private = tempfile.mkdtemp(prefix=".pet-control-", dir=os.path.dirname(os.path.abspath(self.path)))
+        bound = os.path.join(private, "sock")
+        try:
+            self.server = await asyncio.start_unix_server(self._client, path=bound)
+            os.chmod(bound, 0o600)
+            os.replace(bound, self.path)  # also replaces one left over from a crash
+        finally:
+            if os.path.exists(bound):
+                os.unlink(bound)
+            os.rmdir(private)
+        print(f"[CONTROL] listening on {self.path}")
+        self.ready.set()
+        try:
+            await self.server.serve_forever()
+        except asyncio.CancelledError:
+            pass
+
+    async def _client(self, reader, writer):
+        self.connections += 1
+        try:
+            while True:
+                lines = []
+                while True:  # one batch, up to an empty line or the end
+                    raw = await reader.readline()
+                    line = raw.decode("utf-8", "replace").strip()
+                    if not line:
+                        break
+                    lines.append(line)
+
+                if lines:
+                    future = self.loop.create_future()  # type: ignore
+                    self.queue.append((lines, future))
+                    if self.wake:
+                        self.wake()
+                    replies = await future
+                    writer.write(("\n".join(replies) + "\n\n").encode("utf-8"))
+                    await writer.drain()
+
+                if not raw:  # client closed its side
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    def stats(self):
+        return {"connections": self.connections, "batches": self.batches, "commands": self.commands, "waiting": len(self.queue)}
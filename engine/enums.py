@@ -29,4 +29,14 @@ class MovementType(Enum):
 
 class Facing(Enum):
     LEFT = auto()
-    RIGHT = auto()
\ No newline at end of file
+    RIGHT = auto()
+
+class Presence(Enum):
+    ACTIVE = auto()  # someone is using the computer and can see the pet
+    AWAY = auto()    # no input for a long time
+    HIDDEN = auto()  # screen locked or a fullscreen app covers the pet
+
+class ThrottleMode(Enum):
+    FULL = auto()    # normal ticking
+    LOW = auto()     # wakes up at throttle_low_fps, simulation still runs every step
+    FROZEN = auto()  # nothing animates or moves, only variable timers keep counting
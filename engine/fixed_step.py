@@ -0,0 +1,77 @@
+# engine/fixed_step.py
+# Fixed timestep on a monotonic clock. QTimer fires roughly every 16 ms (never exactly 1/60 s, later under load),
+# so instead of pretending every callback is one tick the real elapsed time is accumulated and spent in whole steps.
+# Catch-up is capped so a long stall (debugger, sleep, heavy load) doesnt turn into a spiral of death.
+
+import time
+
+from data.render_config import RENDER_CONFIG
+
+MAX_CATCHUP_STEPS = RENDER_CONFIG.get("max_catchup_steps", 5)  # most steps run in one callback, the rest of the backlog is dropped
+
+
+class FixedStep:
+    def __init__(self, fps, max_steps=MAX_CATCHUP_STEPS, clock=time.perf_counter):
+        self.dt = 1 / fps
+        self.max_steps = max(1, max_steps)
+        self.clock = clock
+
+        self.start = self.clock()
+        self.last = self.start
+        self.accumulator = 0.0
+
+        # stats
+        self.callbacks = 0
+        self.steps = 0
+        self.late_callbacks = 0  # came more than one and a half steps after the previous one
+        self.dropped_steps = 0
+        self.longest_gap = 0.0
+
+    def advance(self, planned=0):  # how many fixed steps to simulate right now. planned = steps deliberately slept through, never dropped
+        now = self.clock()
+        gap = now - self.last
+        self.last = now
+
+        self.callbacks += 1
+        self.longest_gap = max(self.longest_gap, gap)
+        if gap > self.dt * (planned + 1.5):
+            self.late_callbacks += 1
+
+        self.accumulator += gap
+        steps = int(self.accumulator / self.dt)
+
+        max_steps = self.max_steps + planned
+        if steps > max_steps:  # too far behind, give up on the backlog instead of catching up forever
+            self.dropped_steps += steps - max_steps
+            steps = max_steps
+            self.accumulator = self.accumulator % self.dt
+        else:
+            self.accumulator -= steps * self.dt
+
+        self.steps += steps
+        return steps
+
+    def steps_by(self, sleep):  # steps that will be due after sleeping that long
+        return max(0, int((self.accumulator + (self.clock() - self.last) + sleep) / self.dt))
+
+    def time_until(self, steps):  # wall seconds until `steps` more steps are due
+        return steps * self.dt - self.accumulator - (self.clock() - self.last)
+
+    def alpha(self):  # 0..1, how far the wall clock is into the next step (for interpolating the display)
+        pending = self.accumulator + (self.clock() - self.last)
+        return min(max(pending / self.dt, 0.0), 1.0)
+
+    def stats(self):
+        wall = self.last - self.start
+        simulated = self.steps * self.dt
+        return {
+            "wall_s": wall,
+            "simulated_s": simulated,
+            "drift_s": wall - simulated - self.dropped_steps * self.dt,  # stays under one step, the rest is still in the accumulator
+            "fixed_dt_drift_s": wall - self.callbacks * self.dt,  # what one-step-per-callback would have drifted
+            "callbacks": self.callbacks,
+            "steps": self.steps,
+            "late_callbacks": self.late_callbacks,
+            "dropped_steps": self.dropped_steps,
+            "longest_gap_ms": self.longest_gap * 1000,
+        }
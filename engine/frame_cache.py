@@ -0,0 +1,163 @@
+# engine/frame_cache.py
+# On-disk cache of already decoded and scaled frames, so relaunching the pet doesnt inflate every png again.
+#
+# file layout:
+#   8 bytes   magic
+#   4 bytes   index length (little endian uint32)
+#   n bytes   index (json): {"entries": {anim_name: {"key": {...}, "frames": [[offset, w, h, bytes_per_line], ...]}}}
+#   ...       raw premultiplied ARGB32 pixel data, offsets are from the start of the file
+#
+# on a warm start the file is memory-mapped and every frame is a QImage wrapping the mapping (no copying, no inflating)
+
+import os, json, mmap, struct, threading
+from PySide6.QtGui import QImage
+
+MAGIC = b"PETFRM01"
+HEADER = struct.Struct("<8sI")
+ALIGN = 16
+FORMAT = QImage.Format_ARGB32_Premultiplied  # type: ignore # has to match what frame_store decodes to
+
+
+def source_key(files, scale, dpr):  # anything that changes the decoded pixels has to be in here
+    sources = []
+    for path in files:
+        st = os.stat(path)
+        sources.append([os.path.basename(path), st.st_mtime_ns, st.st_size])
+
+    return {
+        "sources": sources,
+        "scale": round(scale, 6),
+        "dpr": round(dpr, 6),
+        "format": int(FORMAT.value),
+    }
+
+
+class FrameCache:
+    def __init__(self, path):
+        self.path = path
+
+        self.entries = {}   # name -> index entry of the file currently mapped
+        self.pending = {}   # name -> (key, [QImage]) decoded this session, not on disk yet
+        self.dirty = False
+        self.lock = threading.Lock()  # store() and flush() can run on prefetch worker threads
+
+        self.hits = 0
+        self.misses = 0
+
+        self._file = None
+        self._map = None
+        self._view = None
+
+        self._open()
+
+    def _open(self):
+        new_path = self.path + ".new"
+        if os.path.exists(new_path):  # a previous run couldnt replace the mapped file (windows), finish that now
+            try:
+                os.replace(new_path, self.path)
+            except OSError:
+                pass
+
+        if not os.path.exists(self.path):
+            return
+
+        try:
+            self._file = open(self.path, "rb")
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            magic, index_len = HEADER.unpack_from(self._map, 0)
+            if magic != MAGIC:
+                raise ValueError("bad magic")
+
+            index = json.loads(bytes(self._map[HEADER.size:HEADER.size + index_len]))
+            self.entries = index["entries"]
+            self._view = memoryview(self._map)
+
+        except (OSError, ValueError, KeyError, struct.error) as e:
+            print(f"[FRAME CACHE] ignoring unreadable cache file {self.path}: {e}")
+            self.entries = {}
+            self._close()
+
+    def _close(self):
+        if self._map is not None and self._view is None:
+            self._map.close()  # cant close once QImages wrap it, then the mapping just lives until exit
+        if self._file is not None:
+            self._file.close()
+        self._map = None
+        self._file = None
+
+    def lookup(self, name, key):  # list of QImage or None if missing or out of date
+        entry = self.entries.get(name)
+        if entry is None or entry["key"] != key or self._view is None:
+            self.misses += 1
+            return None
+
+        images = []
+        for offset, w, h, bpl in entry["frames"]:
+            images.append(QImage(self._view[offset:offset + bpl * h], w, h, bpl, FORMAT))
+
+        self.hits += 1
+        return images
+
+    def store(self, name, key, images):
+        images = [img.convertToFormat(FORMAT) for img in images]
+        with self.lock:
+            self.pending[name] = (key, images)
+            self.dirty = True
+
+    def flush(self, force=False):  # writes mapped entries that are still valid plus everything decoded this session
+        with self.lock:
+            if self.dirty or force:
+                self._write()
+            self.dirty = False
+
+    def _write(self):
+        blobs = []  # (name, key, [(w, h, bpl, bytes)])
+        for name, entry in self.entries.items():
+            if name in self.pending:
+                continue
+            frames = [(w, h, bpl, self._view[offset:offset + bpl * h]) for offset, w, h, bpl in entry["frames"]]  # type: ignore
+            blobs.append((name, entry["key"], frames))
+
+        for name, (key, images) in self.pending.items():
+            frames = [(img.width(), img.height(), img.bytesPerLine(), img.constBits()[:img.bytesPerLine() * img.height()]) for img in images]
+            blobs.append((name, key, frames))
+
+        # offsets depend on the index length, so lay out the data first with a guessed index size and fix it up
+        entries = {}
+        index_len = 0
+        while True:
+            offset = HEADER.size + index_len
+            offset += -offset % ALIGN
+            entries = {}
+            for name, key, frames in blobs:
+                rows = []
+                for w, h, bpl, _ in frames:
+                    rows.append([offset, w, h, bpl])
+                    offset += bpl * h
+                    offset += -offset % ALIGN
+                entries[name] = {"key": key, "frames": rows}
+
+            index = json.dumps({"entries": entries}).encode()
+            if len(index) <= index_len:
+                break
+            index_len = len(index) + 256
+
+        index = index.ljust(index_len, b" ")
+
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(HEADER.pack(MAGIC, index_len))
+            f.write(index)
+            for name, key, frames in blobs:
+                for (w, h, bpl, data), (offset, *_) in zip(frames, entries[name]["frames"]):
+                    f.write(b"\0" * (offset - f.tell()))
+                    f.write(data)
+
+        try:
+            os.replace(tmp_path, self.path)
+        except OSError:  # windows wont replace a file that is still mapped, swap it in on the next start
+            os.replace(tmp_path, self.path + ".new")
+
+        total_kb = sum(bpl * h for _, _, frames in blobs for _, h, bpl, _ in frames) / 1024
+        print(f"[FRAME CACHE] wrote {len(blobs)} animations ({total_kb:.0f} KB) to {self.path}")
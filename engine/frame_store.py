@@ -0,0 +1,545 @@
+# engine/frame_store.py
+# Loads animation frames already scaled to the size they are drawn at, so paintEvent can just blit them.
+# Keeps a small mipmap chain (base scale, 1/2, 1/4 ...) per animation so other scales dont need the pngs again
+# Animations are loaded on demand, prefetch() decodes them on a pool of worker threads ahead of time (one task per frame)
+# Stays under a memory budget by evicting the least recently played animations, they get loaded again when needed
+# Pixmaps are cropped to their visible (alpha) bounds and identical frames share one pixmap, even across animations
+# Animations with "storage": "indexed" keep frames as a palette + alpha plane and expand only the few drawn recently,
+# their mipmap chain is kept the same way and only expanded when the frames get rebuilt for a new scale
+# Animations can also be a single spritesheet + aseprite json, then every frame is a rectangle of one shared pixmap
+
+import os, sys, math, hashlib
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from PySide6.QtGui import QImage, QImageReader, QPixmap
+from PySide6.QtCore import QSize, QPointF, QRectF, Qt
+
+from data.render_config import RENDER_CONFIG
+from engine.frame_cache import source_key
+from engine.animation_files import AnimationFiles
+
+MIPMAP_LEVELS = RENDER_CONFIG.get("mipmap_levels", 3)  # base level + halvings kept in memory
+FRAME_CACHE_MB = RENDER_CONFIG.get("frame_cache_mb", 64)  # memory budget for decoded frames (all mipmap levels + pixmaps)
+DECODE_WORKERS = RENDER_CONFIG.get("decode_workers", 0) or os.cpu_count() or 1  # 0 = one per core
+TRIM_FRAMES = RENDER_CONFIG.get("trim_frames", True)
+INDEXED_HOT_FRACTION = RENDER_CONFIG.get("indexed_hot_fraction", 0.25)  # share of an "indexed" animation kept expanded
+POLL_INTERVAL = 0.05  # seconds between poll() calls while background decodes are running, when the pet isnt ticking anyway
+
+ALPHA_BYTE = 3 if sys.byteorder == "little" else 0  # ARGB32 is stored as native uint32, alpha is the high byte
+
+
+class Frame:  # single displayable frame. width and height are the untrimmed size in logical (widget) pixels
+    __slots__ = ("pixmap", "width", "height", "trim_x", "trim_y", "key", "compact", "hot", "rect")
+
+    def __init__(self, pixmap, width, height, trim_x=0.0, trim_y=0.0, key=None, compact=None, hot=None, rect=None):
+        self.pixmap = pixmap  # already scaled, cropped to the visible part. None for compact frames
+        self.width = width
+        self.height = height
+        self.trim_x = trim_x  # where the cropped pixmap sits inside the untrimmed frame, logical pixels
+        self.trim_y = trim_y
+        self.key = key  # content hash, frames with the same key share the pixmap
+        self.compact = compact  # IndexedImage for "indexed" storage
+        self.hot = hot  # HotSet that expands compact frames
+        self.rect = rect  # QRectF inside the pixmap (physical pixels) for spritesheet frames, None = whole pixmap
+
+    def get_pixmap(self):
+        if self.pixmap is not None:
+            return self.pixmap
+        return self.hot.get(self.key, self.compact)
+
+    def draw(self, painter, x, y):  # top-left corner of the untrimmed frame at (x, y), no scaling
+        if self.rect is not None:
+            painter.drawPixmap(QPointF(x + self.trim_x, y + self.trim_y), self.pixmap, self.rect)
+            return
+        painter.drawPixmap(QPointF(x + self.trim_x, y + self.trim_y), self.get_pixmap())
+
+    def nbytes(self):
+        if self.compact is not None:
+            return self.compact.nbytes()
+        if self.rect is not None:  # its share of the spritesheet
+            return int(self.rect.width() * self.rect.height()) * self.pixmap.depth() // 8
+        return self.pixmap.width() * self.pixmap.height() * self.pixmap.depth() // 8
+
+
+class IndexedImage:  # up to 256 opaque colors + a separate 8 bit alpha plane, 2 bytes per pixel instead of 4
+    __slots__ = ("index", "alpha")
+
+    def __init__(self, index, alpha):
+        self.index = index  # QImage Format_Indexed8
+        self.alpha = alpha  # QImage Format_Alpha8
+
+    def expand(self):  # back to the exact premultiplied ARGB pixels
+        image = self.index.convertToFormat(QImage.Format_ARGB32)  # type: ignore
+        image.setAlphaChannel(self.alpha)
+        return image.convertToFormat(QImage.Format_ARGB32_Premultiplied)  # type: ignore
+
+    def nbytes(self):
+        return image_bytes(self.index) + image_bytes(self.alpha) + 4 * self.index.colorCount()
+
+    def expanded_bytes(self):
+        return self.index.width() * self.index.height() * 4
+
+
+class HotSet:  # the few compact frames of one animation drawn recently, expanded back to ARGB pixmaps
+    def __init__(self, capacity, dpr=1.0):
+        self.capacity = capacity
+        self.dpr = dpr
+        self.items = OrderedDict()  # content key -> QPixmap, least recently drawn first
+        self.reserved = 0  # bytes the expanded pixmaps can take at most, counted in the FrameStore budget
+        self.expansions = 0
+
+    def get(self, key, compact):
+        pix = self.items.get(key)
+        if pix is not None:
+            self.items.move_to_end(key)
+            return pix
+
+        pix = QPixmap.fromImage(compact.expand())
+        pix.setDevicePixelRatio(self.dpr)
+        self.items[key] = pix
+        self.expansions += 1
+
+        if len(self.items) > self.capacity:
+            self.items.popitem(last=False)
+        return pix
+
+    def clear(self):
+        self.items.clear()
+
+
+def decode_scaled(path, scale):  # decodes a png straight to the target size (scale is relative to the source file)
+    reader = QImageReader(path)
+    src = reader.size()
+    w = max(1, round(src.width() * scale))
+    h = max(1, round(src.height() * scale))
+
+    if (w, h) != (src.width(), src.height()):
+        reader.setScaledSize(QSize(w, h))
+
+    image = reader.read()
+    if image.isNull():
+        raise RuntimeError(f"Could not decode frame '{path}': {reader.errorString()}")
+
+    return image.convertToFormat(QImage.Format_ARGB32_Premultiplied)  # type: ignore # fastest format for blitting
+
+
+def image_bytes(image):
+    return image.bytesPerLine() * image.height()
+
+
+def chain_bytes(image):  # a mipmap chain image, QImage or IndexedImage
+    return image.nbytes() if isinstance(image, IndexedImage) else image_bytes(image)
+
+
+def chain_image(image):  # ARGB QImage of a mipmap chain image, to scale and trim from
+    return image.expand() if isinstance(image, IndexedImage) else image
+
+
+def half_image(image):  # next mipmap level
+    return image.scaled(
+        max(1, image.width() // 2), max(1, image.height() // 2),
+        Qt.IgnoreAspectRatio, Qt.SmoothTransformation  # type: ignore
+    )
+
+
+def alpha_bounds(image):  # (x, y, w, h) of the non transparent part of an ARGB32 image, None if fully transparent
+    data = bytes(image.constBits())
+    bpl = image.bytesPerLine()
+    row_len = image.width() * 4
+
+    top = None
+    bottom = 0
+    left = image.width()
+    right = 0
+
+    for y in range(image.height()):
+        alpha = data[y * bpl + ALPHA_BYTE:y * bpl + row_len:4]
+        stripped = alpha.lstrip(b"\0")
+        if not stripped:
+            continue
+
+        if top is None:
+            top = y
+        bottom = y
+        left = min(left, len(alpha) - len(stripped))
+        right = max(right, len(alpha.rstrip(b"\0")))
+
+    if top is None:
+        return None
+    return left, top, right - left, bottom - top + 1
+
+
+def content_key(image):  # identical pixels -> identical key
+    h = hashlib.blake2b(digest_size=16)
+    h.update(b"%d,%d," % (image.width(), image.height()))
+    h.update(image.constBits())
+    return h.digest()
+
+
+def compact_indexed(image):  # premultiplied ARGB32 -> IndexedImage, None if that would lose anything
+    straight = image.convertToFormat(QImage.Format_ARGB32)  # type: ignore
+    index = straight.convertToFormat(QImage.Format_RGB32).convertToFormat(  # type: ignore
+        QImage.Format_Indexed8, Qt.ThresholdDither | Qt.AvoidDither | Qt.NoOpaqueDetection  # type: ignore
+    )
+    alpha = straight.convertToFormat(QImage.Format_Alpha8)  # type: ignore
+    compact = IndexedImage(index, alpha)
+
+    if compact.expand() != image:  # more than 256 colors, qt had to reduce the palette
+        return None
+    return compact
+
+
+def build_mip_levels(image, levels):  # [image, image/2, image/4 ...]
+    result = [image]
+    for _ in range(levels - 1):
+        result.append(half_image(result[-1]))
+    return result
+
+
+def pick_level(base_scale, target, levels):  # smallest mipmap level that is still at least as big as the target
+    level = 0
+    while level + 1 < levels and base_scale / (2 ** (level + 1)) >= target:
+        level += 1
+    return level, base_scale / (2 ** level)
+
+
+def prepare_frame(img, level_scale, target, dpr, storage):  # everything up to the pixmap, QImage only so its thread-safe
+    if abs(level_scale - target) > 1e-6:  # in between two levels, scale down from the bigger one once
+        img = img.scaled(
+            max(1, round(img.width() * target / level_scale)),
+            max(1, round(img.height() * target / level_scale)),
+            Qt.IgnoreAspectRatio, Qt.SmoothTransformation  # type: ignore
+        )
+
+    w = img.width() / dpr
+    h = img.height() / dpr
+
+    trim_x = trim_y = 0
+    if TRIM_FRAMES:
+        bounds = alpha_bounds(img)
+        if bounds is None:
+            bounds = (0, 0, 1, 1)  # fully transparent, keep a single pixel
+        trim_x, trim_y, trim_w, trim_h = bounds
+        if (trim_w, trim_h) != (img.width(), img.height()):
+            img = img.copy(trim_x, trim_y, trim_w, trim_h)
+
+    key = content_key(img)
+    payload = img
+    if storage == "indexed":
+        payload = compact_indexed(img) or img  # falls back to ARGB
+
+    return payload, w, h, trim_x / dpr, trim_y / dpr, key, image_bytes(img), None
+
+
+def prepare_sheet(img, level_scale, target, dpr, sheet):  # one image for the whole animation, frames are rectangles of it
+    if abs(level_scale - target) > 1e-6:
+        img = img.scaled(
+            max(1, round(img.width() * target / level_scale)),
+            max(1, round(img.height() * target / level_scale)),
+            Qt.IgnoreAspectRatio, Qt.SmoothTransformation  # type: ignore
+        )
+
+    key = content_key(img)
+    prepared = []
+    for x, y, w, h, source_w, source_h, offset_x, offset_y, _ in sheet:
+        # rounding both edges keeps neighbouring frames from overlapping. without padding in the sheet
+        # the smooth downscale can bleed a pixel of the neighbour into the edge
+        left, top = round(x * target), round(y * target)
+        rect = QRectF(left, top, max(1, round((x + w) * target) - left), max(1, round((y + h) * target) - top))
+        prepared.append((
+            img, round(source_w * target) / dpr, round(source_h * target) / dpr, round(offset_x * target) / dpr, round(offset_y * target) / dpr,
+            key, int(rect.width() * rect.height()) * 4, rect
+        ))
+    return prepared
+
+
+def decode_and_prepare(source, scale, levels, target, dpr, storage, sheet=None):
+    # worker task for a png (one frame, or one spritesheet) -> (ARGB base image for the frame cache, mipmap chain, prepared frames)
+    image = decode_scaled(source, scale) if isinstance(source, str) else source  # png path, or an image from the frame cache
+    mips = build_mip_levels(image, levels)
+    level, level_scale = pick_level(scale, target, levels)
+
+    if sheet is not None:
+        return image, mips, prepare_sheet(mips[level], level_scale, target, dpr, sheet)
+
+    prepared = [prepare_frame(mips[level], level_scale, target, dpr, storage)]
+    if storage == "indexed":  # the chain stays resident too, keep it compact where that is lossless
+        mips = [compact_indexed(img) or img for img in mips]
+    return image, mips, prepared
+
+
+class FrameStore(AnimationFiles):  # file / size lookups (files, sheet, source_size, ...) come from AnimationFiles
+    def __init__(self, base_dir, configs, cache=None):
+        super().__init__(base_dir, configs)
+        self.cache = cache  # optional FrameCache (engine/frame_cache.py) with already decoded frames
+
+        self.scale = 1.0  # pet scale (drawn logical size / source size)
+        self.dpr = 1.0    # device pixel ratio, pixmaps are rendered at scale * dpr physical pixels
+
+        self.base_scale = None  # scale the mipmap chains were decoded at
+        self.chains = {}  # name -> list of levels, each level is a list of QImage (level 0 = base_scale)
+        self.frames = {}  # name -> list of Frame at the current scale
+        self.bounds = {}  # name -> (max_w, max_h) in logical pixels
+
+        self.executor = None  # decoding pool, created on the first load
+        self.jobs = {}  # name -> (cache key or None if it came from the cache, [Future per frame]), not turned into pixmaps yet
+
+        self.budget = int(FRAME_CACHE_MB * 1024 * 1024)
+        self.sizes = OrderedDict()  # name -> bytes held, least recently played first
+        self.in_use = set()  # never evicted: current animation and whatever the state machine is about to play
+
+        self.shared = {}  # content key -> [QPixmap or IndexedImage, number of frames using it]
+        self.hot = {}  # name -> HotSet of "indexed" animations
+        self.new_pixmaps = 0
+        self.new_bytes = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def set_scale(self, scale, dpr=1.0):  # called whenever the pet scale or the screen dpi changes
+        if scale == self.scale and dpr == self.dpr and self.frames:
+            return
+
+        self.scale = scale
+        self.dpr = dpr
+
+        target = scale * dpr
+        if self.base_scale is None or target > self.base_scale:  # cant upscale from the chain without losing quality, decode again
+            self.base_scale = target
+            self.chains.clear()
+            self.frames.clear()
+            self.shared.clear()
+            self.bounds.clear()
+            self.sizes.clear()
+
+        self.hot.clear()  # the frames get rebuilt below with new ones
+        self.jobs.clear()  # anything still decoding was prepared for the old size, let it finish and forget it
+
+        for name in list(self.chains):
+            self._build_frames(name)
+
+    def load(self, name):  # makes sure the animation is ready to play, blocks if it has to
+        if name in self.chains:
+            return
+
+        if name not in self.jobs:
+            self._submit(name)
+
+        self._finish(name, *self.jobs.pop(name))  # waits for the pool, frames decode in parallel
+
+    def prefetch(self, names):  # starts decoding animations in the background, nearest first
+        for name in names:
+            if name in self.chains or name in self.jobs or name not in self.configs:
+                continue
+            self._submit(name)
+
+    def poll(self):  # called once per tick, picks up at most one finished background decode so a tick never stalls
+        for name, (key, futures) in self.jobs.items():
+            if all(f.done() for f in futures):
+                del self.jobs[name]
+                self._finish(name, key, futures)
+                break
+
+        if not self.jobs and self.cache is not None and self.cache.dirty and self.executor is not None:
+            self.cache.dirty = False  # flushing on the pool, dont queue it twice
+            self.executor.submit(self.cache.flush, True)
+
+    def next_deadline(self):  # background decodes or a cache flush waiting to be picked up by poll()
+        if self.jobs or (self.cache is not None and self.cache.dirty and self.executor is not None):
+            return POLL_INTERVAL
+        return None
+
+    def get(self, name):  # list of Frame for the animation at the current scale, counts as playing it
+        if name in self.frames:
+            self.hits += 1
+        else:
+            self.misses += 1
+            self.load(name)
+
+        self.sizes.move_to_end(name)
+        return self.frames[name]
+
+    def set_in_use(self, names):
+        self.in_use = {name for name in names if name}
+        self._enforce_budget()
+
+    def used_bytes(self):
+        return sum(self.sizes.values())
+
+    def stats(self):
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "loaded": len(self.chains),
+            "used_bytes": self.used_bytes(),
+            "budget_bytes": self.budget,
+        }
+
+    def evict(self, name):
+        self.chains.pop(name, None)
+        self._release(self.frames.pop(name, []))
+        self.bounds.pop(name, None)
+        hot = self.hot.pop(name, None)
+        if hot is not None:
+            hot.clear()
+        freed = self.sizes.pop(name, 0)
+        self.evictions += 1
+        print(f"[ANIM EVICT] {name}: freed {freed / 1024:.0f} KB")
+
+    def _release(self, frames):  # drops shared pixmaps nothing uses anymore
+        for f in frames:
+            entry = self.shared.get(f.key)
+            if entry is None:
+                continue
+            entry[1] -= 1
+            if entry[1] <= 0:
+                del self.shared[f.key]
+
+    def _enforce_budget(self, keep=None):  # keep: the animation just loaded, get() / get_bounds() are about to return it
+        used = self.used_bytes()
+        for name in list(self.sizes):  # oldest first
+            if used <= self.budget:
+                break
+            if name in self.in_use or name == keep:
+                continue
+            used -= self.sizes[name]
+            self.evict(name)
+
+    def get_bounds(self, name):
+        if name not in self.bounds:
+            self.load(name)
+        return self.bounds[name]
+
+    def _submit(self, name):  # puts every frame of the animation on the decoding pool
+        if self.base_scale is None:
+            self.base_scale = self.scale * self.dpr
+
+        if self.executor is None:
+            self.executor = ThreadPoolExecutor(max_workers=DECODE_WORKERS, thread_name_prefix="frame_decode")
+
+        files = self.files(name)
+        key = None
+        cached = None
+
+        if self.cache is not None:
+            # main thread only, QImages wrapping the mapped cache file made on a worker crashed shiboken at exit
+            key = source_key(files, self.base_scale, self.dpr)
+            cached = self.cache.lookup(name, key)
+
+        sheet = self.sheet(name)
+        sources = files[:1] if sheet else files  # a spritesheet is a single decode
+        if cached is not None:
+            sources = cached
+            key = None  # nothing new to write back
+
+        storage = self.configs[name].get("storage", "argb")
+        target = self.scale * self.dpr
+        futures = [
+            self.executor.submit(decode_and_prepare, source, self.base_scale, MIPMAP_LEVELS, target, self.dpr, storage, sheet)
+            for source in sources
+        ]
+        self.jobs[name] = (key, futures)
+
+    def _finish(self, name, key, futures):  # main thread only, pixmaps cant be made anywhere else
+        results = [f.result() for f in futures]  # same order as the sorted file names
+        chain = [list(level) for level in zip(*(mips for _, mips, _ in results))]
+
+        if key is not None:
+            self.cache.store(name, key, [base for base, _, _ in results])  # type: ignore
+
+        self.chains[name] = chain
+        prepared = [p for _, _, frames in results for p in frames]
+        self._make_frames(name, prepared)
+
+        frames = self.frames[name]
+        full_kb = sum(round(f.width * self.dpr) * round(f.height * self.dpr) * 4 for f in frames) / 1024
+        size_kb = self.new_bytes / 1024  # shared pixmaps that already existed cost nothing
+        print(f"[ANIM LOAD] {name}: {len(frames)} frames ({self.new_pixmaps} unique), {full_kb:.0f} KB -> {size_kb:.0f} KB after trimming and sharing, saved {full_kb - size_kb:.0f} KB")
+
+        if self.configs[name].get("storage", "argb") == "indexed":
+            self._report_storage(name, prepared)
+
+        self._enforce_budget(keep=name)
+
+    def _report_storage(self, name, prepared):  # what an indexed animation keeps resident, against all ARGB
+        chain = self.chains[name]
+        unique = {p[5]: p for p in prepared}.values()  # frames sharing pixels are stored once
+
+        # all ARGB: every chain level (halvings of the base) + one pixmap per unique frame, no hot set needed
+        argb_chain = sum(img.index.width() * img.index.height() * 4 if isinstance(img, IndexedImage) else image_bytes(img)
+                         for level in chain for img in level)
+        argb_frames = sum(p[6] for p in unique)
+        # indexed: compact chain + compact frames + the expanded pixmaps the hot set can hold of this animation
+        chain_now = sum(chain_bytes(img) for level in chain for img in level)
+        frames_now = sum(p[0].nbytes() if isinstance(p[0], IndexedImage) else p[6] for p in unique)
+        hot = self.hot[name].reserved if name in self.hot else 0
+
+        before = argb_chain + argb_frames
+        after = chain_now + frames_now + hot
+        compact = sum(1 for p in prepared if isinstance(p[0], IndexedImage))
+        compact_chain = sum(1 for level in chain for img in level if isinstance(img, IndexedImage))
+        print(f"[ANIM STORAGE] {name}: indexed {compact}/{len(prepared)} frames, {compact_chain}/{sum(len(level) for level in chain)} chain images, "
+              f"resident {before / 1024:.0f} KB -> {after / 1024:.0f} KB (chain {argb_chain / 1024:.0f} -> {chain_now / 1024:.0f}, "
+              f"frames {argb_frames / 1024:.0f} -> {frames_now / 1024:.0f}, hot set up to {hot / 1024:.0f} KB)")
+
+    def _build_frames(self, name):  # rebuilds the frames of a loaded animation for a new scale, from its mipmap chain
+        target = self.scale * self.dpr
+        chain = self.chains[name]
+        level, level_scale = pick_level(self.base_scale, target, len(chain))
+        storage = self.configs[name].get("storage", "argb")
+        sheet = self.sheet(name)
+
+        if sheet:
+            prepared = prepare_sheet(chain[level][0], level_scale, target, self.dpr, sheet)
+        else:
+            prepared = [prepare_frame(chain_image(img), level_scale, target, self.dpr, storage) for img in chain[level]]
+        self._make_frames(name, prepared)
+
+    def _make_frames(self, name, prepared):
+        frames = []
+        max_w = 0
+        max_h = 0
+        self.new_pixmaps = 0  # for the load report
+        self.new_bytes = 0
+        hot = HotSet(0, self.dpr)
+
+        for payload, w, h, trim_x, trim_y, key, _, rect in prepared:
+            max_w = max(max_w, w)
+            max_h = max(max_h, h)
+
+            entry = self.shared.get(key)
+            if entry is None:
+                if isinstance(payload, IndexedImage):
+                    stored = payload
+                    self.new_bytes += payload.nbytes()
+                else:
+                    stored = QPixmap.fromImage(payload)
+                    stored.setDevicePixelRatio(self.dpr)
+                    self.new_bytes += image_bytes(payload)
+                entry = self.shared[key] = [stored, 0]
+                self.new_pixmaps += 1
+            entry[1] += 1
+
+            stored = entry[0]
+            if isinstance(stored, IndexedImage):
+                frames.append(Frame(None, w, h, trim_x, trim_y, key, compact=stored, hot=hot))
+            else:
+                frames.append(Frame(stored, w, h, trim_x, trim_y, key, rect=rect))
+
+        self._release(self.frames.get(name, []))  # old frames of this animation when rebuilding at a new scale
+        self.frames[name] = frames
+        self.bounds[name] = (max_w, max_h)
+
+        # a small share of the frames stays expanded, the biggest ones it could end up holding are counted right away
+        compact = {f.key: f.compact.expanded_bytes() for f in frames if f.compact is not None}
+        self.hot.pop(name, None)
+        if compact:
+            hot.capacity = max(1, math.ceil(len(compact) * INDEXED_HOT_FRACTION))
+            hot.reserved = sum(sorted(compact.values(), reverse=True)[:hot.capacity])
+            self.hot[name] = hot
+
+        # newly loaded (or prefetched) animations go to the recently played end, they are about to be
+        chain = self.chains[name]
+        self.sizes[name] = sum(f.nbytes() for f in frames) + sum(chain_bytes(img) for level in chain for img in level) + hot.reserved
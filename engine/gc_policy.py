@@ -0,0 +1,98 @@
+# engine/gc_policy.py
+# Keeps Python's cyclic garbage collector from pausing the pet mid animation. After startup everything loaded so far
+# (configs, frames, the engine) is moved out of the collector's way with gc.freeze(), automatic full (generation 2)
+# collections are switched off, and one runs when the pet is about to sleep anyway (an idle deadline), at most every
+# full_interval seconds, or regardless once it has been put off for max_defer. Young generations still collect on
+# their own, they are quick. Every collection's pause is timed through gc.callbacks.
+
+import gc, time
+
+from data.render_config import RENDER_CONFIG
+
+FULL_INTERVAL = RENDER_CONFIG.get("gc_full_interval", 60)  # seconds between deferred full collections
+IDLE_MIN = RENDER_CONFIG.get("gc_idle_min", 0.1)  # seconds of planned sleep needed to run one
+MAX_DEFER = RENDER_CONFIG.get("gc_max_defer", 600)  # seconds, after this it runs even without an idle moment
+NO_AUTO_FULL = 10 ** 9  # gc threshold2, young collections before an automatic full one
+
+
+class GcPolicy:
+    def __init__(self, defer_full=True, full_interval=FULL_INTERVAL, idle_min=IDLE_MIN, max_defer=MAX_DEFER, clock=time.perf_counter):
+        self.defer_full = defer_full  # False: only time the pauses, gc decides when to collect like always
+        self.full_interval = full_interval
+        self.idle_min = idle_min
+        self.max_defer = max_defer
+        self.clock = clock
+
+        self.old_threshold = None
+        self.last_full = clock()
+        self.started_at = None  # of the running collection
+        self.frozen = 0
+
+        self.collections = [0, 0, 0]  # per generation
+        self.pause_total = [0.0, 0.0, 0.0]
+        self.pause_max = [0.0, 0.0, 0.0]
+        self.deferred_runs = 0
+        self.forced_runs = 0
+
+    def install(self):
+        if self.defer_full:
+            self.old_threshold = gc.get_threshold()
+            t0, t1, _ = self.old_threshold
+            gc.set_threshold(t0, t1, NO_AUTO_FULL)
+        gc.callbacks.append(self.on_gc)
+        self.last_full = self.clock()
+
+    def uninstall(self):
+        if self.on_gc in gc.callbacks:
+            gc.callbacks.remove(self.on_gc)
+        if self.old_threshold:
+            gc.set_threshold(*self.old_threshold)
+
+    def freeze(self):  # whatever exists now is permanent, collections stop walking it
+        gc.collect()
+        gc.freeze()
+        self.frozen = gc.get_freeze_count()
+
+    def on_gc(self, phase, info):
+        if phase == "start":
+            self.started_at = self.clock()
+            return
+        if self.started_at is None:
+            return
+
+        pause = self.clock() - self.started_at
+        self.started_at = None
+        g = info["generation"]
+        self.collections[g] += 1
+        self.pause_total[g] += pause
+        if pause > self.pause_max[g]:
+            self.pause_max[g] = pause
+
+    def maybe_collect(self, idle):  # idle: seconds the pet is about to sleep. True if a full collection ran
+        if not self.defer_full:
+            return False
+
+        since = self.clock() - self.last_full
+        if since < self.full_interval:
+            return False
+
+        if idle >= self.idle_min:
+            self.deferred_runs += 1
+        elif since >= self.max_defer:
+            self.forced_runs += 1
+        else:
+            return False
+
+        gc.collect(2)
+        self.last_full = self.clock()
+        return True
+
+    def stats(self):
+        return {
+            "frozen_objects": self.frozen,
+            "collections": list(self.collections),
+            "pause_ms_total": [round(t * 1000, 2) for t in self.pause_total],
+            "pause_ms_max": [round(t * 1000, 2) for t in self.pause_max],
+            "deferred_full": self.deferred_runs,
+            "forced_full": self.forced_runs,
+        }
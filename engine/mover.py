@@ -1,5 +1,6 @@
 from engine.enums import Flag, Pulse, MovementType, Facing
 from engine.vec2 import Vec2
+from engine import trace
 import math
 
 from data.render_config import RENDER_CONFIG
@@ -9,6 +10,7 @@ class Mover:
         self.pos = Vec2()
         self.vel = Vec2()
         self.target = Vec2()
+        self.scratch = Vec2()  # working vector for the integrators, so a tick doesnt allocate any
 
         self.pet = pet
 
@@ -45,15 +47,12 @@ class Mover:
         self.jump_velocity = jump_velocity
         self.gravity = gravity
 
-    def set_position(self, x=0.0, y=None): 
-        if y is None and isinstance(x, Vec2):
-            self.pos = x
-        else:
-            self.pos = Vec2(x, y) #type: ignore
+    def set_position(self, x=0.0, y=None):  # copies, pos is never shared with anyone
+        self.pos.set(x, y)
 
     def move_to(self, x, y, movement_type: MovementType):
         if self.vel == None: return
-        self.target = Vec2(x, y)
+        self.target.set(x, y)
         self.movement_type = movement_type
         self.active = True
 
@@ -96,65 +95,65 @@ class Mover:
             case MovementType.JUMP:
                 return self._update_jump(dt)
 
+    def next_deadline(self):  # moving or being dragged needs every tick
+        return 0.0 if self.active else None
+
     # ---------------- movement types ---------------- #
 
+    # all of them work on pos / vel in place (and self.scratch), nothing gets allocated per tick
+
     def _update_linear(self, dt):
-        direction = (self.target - self.pos).normalized()
-        self.vel = direction * self.max_speed
-        self.pos += self.vel * dt
+        direction = self.scratch.set(self.target).isub(self.pos).normalize()
+        self.vel.set(direction).scale(self.max_speed)
+        self.pos.add_scaled(self.vel, dt)
 
-        if self.pos.distance_to(self.target) <= self.snap_distance:
-            self.pos = self.target.copy()
+        if self.pos.distance_squared_to(self.target) <= self.snap_distance * self.snap_distance:
+            self.pos.set(self.target)
             self.active = False
             return True
 
         return False
 
     def _update_accelerating(self, dt):
-        direction = (self.target - self.pos).normalized()
-        self.vel += direction * self.acceleration * dt
-
-        if self.vel.length() > self.max_speed:
-            self.vel = self.vel.normalized() * self.max_speed
+        direction = self.scratch.set(self.target).isub(self.pos).normalize()
+        self.vel.add_scaled(direction, self.acceleration * dt)
+        self.vel.clamp_length(self.max_speed)
 
-        self.pos += self.vel * dt
+        self.pos.add_scaled(self.vel, dt)
 
-        if self.pos.distance_to(self.target) <= self.snap_distance:
-            self.pos = self.target.copy()
-            self.vel = Vec2()
+        if self.pos.distance_squared_to(self.target) <= self.snap_distance * self.snap_distance:
+            self.pos.set(self.target)
+            self.vel.set(0.0, 0.0)
             self.active = False
             return True
 
         return False
 
     def _update_lerp(self, dt):
-        to_target = self.target - self.pos
-        dist = to_target.length()
+        to_target = self.scratch.set(self.target).isub(self.pos)
+        dist_squared = to_target.length_squared()
 
-        if dist <= self.snap_distance:
-            self.pos = self.target.copy()
-            self.vel = Vec2()
+        if dist_squared <= self.snap_distance * self.snap_distance:
+            self.pos.set(self.target)
+            self.vel.set(0.0, 0.0)
             self.active = False
             return True
 
-        direction = to_target.normalized()
+        dist = math.sqrt(dist_squared)
 
         # --- desired speed (ease OUT) ---
         desired_speed = self.max_speed
         if dist < self.slow_radius:
             desired_speed *= dist / self.slow_radius
 
-        desired_velocity: Vec2 = direction * desired_speed # pyright: ignore
+        desired_velocity = to_target.scale(desired_speed / dist)  # direction * desired_speed
 
         # --- accelerate toward desired velocity (ease IN) ---
-        steering: Vec2 = desired_velocity - self.vel
-        max_change = self.acceleration * dt
+        steering = desired_velocity.isub(self.vel)
+        steering.clamp_length(self.acceleration * dt)
 
-        if steering.length() > max_change:
-            steering = steering.normalized() * max_change
-
-        self.vel += steering # pyright: ignore
-        self.pos += self.vel * dt
+        self.vel.iadd(steering)
+        self.pos.add_scaled(self.vel, dt)
 
         return False
 
@@ -169,34 +168,34 @@ class Mover:
         # gravity
         self.vel.y += self.gravity * dt
 
-        self.pos += self.vel * dt
+        self.pos.add_scaled(self.vel, dt)
 
         # landing
         if self.pos.y >= self.grounded_y:
             self.pos.y = self.grounded_y
-            self.vel = Vec2()
+            self.vel.set(0.0, 0.0)
             self.active = False
-            print("landed after jumping")
+            if trace.move: trace.emit(trace.LANDED, self.pos.x, self.pos.y)
             return True
 
         return False
     
     def begin_drag(self, mouse_pos: Vec2):
         self.movement_type = MovementType.DRAG
-        self.pos = mouse_pos - self.drag_offset # initial snapping to cursor movement
-        print ("SNAP")
+        self.pos.set(mouse_pos).isub(self.drag_offset) # initial snapping to cursor movement
+        if trace.move: trace.emit(trace.DRAG_SNAP, self.pos.x, self.pos.y)
         self.active = True
-        self.vel = Vec2()
+        self.vel.set(0.0, 0.0)
 
     def update_drag_target(self, mouse_pos: Vec2, dt):
         if self.movement_type != MovementType.DRAG:
             return
 
-        screen = self.pet.primary_screen.availableGeometry()
+        screen = self.pet.world
         if (
-            mouse_pos.x >= screen.width() - self.pet.hitbox_width / 2
+            mouse_pos.x >= screen.width - self.pet.hitbox_width / 2
             or mouse_pos.x <= self.pet.hitbox_width / 2
-            or mouse_pos.y >= screen.bottom()
+            or mouse_pos.y >= screen.bottom
         ):
             self.end_drag()
             return
@@ -224,7 +223,7 @@ class Mover:
 
         self.pet.rotation_angle = self.angle
 
-        self.pos = mouse_pos - self.drag_offset
+        self.pos.set(mouse_pos).isub(self.drag_offset)
 
 
     def end_drag(self):
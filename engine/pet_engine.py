@@ -0,0 +1,247 @@
+# engine/pet_engine.py
+# The whole pet simulation without Qt: states, animations, movement, clicks, variables and behaviours.
+# It only knows the World it lives in and the size of its animation frames. Input comes in through press / move /
+# release / cancel_drag, time only through update(dt). pet.py draws it and feeds it mouse events, headless runs
+# (soak.py, bench.py) use headless_engine() which gives it FrameSizes instead of a FrameStore, and step it as fast as they like.
+
+import os
+
+from data.states import STATES, INITIAL_STATE
+from data.animations import ANIMATIONS
+from data.variables import VARIABLES
+from data.render_config import RENDER_CONFIG
+
+from engine.state_machine import StateMachine, reachable_animations, variable_thresholds
+from engine.config_compiler import load_configs
+from engine.click_detector import ClickDetector
+from engine.mover import Mover
+from engine.animator import Animator
+from engine.enums import Flag, Pulse, MovementType, Facing
+from engine.vec2 import Vec2
+from engine.behaviour_resolver import BehaviourResolver
+from engine.variable_manager import VariableManager
+from engine.world import World
+from engine.animation_files import FrameSizes
+from engine.profiler import Profiler
+from engine import trace
+
+PREFETCH_HOPS = RENDER_CONFIG.get("prefetch_hops", 2) # how many transitions ahead animations get decoded in the background
+
+
+class PetEngine:
+    def __init__(self, world, frames, states=STATES, animations=ANIMATIONS, variables=VARIABLES, initial_state=None):
+        self.world = world  # World, the screen area the pet can move in
+        self.frames = frames  # FrameStore when drawing, FrameSizes headless (frames only need .width and .height here)
+        self.states = states
+        self.animations = animations
+        initial_state = initial_state or INITIAL_STATE.get("default", next(iter(INITIAL_STATE))) #either get the "default" from the INITIAL STATE, or the first item in the STATES dictinary
+        self.compiled_states = load_configs(states, animations, variables, initial=initial_state)  # ConfigError listing every mistake in data/
+
+        self.time = 0.0  # simulated seconds
+        self.profiler = Profiler.from_config()  # None unless PET_PROFILE is set, see engine/profiler.py
+        self.state_name = None  # state last entered (StateRuntime.name stays the initial one)
+
+        self.variables = VariableManager(variables)
+        self.animator = Animator(self)
+
+        self.hitbox_width = 0
+        self.hitbox_height = 0
+
+        self.mover = Mover(self)
+        self.mover.set_position(100, world.bottom + 1) # set initial position, standing on the taskbar
+        self.anchor = self.mover.pos.copy()  # bottom-middle of the sprite, synced from the mover every tick
+
+        cfg_facing = RENDER_CONFIG.get("default_facing")
+        self.facing = Facing.__members__.get(cfg_facing, Facing.RIGHT)  # type: ignore # defining dacing direction
+
+        self.behaviour_resolver = BehaviourResolver(self)
+
+        self.last_mouse_pos = Vec2()
+        self.drag_offset = Vec2(0,0)
+        self.rotation_angle = 0
+
+        self.state_machine = StateMachine(pet=self, configs=self.compiled_states, initial=initial_state) # set initial state
+        self.click_detector = ClickDetector(pet=self) #initialising ClickDetector
+
+        self.update_hitbox_size_and_drag_offset() # initial hitbox update
+
+    # --- input, screen coordinates ---
+    def press(self, x, y):  # left button went down
+        self.click_detector.press(Vec2(x, y))  # kept as the press position, its own Vec2
+        self.last_mouse_pos.set(x, y)
+
+    def move(self, x, y):  # every mouse move while pressed, no new Vec2
+        self.last_mouse_pos.set(x, y)
+        self.click_detector.move(self.last_mouse_pos)
+
+    def release(self):
+        self.click_detector.release()
+        if self.mover.movement_type == MovementType.DRAG:
+            self.mover.end_drag()
+
+    def cancel_drag(self):  # lost focus, cursor left the window...
+        self.mover.end_drag()
+
+    # --- remote control (engine/control.py), names as in states.py ---
+    def raise_pulse(self, name):
+        if name not in Pulse.__members__:
+            raise ValueError(f"unknown pulse '{name}'")
+        self.state_machine.pulse(Pulse[name])
+
+    def set_variable(self, name, value):
+        if name not in self.variables.values:
+            raise ValueError(f"unknown variable '{name}'")
+        self.variables.set(name, value)
+
+    def force_state(self, name):  # like a transition without an animation, whatever the current state says
+        if name not in self.states:
+            raise ValueError(f"unknown state '{name}'")
+        self.cancel_drag()
+        self.state_machine.queue_transition(name, None, None)
+        self.state_machine.apply_pending_changes()
+
+    def deadlines(self):  # (name, function) pairs for the deadline scheduler, see engine/scheduler.py
+        thresholds = variable_thresholds(self.compiled_states)
+        return [
+            ("animator", self.animator.next_deadline),
+            ("mover", self.mover.next_deadline),
+            ("click", self.click_detector.next_deadline),
+            ("variables", lambda: self.variables.next_deadline(thresholds)),
+            ("state", self.state_machine.next_deadline),
+            ("frames", self.frames.next_deadline),
+        ]
+
+    def update(self, dt):  # one fixed step of the simulation
+        prof = self.profiler
+        if prof:
+            start = t = prof.start()
+
+        self.time += dt
+
+        # --- INPUT PHASE ---
+        if self.mover.movement_type == MovementType.DRAG:
+            self.mover.update_drag_target(self.last_mouse_pos, dt)
+
+        self.click_detector.update()
+        if prof: t = prof.lap("input", t)
+
+        self.variables.update(dt)
+        if prof: t = prof.lap("variables", t)
+
+        self.frames.poll()  # picks up prefetched animations, never waits for them
+        if prof: t = prof.lap("frames", t)
+
+        # --- STATE / SIMULATION PHASE ---
+        self.animator.update(dt)
+        if prof: t = prof.lap("animator", t)
+
+        arrived = self.mover.update(dt)
+
+        if arrived:
+            self.click_detector.release()
+            self.state_machine.raise_flag(Flag.MOVEMENT_FINISHED)
+        if prof: t = prof.lap("mover", t)
+
+        self.state_machine.update(dt)
+        if prof: t = prof.lap("state_machine", t)
+
+        # --- POSITION SYNC PHASE ---
+        self.anchor.x = self.mover.pos.x
+        self.anchor.y = self.mover.pos.y
+
+        if prof:
+            prof.lap("position_sync", t)
+            prof.tick(self.state_name, start)
+
+    # --- called by the state machine ---
+    def on_state_enter(self, state): #called in state_machine when entering a new state
+        if trace.state: trace.emit(trace.STATE_ENTER, state)
+        self.state_name = state
+
+        self.variables.set("times_clicked_this_state", 0)
+        self.variables.set("time_spent_in_this_state", 0)
+
+        cfg = self.states[state]      # gets the config for the state from states.py
+        anim_name = cfg.get("animation")
+
+        self.frames.prefetch(reachable_animations(self.compiled_states, state, PREFETCH_HOPS))  # background decoding of whatever can play next
+
+        movement_settings = cfg.get("settings", {})
+        acceleration = movement_settings.get("acceleration", self.mover.acceleration)
+        max_speed = movement_settings.get("max_speed", self.mover.max_speed)
+        slow_radius = movement_settings.get("slow_radius", self.mover.slow_radius)
+        snap_distance = movement_settings.get("snap_distance", self.mover.snap_distance)
+        jump_velocity = movement_settings.get("jump_velocity", self.mover.jump_velocity)
+        gravity = movement_settings.get("gravity", self.mover.gravity)
+        self.mover.set_settings(acceleration=acceleration, max_speed=max_speed, slow_radius=slow_radius, snap_distance=snap_distance, jump_velocity=jump_velocity,gravity=gravity)
+
+        behaviour_name = cfg.get("behaviour", "STATIONARY")
+
+        target_x, target_y, type, settings = self.behaviour_resolver.resolve(behaviour_name)
+
+        isAbletoRotate = True if type == MovementType.DRAG else False
+
+        self.play_animation(anim_name=anim_name, cfg=cfg, isAbletoRotate=isAbletoRotate)
+
+        if type == MovementType.STATIONARY: # hardcoded doing nothing for stationary
+            return
+
+        if type == MovementType.DRAG:  # hardcoded behaviour for drag
+            self.mover.movement_type = MovementType.DRAG
+
+            if not self.click_detector.press_pos: #safe check
+                self.mover.end_drag()
+                return
+
+            self.mover.begin_drag(self.click_detector.press_pos.copy())
+            return
+
+        self.mover.set_position(self.anchor)
+        self.mover.move_to(target_x, target_y, type)
+
+    def on_state_exit(self, state): #just records it
+        if trace.state: trace.emit(trace.STATE_EXIT, self.state_name)
+
+    def play_animation(self, anim_name, cfg, isTransitionAnimation = False, isAbletoRotate = False):
+        if anim_name not in self.animations:
+            raise Exception("ANIMATION", anim_name, "NOT FOUND")  #no idea what this does will add user notification that error occured
+
+        anim_cfg = self.animations[anim_name]
+
+        sm = getattr(self, "state_machine", None)  # play_animation is called while the state machine is still being created
+        pending = [sm.pending_transition_anim, self.states[sm.pending_state]["animation"]] if sm and sm.pending_state else []
+        self.frames.set_in_use([anim_name] + pending)  # these never get evicted
+
+        frames = self.frames.get(anim_name)  # loads it again if it was evicted
+        fps = cfg.get("fps", anim_cfg.get("fps", 6)) # safestate, will default to the latter
+        loop_option = RENDER_CONFIG.get("default_loop_option", False)
+        loop = cfg.get("loop", anim_cfg.get("loop", loop_option)) # safestate, will default to the latter
+        times_to_loop = cfg.get("times_to_loop", anim_cfg.get("times_to_loop", 1))
+        holds = cfg.get("holds", anim_cfg.get("holds", self.frames.sheet_holds(anim_name, fps)))  # safestate, spritesheet durations or empty directory
+
+        if isTransitionAnimation:
+            loop = False  #if receiving a transition animation, looping is disabled
+
+        self.animator.set(frames=frames, fps=fps, loop=loop, times_to_loop=times_to_loop, holds=holds, name=anim_name) #sets animation in animator
+
+    def update_hitbox_size_and_drag_offset(self):
+        frame = self.animator.frame()
+        if not frame:
+            return
+
+        self.hitbox_width = frame.width  # frames are already scaled
+        self.hitbox_height = frame.height
+
+        self.drag_offset = Vec2(self.hitbox_width * RENDER_CONFIG["drag_offset_x"], self.hitbox_height * RENDER_CONFIG["drag_offset_y"])
+        self.mover.drag_offset = self.drag_offset
+
+
+def headless_engine(world=None, initial_state=None):  # engine without Qt, frames sized like pet.py would size them on this world
+    world = world or World()
+    frames = FrameSizes(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ANIMATIONS)
+
+    initial_state = initial_state or INITIAL_STATE.get("default", next(iter(INITIAL_STATE)))
+    _, first_frame_h = frames.source_size(STATES[initial_state]["animation"])
+    frames.set_scale(world.height * RENDER_CONFIG["pet_size_on_screen"] / 100 / first_frame_h)
+
+    return PetEngine(world, frames, initial_state=initial_state)
@@ -0,0 +1,104 @@
+# engine/presence.py
+# Is anyone looking at the pet? Presence sources answer that with Presence.ACTIVE / AWAY / HIDDEN and engine/throttle.py
+# decides what to do about it. Sources are swappable: the windows one asks the OS, the cursor one works anywhere
+# (but can only tell AWAY), FakePresence is set by hand for trying the throttling out without locking the screen.
+
+import sys, time
+
+from engine.enums import Presence
+from data.render_config import RENDER_CONFIG
+
+AWAY_AFTER = RENDER_CONFIG.get("away_after", 3600)  # seconds without any input before the user counts as away
+
+
+class PresenceSource:
+    def poll(self) -> Presence:
+        return Presence.ACTIVE
+
+
+class FakePresence(PresenceSource):  # whatever it was last set to
+    def __init__(self, presence=Presence.ACTIVE):
+        self.presence = presence
+        self.polls = 0
+
+    def set(self, presence):
+        self.presence = presence
+
+    def poll(self):
+        self.polls += 1
+        return self.presence
+
+
+class CursorPresence(PresenceSource):  # portable fallback, away once the cursor hasnt moved for away_after seconds
+    def __init__(self, cursor_pos, away_after=AWAY_AFTER, clock=time.monotonic):
+        self.cursor_pos = cursor_pos  # function returning something comparable, QCursor.pos for the real thing
+        self.away_after = away_after
+        self.clock = clock
+
+        self.last_pos = None
+        self.last_moved = clock()
+
+    def poll(self):
+        pos = self.cursor_pos()
+        if pos != self.last_pos:
+            self.last_pos = pos
+            self.last_moved = self.clock()
+
+        return Presence.AWAY if self.clock() - self.last_moved >= self.away_after else Presence.ACTIVE
+
+
+class WindowsPresence(PresenceSource):  # locked session, fullscreen apps / presentations and system wide idle time
+    QUNS_BUSY = 2  # a fullscreen app is running
+    QUNS_RUNNING_D3D_FULL_SCREEN = 3
+    QUNS_PRESENTATION_MODE = 4
+    DESKTOP_SWITCHDESKTOP = 0x0100
+
+    def __init__(self, away_after=AWAY_AFTER):
+        import ctypes
+        from ctypes import wintypes
+
+        class LASTINPUTINFO(ctypes.Structure):
+            _fields_ = [("cbSize", wintypes.UINT), ("dwTime", wintypes.DWORD)]
+
+        self.ctypes = ctypes
+        self.user32 = ctypes.windll.user32  # type: ignore
+        self.kernel32 = ctypes.windll.kernel32  # type: ignore
+        self.shell32 = ctypes.windll.shell32  # type: ignore
+        self.last_input = LASTINPUTINFO()
+        self.last_input.cbSize = ctypes.sizeof(LASTINPUTINFO)
+        self.away_after = away_after
+
+    def locked(self):  # the input desktop cant be opened while the lock screen (or UAC prompt) is up
+        desktop = self.user32.OpenInputDesktop(0, False, self.DESKTOP_SWITCHDESKTOP)
+        if not desktop:
+            return True
+        self.user32.CloseDesktop(desktop)
+        return False
+
+    def fullscreen(self):
+        state = self.ctypes.c_int(0)
+        if self.shell32.SHQueryUserNotificationState(self.ctypes.byref(state)) != 0:
+            return False
+        return state.value in (self.QUNS_BUSY, self.QUNS_RUNNING_D3D_FULL_SCREEN, self.QUNS_PRESENTATION_MODE)
+
+    def idle_seconds(self):
+        if not self.user32.GetLastInputInfo(self.ctypes.byref(self.last_input)):
+            return 0.0
+        return ((self.kernel32.GetTickCount() - self.last_input.dwTime) & 0xFFFFFFFF) / 1000  # tick count wraps after 49 days
+
+    def poll(self):
+        if self.locked() or self.fullscreen():
+            return Presence.HIDDEN
+        if self.idle_seconds() >= self.away_after:
+            return Presence.AWAY
+        return Presence.ACTIVE
+
+
+def make_presence_source(kind, cursor_pos):  # "auto", "windows", "cursor", "fake" or "none"
+    if kind == "fake":
+        return FakePresence()
+    if kind == "none":
+        return PresenceSource()
+    if kind == "windows" or (kind == "auto" and sys.platform == "win32"):
+        return WindowsPresence()
+    return CursorPresence(cursor_pos)
@@ -0,0 +1,134 @@
+# engine/profiler.py
+# Opt-in timing of every logic tick: how long each phase of PetEngine.update takes, whole ticks per state, display updates,
+# paintEvent and wake ups, as histograms (p50 / p95 / p99 / max) plus how often a tick went over its frame budget.
+# Off unless PET_PROFILE=1 (or "profile": True in render_config). When off PetEngine.profiler is None and every phase
+# costs one "if prof:" check. Written to profile_file as json on quit, or any time on SIGUSR1 (where there is one).
+
+import os, json, math, time
+
+from data.render_config import RENDER_CONFIG
+
+PROFILE_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), RENDER_CONFIG.get("profile_file", "cache/profile.json"))
+BUCKETS_PER_OCTAVE = 8  # histogram resolution, ~9% per bucket
+
+
+class Histogram:  # log bucketed, fixed size however many samples go in
+    __slots__ = ("count", "total", "max", "buckets")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0
+        self.max = 0
+        self.buckets = {}  # bucket -> samples
+
+    def add(self, ns):
+        self.count += 1
+        self.total += ns
+        if ns > self.max:
+            self.max = ns
+        b = int(math.log2(ns) * BUCKETS_PER_OCTAVE) if ns > 1 else 0
+        self.buckets[b] = self.buckets.get(b, 0) + 1
+
+    def percentile(self, q):  # upper edge of the bucket the q-th sample is in, never more than the max
+        need = q * self.count
+        seen = 0
+        for b in sorted(self.buckets):
+            seen += self.buckets[b]
+            if seen >= need:
+                return min(self.max, 2 ** ((b + 1) / BUCKETS_PER_OCTAVE))
+        return self.max
+
+    def summary(self):  # microseconds
+        if not self.count:
+            return {"count": 0}
+        return {
+            "count": self.count,
+            "mean_us": round(self.total / self.count / 1000, 2),
+            "p50_us": round(self.percentile(0.50) / 1000, 2),
+            "p95_us": round(self.percentile(0.95) / 1000, 2),
+            "p99_us": round(self.percentile(0.99) / 1000, 2),
+            "max_us": round(self.max / 1000, 2),
+        }
+
+
+class Profiler:
+    def __init__(self, path=PROFILE_FILE, tick_budget=None, wake_budget=None):
+        logic_fps = RENDER_CONFIG.get("logic_FPS", 60)
+        self.path = path
+        self.tick_budget = int((tick_budget or 1 / logic_fps) * 1e9)  # ns, one logic step should take less than its own dt
+        self.wake_budget = int((wake_budget or 1 / RENDER_CONFIG.get("display_FPS", logic_fps)) * 1e9)  # ns, a whole timer callback should fit in a displayed frame
+
+        self.phases = {}  # phase -> Histogram
+        self.states = {}  # state -> Histogram of whole ticks
+        self.tick_overruns = 0
+        self.wake_overruns = 0
+        self.started = time.perf_counter()
+        self.dumps = 0
+
+    @staticmethod
+    def from_config():  # Profiler if profiling is switched on, None otherwise
+        env = os.environ.get("PET_PROFILE", "")
+        if env in ("", "0") and not RENDER_CONFIG.get("profile", False):
+            return None
+        return Profiler()
+
+    def start(self):
+        return time.perf_counter_ns()
+
+    def lap(self, phase, since):  # records phase as everything since the last lap, returns now for the next one
+        now = time.perf_counter_ns()
+        self.record(phase, now - since)
+        return now
+
+    def record(self, phase, ns):
+        hist = self.phases.get(phase)
+        if hist is None:
+            hist = self.phases[phase] = Histogram()
+        hist.add(ns)
+
+    def tick(self, state, since):  # a whole logic step, in state
+        ns = time.perf_counter_ns() - since
+        self.record("tick", ns)
+        hist = self.states.get(state)
+        if hist is None:
+            hist = self.states[state] = Histogram()
+        hist.add(ns)
+        if ns > self.tick_budget:
+            self.tick_overruns += 1
+
+    def wake(self, since):  # a whole timer callback: catching up, display, scheduling
+        ns = time.perf_counter_ns() - since
+        self.record("wake", ns)
+        if ns > self.wake_budget:
+            self.wake_overruns += 1
+
+    def report(self):
+        ticks = self.phases.get("tick")
+        wakes = self.phases.get("wake")
+        return {
+            "seconds": round(time.perf_counter() - self.started, 3),
+            "tick_budget_us": self.tick_budget / 1000,
+            "wake_budget_us": self.wake_budget / 1000,
+            "tick_overruns": self.tick_overruns,
+            "tick_overrun_ratio": round(self.tick_overruns / ticks.count, 5) if ticks else 0.0,
+            "wake_overruns": self.wake_overruns,
+            "wake_overrun_ratio": round(self.wake_overruns / wakes.count, 5) if wakes else 0.0,
+            "phases": {name: h.summary() for name, h in self.phases.items()},
+            "states": {name: h.summary() for name, h in self.states.items()},
+        }
+
+    def dump(self, path=None):
+        path = path or self.path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.report(), f, indent=2)
+        self.dumps += 1
+        return path
+
+    def summary_line(self):
+        tick = self.phases.get("tick")
+        if not tick:
+            return "no ticks"
+        s = tick.summary()
+        return (f"{s['count']} ticks, p50 {s['p50_us']} us, p99 {s['p99_us']} us, max {s['max_us']} us, "
+                f"{self.tick_overruns} over {self.tick_budget / 1000:.0f} us, {self.wake_overruns} wakes over {self.wake_budget / 1000:.0f} us")
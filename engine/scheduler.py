@@ -0,0 +1,63 @@
+# engine/scheduler.py
+# Instead of waking up every tick, the pet asks each subsystem how long until it next needs a tick and sleeps until the
+# earliest one (an animation frame 166 ms away in IDLE, a variable crossing a threshold in 100 s...).
+# Logic still advances in the same fixed steps (engine/fixed_step.py), the steps slept through are run in one go on wake up,
+# so the simulation comes out exactly like ticking every step, just with far fewer wakeups.
+
+import math
+
+from data.render_config import RENDER_CONFIG
+
+MAX_SLEEP = RENDER_CONFIG.get("max_sleep", 1.0)  # seconds, never sleeps longer than this even if nothing is due
+
+
+class DeadlineScheduler:
+    def __init__(self, logic_clock, max_sleep=MAX_SLEEP):
+        self.logic_clock = logic_clock  # FixedStep
+        self.max_sleep = max_sleep
+        self.sources = []  # (name, function returning seconds of simulated time until it needs a step, or None)
+
+        self.wakeups = 0
+        self.woken_by = {}  # source name -> wakeups it asked for
+        self.started = logic_clock.clock()
+
+    def add(self, name, deadline):
+        self.sources.append((name, deadline))
+
+    def next_deadline(self):  # (seconds, source name) of the earliest deadline, (None, None) if nothing is due
+        best, best_name = None, None
+        for name, deadline in self.sources:
+            d = deadline()
+            if d is not None and (best is None or d < best):
+                best, best_name = d, name
+        return best, best_name
+
+    def plan(self, display_in=None, min_sleep=0.0, max_sleep=None):  # (wall seconds to sleep, logic steps that will be due by then)
+        dt = self.logic_clock.dt
+        max_sleep = self.max_sleep if max_sleep is None else max_sleep
+        deadline, name = self.next_deadline()
+
+        max_steps = max(1, math.ceil(max_sleep / dt))
+        steps = max_steps if deadline is None else min(max_steps, max(1, math.ceil(deadline / dt - 1e-9)))
+        sleep = self.logic_clock.time_until(steps)
+        if deadline is None or deadline > max_sleep:
+            name = "max_sleep"
+
+        if display_in is not None and display_in < sleep:  # presenting the window is due before the next logic step that matters
+            sleep, name = display_in, "display"
+            steps = self.logic_clock.steps_by(sleep)
+
+        if sleep < min_sleep:  # throttled, everything that was due gets run together when it wakes up
+            sleep, name = min_sleep, "throttle"
+            steps = self.logic_clock.steps_by(sleep)
+
+        self.woken_by[name] = self.woken_by.get(name, 0) + 1
+        return max(0.0, sleep), steps
+
+    def stats(self):
+        elapsed = self.logic_clock.clock() - self.started
+        return {
+            "wakeups": self.wakeups,
+            "wakeups_per_s": self.wakeups / elapsed if elapsed > 0 else 0.0,
+            "woken_by": dict(self.woken_by),
+        }
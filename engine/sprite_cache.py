@@ -0,0 +1,141 @@
+# engine/sprite_cache.py
+# LRU cache of frames that are already mirrored and/or rotated, so swinging the pet around mostly blits images
+# instead of re-rasterizing the rotation on every repaint. Rotation is snapped to buckets of "rotation_step" degrees
+# Sized per animation: frames * rotation buckets * 2 facings, within sprite_cache_mb. When that doesnt fit (big sprites,
+# free spinning) sprites of the playing animation are never evicted for each other, misses past that are drawn uncached
+# instead of cycling the whole cache
+
+import math
+from collections import OrderedDict
+from PySide6.QtGui import QPainter, QPixmap, QTransform
+from PySide6.QtCore import QRectF, QPointF, Qt
+
+from engine.enums import Facing
+from data.render_config import RENDER_CONFIG
+
+ROTATION_STEP = RENDER_CONFIG.get("rotation_step", 2)  # degrees per rotation bucket
+SPRITE_CACHE_SIZE = RENDER_CONFIG.get("sprite_cache_size", 256)  # transformed frames kept at least
+SPRITE_CACHE_BYTES = RENDER_CONFIG.get("sprite_cache_mb", 64) * 1024 * 1024
+MAX_ANGLE = RENDER_CONFIG.get("max_angle", 90)  # same default as the mover
+
+
+def frame_transform(facing, angle, pivot_x, pivot_y):  # same transform paintEvent used to build with the painter, anchor at (0, 0)
+    t = QTransform()
+    if angle != 0:
+        t.translate(pivot_x, pivot_y)
+        t.rotate(angle)
+        t.translate(-pivot_x, -pivot_y)
+    if facing == Facing.LEFT:
+        t.scale(-1, 1)
+    return t
+
+
+class SpriteCache:
+    def __init__(self, capacity=SPRITE_CACHE_SIZE, step=ROTATION_STEP, budget_bytes=SPRITE_CACHE_BYTES, max_angle=MAX_ANGLE):
+        self.min_capacity = capacity
+        self.capacity = capacity
+        self.budget_bytes = budget_bytes
+        self.step = step
+        self.items = OrderedDict()  # key -> (pixmap, top-left offset from the anchor), least recently used first
+        self.sizes = {}  # key -> pixmap bytes
+        self.bytes = 0
+
+        # rotations a drag can reach, -180..180 when it spins freely. unbucketed angles never repeat
+        swing = min(abs(max_angle), 180)
+        self.angle_buckets = 2 * math.ceil(swing / step) + 1 if step > 0 else math.inf
+
+        self.anim_name = None  # animation the cache is sized for
+        self.working_set = 0  # sprites it can ask for
+        self.fits = True
+
+        self.hits = 0
+        self.misses = 0
+        self.uncached = 0  # misses that were drawn without being kept, the working set didnt fit
+
+    def bucket(self, angle):
+        return round(angle / self.step) if self.step > 0 else angle
+
+    def size_for(self, anim_name, frame_count, frame, dpr):  # capacity for the animation that is playing now
+        rotated = math.ceil(math.hypot(frame.width, frame.height) * dpr) ** 2 * 4  # bytes of a frame turned 45 degrees, the biggest
+        self.anim_name = anim_name
+        self.working_set = frame_count * self.angle_buckets * 2
+        self.fits = self.working_set * rotated <= self.budget_bytes
+        self.capacity = max(self.min_capacity, self.working_set if self.fits else self.budget_bytes // rotated)
+
+    def get(self, anim_name, index, frame, facing, angle, pivot, dpr, anchor_x=0.0, anchor_y=0.0, frame_count=1):  # (pixmap, QPointF offset from the anchor)
+        if anim_name != self.anim_name:
+            self.size_for(anim_name, frame_count, frame, dpr)
+
+        # the fractional part of the anchor is baked into the image so the final blit lands on whole pixels
+        sub_x = round(anchor_x % 1, 2)
+        sub_y = round(anchor_y % 1, 2)
+
+        bucket = self.bucket(angle)
+        key = (anim_name, index, facing, bucket, round(pivot.x, 1), round(pivot.y, 1), dpr, sub_x, sub_y)
+
+        item = self.items.get(key)
+        if item is not None:
+            self.hits += 1
+            self.items.move_to_end(key)
+            return item
+
+        self.misses += 1
+        item = self._render(frame, facing, bucket * self.step if self.step > 0 else angle, pivot, dpr, sub_x, sub_y)
+        size = item[0].width() * item[0].height() * 4
+        if not self._make_room(anim_name, size):
+            self.uncached += 1
+            return item
+
+        self.items[key] = item
+        self.sizes[key] = size
+        self.bytes += size
+        return item
+
+    def _make_room(self, anim_name, size):  # evicts least recently used sprites until one of size fits, False if it shouldnt be kept
+        while self.items and (len(self.items) >= self.capacity or self.bytes + size > self.budget_bytes):
+            oldest = next(iter(self.items))
+            if not self.fits and oldest[0] == anim_name:  # would only push out another sprite this animation needs
+                return False
+            del self.items[oldest]
+            self.bytes -= self.sizes.pop(oldest)
+        return size <= self.budget_bytes
+
+    def hit_rate(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses, "uncached": self.uncached, "hit_rate": self.hit_rate(), "size": len(self.items),
+                "capacity": self.capacity, "bytes": self.bytes}
+
+    def clear(self):
+        self.items.clear()
+        self.sizes.clear()
+        self.bytes = 0
+        self.anim_name = None
+
+    def _render(self, frame, facing, angle, pivot, dpr, sub_x, sub_y):
+        t = frame_transform(facing, angle, pivot.x, pivot.y) * QTransform.fromTranslate(sub_x, sub_y)
+
+        # where the untrimmed frame lands, its bottom-middle sits on the anchor
+        x = -frame.width / 2
+        y = -frame.height
+        bounds = t.mapRect(QRectF(x, y, frame.width, frame.height))
+
+        left = math.floor(bounds.left())
+        top = math.floor(bounds.top())
+        w = math.ceil(bounds.right()) - left
+        h = math.ceil(bounds.bottom()) - top
+
+        pix = QPixmap(max(1, math.ceil(w * dpr)), max(1, math.ceil(h * dpr)))
+        pix.setDevicePixelRatio(dpr)
+        pix.fill(Qt.transparent)  # type: ignore
+
+        p = QPainter(pix)
+        p.setRenderHint(QPainter.SmoothPixmapTransform, angle != 0)  # type: ignore
+        p.translate(-left, -top)
+        p.setTransform(t, True)
+        frame.draw(p, x, y)
+        p.end()
+
+        return pix, QPointF(left - sub_x, top - sub_y)
@@ -2,13 +2,54 @@
 
 from engine.state_runtime import StateRuntime
 from engine.enums import Flag, Pulse
+from engine import trace
+
+
+def reachable_animations(configs, state, hops=2): # animations the pet can play within a few transitions from state, nearest first
+    result = []                                      # configs: {name: CompiledState}
+    seen_states = {state}
+    frontier = [state]
+
+    def add(anim):
+        if anim and anim not in result:
+            result.append(anim)
+
+    add(configs[state].config.get("animation"))
+
+    for _ in range(hops):
+        next_frontier = []
+        for name in frontier:
+            compiled = configs[name]
+            transitions = compiled.transitions + ((compiled.exit,) if compiled.exit else ())
+
+            for t in transitions:
+                add(t.anim)
+
+            for t in transitions:
+                if t.to in configs and t.to not in seen_states:
+                    seen_states.add(t.to)
+                    next_frontier.append(t.to)
+                    add(configs[t.to].config.get("animation"))
+        frontier = next_frontier
+
+    return result
+
+
+def variable_thresholds(configs): # (var, value) pairs that transition conditions compare against, for waking up when one is crossed
+    result = []
+    for compiled in configs.values():
+        for t in compiled.transitions + ((compiled.exit,) if compiled.exit else ()):
+            for var, _, value in t.tests:
+                if (var, value) not in result:
+                    result.append((var, value))
+    return result
 
 
 class StateMachine:
     def __init__(self, pet, configs, initial):
         self.pet = pet
-        self.configs = configs
-        self.state = StateRuntime(state_name=initial, config=configs[initial], variables=self.pet.variables)   # created instance of runtime and then changed
+        self.configs = configs  # {name: CompiledState} from engine/config_compiler.py load_configs()
+        self.state = StateRuntime(state_name=initial, compiled=configs[initial], variables=self.pet.variables)   # created instance of runtime and then changed
         self.change(initial)
         self.in_transition = False
 
@@ -27,10 +68,13 @@ class StateMachine:
         self.state.pulse(pulse)
 
         if self.in_transition and pulse == Pulse.ANIMATION_END:  # logic for ending transition animation
-            print("changing after animation finished")
+            if trace.state: trace.emit(trace.TRANSITION_END, self.pending_state)
             self.apply_pending_changes()
         
 
+    def next_deadline(self):
+        return self.state.next_deadline()
+
     def update(self, dt):    # state logic runs here
         # HANDLING EVENTS
         if not self.in_transition:
@@ -93,6 +137,6 @@ class StateMachine:
         
         self.remove_flag(Flag.ANIMATION_FINISHED) # later will add some way to automatically clear these
         self.remove_flag(Flag.MOVEMENT_FINISHED)
-        self.state.config = self.configs[next_state]
+        self.state.set_state(self.configs[next_state])
         self.state._apply_on_enter()
         self.pet.on_state_enter(next_state)
\ No newline at end of file
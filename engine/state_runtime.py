@@ -1,27 +1,47 @@
 # engine/state_runtime.py
-# handles Events
+# handles Events. conditions come precompiled (engine/config_compiler.py), nothing gets parsed or looked up per tick.
+# only transitions that could have started to hold get checked: the ones waiting for a pulse that is pending, and the
+# flag / var only ones after a flag went up, a watched variable crossed its threshold or the state was entered. a tick
+# where none of that happened checks nothing. first match order and chance rolls stay exactly as if all were checked
 
 import random
 from engine.enums import Flag, Pulse
+from engine import trace
 
 class StateRuntime:
-    def __init__(self, state_name, config, variables):
+    def __init__(self, state_name, compiled, variables):
         self.name = state_name
-        self.config = config
         self.variables = variables
 
         self.flags = set()
         self.pulses = set()
 
+        self.dirty = True  # something changed that could make a flag / var only transition hold
+        self.live = False  # a flag / var only transition held but lost its chance roll, it rolls again next tick
+        self.set_state(compiled)
+
+    def set_state(self, compiled):  # CompiledState
+        self.compiled = compiled
+        self.dirty = True
+        self.live = False
+        self.variables.watch(compiled.watch, self.mark_dirty)
+
+    def mark_dirty(self):
+        self.dirty = True
+
     # flags
     def raise_flag(self, flag: Flag):
         if flag == Flag.DRAGGING and not flag in self.flags:  # special check for sending a pulse dragging started when dragging flag is raised
             self.pulse(Pulse.DRAGGING_STARTED)
 
+        if flag not in self.flags:
+            if trace.flag: trace.emit(trace.FLAG_RAISED, flag.name)
+            self.dirty = True  # going down never makes anything hold, only going up
         self.flags.add(flag)
 
 
     def remove_flag(self, flag: Flag):
+        if trace.flag and flag in self.flags: trace.emit(trace.FLAG_CLEARED, flag.name)
         self.flags.discard(flag)
 
     def has_flag(self, flag: Flag):
@@ -29,6 +49,7 @@ class StateRuntime:
 
     # pulses
     def pulse(self, pulse: Pulse):
+        if trace.pulse: trace.emit(trace.PULSE, pulse.name)
         self.pulses.add(pulse)
 
     def has_pulse(self, pulse: Pulse):
@@ -39,71 +60,49 @@ class StateRuntime:
         
     
     def _apply_on_enter(self):
-        for cmd in self.config.get("on_enter", []):
-            self._execute_command(cmd)
-
-    def _execute_command(self, cmd):
-        if "var" in cmd:
-            name = cmd["var"]
-            op = cmd["op"]
-            value = cmd["value"]
-
-            if op == "+=":
-                self.variables.add(name, value)
-            elif op == "-=":
-                self.variables.add(name, -value)
-            elif op == "=":
-                self.variables.set(name, value)
+        for cmd in self.compiled.on_enter:
+            cmd.run(self)
 
-        elif "set_flag" in cmd:
-            self.flags.add(cmd["set_flag"])
+    def next_deadline(self):  # 0 if a transition could fire on the next update as things are now (flags, vars, pending pulses)
+        if self.pulses:
+            return 0.0
 
-        elif "clear_flag" in cmd:
-            self.flags.discard(cmd["clear_flag"])
+        if not (self.dirty or self.live):  # nothing holds, otherwise handle_events would have fired it or kept it live
+            return None
 
+        # without pulses only flag / var conditions can be true, checking them doesnt roll any chance
+        flags, pulses, values = self.flags, self.pulses, self.variables.values
+        for t in self.compiled.steady:
+            if t.check(flags, pulses, values):
+                return 0.0
 
-    #unified check
-    def _check_condition(self, cond):
-        if "flag" in cond:
-            return Flag.__members__.get(cond["flag"]) in self.flags
-
-        if "pulse" in cond:
-            return Pulse.__members__.get(cond["pulse"]) in self.pulses
-
-        if "var" in cond:
-            val = self.variables.get(cond["var"])
-            match cond["op"]:
-                case "<": return val < cond["value"]
-                case ">": return val > cond["value"]
-                case "==": return val == cond["value"]
-                case "<=": return val <= cond["value"]
-                case ">=": return val >= cond["value"]
-
-        return Flag.__members__.get(cond) in self.flags or Pulse.__members__.get(cond) in self.pulses   # THIS makes it so instead of Flag.FLAG_NAME you can just FLAG_NAME
+        exit = self.compiled.exit
+        if exit and exit.check(flags, pulses, values):
+            return 0.0
 
+        return None
 
     def handle_events(self):
-        transitions = self.config.get("transitions", [])
-
-        # print("handling events: Flags: ", self.flags, " Pulses: ", self.pulses)
-
-        for t in transitions:  # handling all "transitions" in configs
-            conditions = t["when"]
-            chance = t.get("chance", 1)
-
-            
-            if all(self._check_condition(c) for c in conditions) and random.random() <= chance:  # all() returns true if all iterable conditions inside are true
-                # print("chance of this was: ", chance)
-                # print("state_runtime detected transition to:", t["to"])
-                return (
-                    t["to"],  # return the destination state
-                    t.get("transition_anim", None),  # may be None
-                    t.get("transition_anim_cfg", {})
-                )
-            
-        exit_conditions = self.config.get("exit_when")
-        if exit_conditions and all(self._check_condition(c) for c in exit_conditions):
-            # print("exiting state")
-            return(self.config["exit_to"], self.config.get("exit_animation", None), self.config.get("exit_animation_cfg", None))
+        pulses = self.pulses
+        if pulses:  # the ones waiting for this pulse and the steady ones, in config order
+            candidates = self.compiled.by_pulse[next(iter(pulses))] if len(pulses) == 1 else self.compiled.transitions
+        elif self.dirty or self.live:
+            candidates = self.compiled.steady
+        else:
+            return None  # nothing new since the last look
+
+        self.dirty = self.live = False
+        flags, values = self.flags, self.variables.values
+
+        for t in candidates:  # first one that holds wins
+            if t.check(flags, pulses, values):
+                if random.random() <= t.chance:  # chance only rolled when the conditions hold
+                    return t.to, t.anim, t.anim_cfg
+                if not t.pulses:
+                    self.live = True
+
+        exit = self.compiled.exit
+        if exit and exit.check(flags, pulses, values):
+            return exit.to, exit.anim, exit.anim_cfg
 
         return None
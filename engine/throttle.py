@@ -0,0 +1,64 @@
+# engine/throttle.py
+# Turns presence (engine/presence.py) into how hard the pet runs: full speed, a low wake up rate, or frozen.
+# Presence is only polled every presence_poll_interval, the cursor being near the pet always means full speed.
+
+import time
+
+from engine.enums import Presence, ThrottleMode
+from data.render_config import RENDER_CONFIG
+
+THROTTLE_AWAY = RENDER_CONFIG.get("throttle_away", "LOW")  # FULL, LOW or FROZEN when the user is away
+THROTTLE_HIDDEN = RENDER_CONFIG.get("throttle_hidden", "FROZEN")  # same, when the screen is locked or covered by a fullscreen app
+THROTTLE_LOW_FPS = RENDER_CONFIG.get("throttle_low_fps", 4)  # wakeups per second in LOW
+PRESENCE_POLL_INTERVAL = RENDER_CONFIG.get("presence_poll_interval", 0.5)  # seconds
+
+
+class Throttle:
+    def __init__(self, presence_source, away=THROTTLE_AWAY, hidden=THROTTLE_HIDDEN, low_fps=THROTTLE_LOW_FPS,
+                 poll_interval=PRESENCE_POLL_INTERVAL, clock=time.monotonic):
+        self.source = presence_source
+        self.modes = {
+            Presence.ACTIVE: ThrottleMode.FULL,
+            Presence.AWAY: ThrottleMode[away],
+            Presence.HIDDEN: ThrottleMode[hidden],
+        }
+        self.low_fps = low_fps
+        self.poll_interval = poll_interval
+        self.clock = clock
+
+        self.presence = Presence.ACTIVE
+        self.mode = ThrottleMode.FULL
+        self.last_poll = None
+
+        # stats
+        self.mode_since = clock()
+        self.time_in = {mode: 0.0 for mode in ThrottleMode}
+        self.changes = 0
+
+    def update(self, cursor_near=False):  # mode to run in right now
+        now = self.clock()
+        if self.last_poll is None or now - self.last_poll >= self.poll_interval:
+            self.last_poll = now
+            self.presence = self.source.poll()
+
+        mode = ThrottleMode.FULL if cursor_near else self.modes[self.presence]
+        if mode != self.mode:
+            self.time_in[self.mode] += now - self.mode_since
+            self.mode_since = now
+            self.mode = mode
+            self.changes += 1
+            print(f"[THROTTLE] {self.presence.name} -> {mode.name}")
+
+        return mode
+
+    def min_sleep(self):  # shortest time between wakeups in the current mode
+        if self.mode == ThrottleMode.LOW:
+            return 1 / self.low_fps
+        if self.mode == ThrottleMode.FROZEN:
+            return self.poll_interval
+        return 0.0
+
+    def stats(self):
+        time_in = dict(self.time_in)
+        time_in[self.mode] += self.clock() - self.mode_since
+        return {"mode": self.mode.name, "changes": self.changes, "seconds_in": {m.name: round(t, 1) for m, t in time_in.items()}}
@@ -0,0 +1,135 @@
+# engine/trace.py
+# What the pet did recently, instead of printing it: typed events (state enter / exit, pulses, flags, animation ends,
+# landings, clicks...) go into a preallocated ring buffer that only keeps the last trace_size of them.
+# Dumped as json on demand (SIGUSR2, "trace" on the control socket) and when an exception gets through (crash dump).
+# Call sites check their category first, so a switched off category costs one module attribute lookup:
+#     if trace.anim: trace.emit(trace.ANIM_END, self.name)
+# "trace" in render_config (or PET_TRACE=state,pulse / all / none) picks categories, PET_TRACE_ECHO=1 prints events too.
+
+import os, sys, json, time, threading
+
+from data.render_config import RENDER_CONFIG
+
+CATEGORIES = ("state", "pulse", "flag", "anim", "move", "click", "var", "window")
+
+# switches, module attributes so call sites always see the current value
+state = pulse = flag = anim = move = click = var = window = False
+echo = False
+
+# event kinds: (name, category)
+KINDS = [
+    ("state_enter", "state"),
+    ("state_exit", "state"),
+    ("transition_end", "state"),  # a transition animation finished, the pending state gets applied
+    ("pulse", "pulse"),
+    ("flag_raised", "flag"),
+    ("flag_cleared", "flag"),
+    ("anim_end", "anim"),  # went past the last frame (loops carry on)
+    ("anim_finished", "anim"),  # stopped on the last frame
+    ("drag_snap", "move"),
+    ("landed", "move"),
+    ("click", "click"),
+    ("hold", "click"),
+    ("letgo", "click"),
+    ("var_add", "var"),
+    ("window_resize", "window"),  # the window grew or shrank to fit the sprite (engine/window_geometry.py)
+]
+(STATE_ENTER, STATE_EXIT, TRANSITION_END, PULSE, FLAG_RAISED, FLAG_CLEARED, ANIM_END, ANIM_FINISHED,
+ DRAG_SNAP, LANDED, CLICK, HOLD, LETGO, VAR_ADD, WINDOW_RESIZE) = range(len(KINDS))
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TRACE_FILE = os.path.join(BASE_DIR, RENDER_CONFIG.get("trace_file", "cache/trace.json"))
+
+
+class Ring:  # fixed size, the oldest event gets overwritten
+    def __init__(self, size):
+        self.size = size
+        self.times = [0.0] * size
+        self.kinds = [0] * size
+        self.a = [None] * size
+        self.b = [None] * size
+        self.next = 0
+        self.total = 0  # events ever added, total - size of them were overwritten
+
+    def add(self, kind, a, b):
+        i = self.next
+        self.times[i] = time.perf_counter()
+        self.kinds[i] = kind
+        self.a[i] = a
+        self.b[i] = b
+        self.next = i + 1 if i + 1 < self.size else 0
+        self.total += 1
+
+    def events(self):  # oldest first
+        count = min(self.total, self.size)
+        start = (self.next - count) % self.size
+        result = []
+        for n in range(count):
+            i = (start + n) % self.size
+            name, category = KINDS[self.kinds[i]]
+            result.append({"t": round(self.times[i] - STARTED, 6), "event": name, "category": category, "a": self.a[i], "b": self.b[i]})
+        return result
+
+
+STARTED = time.perf_counter()
+ring = Ring(RENDER_CONFIG.get("trace_size", 4096))
+
+
+def emit(kind, a=None, b=None):  # a and b are whatever the event is about (state name, pulse, position...)
+    ring.add(kind, a, b)
+    if echo:
+        print(f"[TRACE] {KINDS[kind][0]} {'' if a is None else a} {'' if b is None else b}")
+
+
+def enable(categories):  # "all", "none", "state,pulse" or a list
+    if isinstance(categories, str):
+        categories = CATEGORIES if categories == "all" else [] if categories in ("none", "") else categories.split(",")
+    unknown = set(categories) - set(CATEGORIES)
+    if unknown:
+        raise ValueError(f"unknown trace categories {sorted(unknown)}, there are {CATEGORIES}")
+
+    module = sys.modules[__name__]
+    for category in CATEGORIES:
+        setattr(module, category, category in categories)
+
+
+def enabled():
+    return [c for c in CATEGORIES if getattr(sys.modules[__name__], c)]
+
+
+def dump(path=None, reason="on demand"):
+    path = path or TRACE_FILE
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({
+            "reason": reason,
+            "categories": enabled(),
+            "events_total": ring.total,
+            "events_dropped": max(0, ring.total - ring.size),
+            "events": ring.events(),
+        }, f, indent=1, default=str)
+    return path
+
+
+def install_crash_dump():  # uncaught exceptions (Qt slots included, PySide6 reports those through sys.excepthook) write the trace first
+    previous = sys.excepthook
+
+    def hook(kind, value, tb):
+        try:
+            print(f"[TRACE] {kind.__name__}, last {min(ring.total, ring.size)} events written to {dump(reason=f'crash: {kind.__name__}: {value}')}")
+        finally:
+            previous(kind, value, tb)
+    sys.excepthook = hook
+
+    previous_thread = threading.excepthook
+
+    def thread_hook(args):
+        try:
+            dump(reason=f"crash in thread {args.thread.name if args.thread else '?'}: {args.exc_type.__name__}: {args.exc_value}")
+        finally:
+            previous_thread(args)
+    threading.excepthook = thread_hook
+
+
+enable(os.environ.get("PET_TRACE") or RENDER_CONFIG.get("trace", "all"))
+echo = os.environ.get("PET_TRACE_ECHO", "") not in ("", "0") or RENDER_CONFIG.get("trace_echo", False)
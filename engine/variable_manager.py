@@ -1,3 +1,4 @@
+from engine import trace
 
 
 class VariableManager:
@@ -9,16 +10,59 @@ class VariableManager:
             self.values[name] = float(cfg.get("value", 0.0))
             self.rates[name] = float(cfg.get("rate", 0.0))
 
+        # threshold watchers: name -> [[threshold, side], ...], side is -1 / 0 / 1 for below / on / above
+        self.watched = {}
+        self.on_cross = None
+
+    def watch(self, thresholds, on_cross):  # (name, value) pairs, on_cross() whenever a variable moves across, onto or off one. replaces the last watch
+        self.watched = {}
+        self.on_cross = on_cross
+        for name, value in thresholds:
+            current = self.values.get(name, 0.0)
+            self.watched.setdefault(name, []).append([value, (current > value) - (current < value)])
+
+    def _check_watched(self, name):
+        value = self.values[name]
+        crossed = False
+        for entry in self.watched[name]:
+            side = (value > entry[0]) - (value < entry[0])
+            if side != entry[1]:
+                entry[1] = side
+                crossed = True
+        if crossed:
+            self.on_cross()  # type: ignore
+
     def update(self, dt):
         for name, rate in self.rates.items():
             self.values[name] += rate * dt
 
+        if self.watched:
+            for name in self.watched:
+                self._check_watched(name)
+
+    def next_deadline(self, thresholds):  # seconds until a variable with a rate reaches one of the (name, value) thresholds, None if never
+        best = None
+        for name, value in thresholds:
+            rate = self.rates.get(name, 0.0)
+            if rate == 0:
+                continue
+
+            t = (value - self.values.get(name, 0.0)) / rate
+            if t >= 0 and (best is None or t < best):
+                best = t
+
+        return best
+
     def get(self, name):
         return self.values.get(name, 0.0)
 
     def set(self, name, value):
         self.values[name] = float(value)
+        if name in self.watched:
+            self._check_watched(name)
 
     def add(self, name, delta):
         self.values[name] += delta
-        print(self.values[name], name)
\ No newline at end of file
+        if trace.var: trace.emit(trace.VAR_ADD, name, self.values[name])
+        if name in self.watched:
+            self._check_watched(name)
\ No newline at end of file
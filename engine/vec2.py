@@ -31,12 +31,62 @@ class Vec2:
         return Vec2(self.x - other.x, self.y - other.y)
 
     def __mul__(self, value):
-        if isinstance(value, float):
+        if isinstance(value, (int, float)):
             return Vec2(self.x * value, self.y * value)
         if isinstance(value, Vec2):
             return Vec2(self.x * value.x, self.y * value.y)
+        return NotImplemented
 
     __rmul__ = __mul__
+
+    # in place math, changes this vector and returns it (so calls chain) instead of making a new one.
+    # for the per tick code, where a temporary Vec2 per operation adds up
+    def set(self, x=0.0, y=None):  # same arguments as Vec2(), set(other) copies other
+        if y is None:
+            if isinstance(x, Vec2):
+                x, y = x.x, x.y
+            elif isinstance(x, (tuple, list)):
+                x, y = x
+            else: y = 0.0
+
+        self.x = float(x)
+        self.y = float(y)
+        return self
+
+    def iadd(self, other):
+        self.x += other.x
+        self.y += other.y
+        return self
+
+    def isub(self, other):
+        self.x -= other.x
+        self.y -= other.y
+        return self
+
+    def scale(self, value):
+        self.x *= value
+        self.y *= value
+        return self
+
+    def add_scaled(self, other, value):  # self += other * value
+        self.x += other.x * value
+        self.y += other.y * value
+        return self
+
+    def normalize(self):  # zero stays zero
+        l = math.hypot(self.x, self.y)
+        if l != 0:
+            self.x /= l
+            self.y /= l
+        return self
+
+    def clamp_length(self, max_length):  # only takes the square root when it is too long
+        l2 = self.x * self.x + self.y * self.y
+        if l2 > max_length * max_length:
+            l = math.sqrt(l2)
+            self.x = self.x / l * max_length
+            self.y = self.y / l * max_length
+        return self
         
 
     def __iter__(self):
@@ -47,6 +97,9 @@ class Vec2:
     def length(self):
         return math.hypot(self.x, self.y)
 
+    def length_squared(self):  # for comparisons, compare against distance * distance
+        return self.x * self.x + self.y * self.y
+
     def normalized(self):
         l = self.length()
         if l == 0:
@@ -54,7 +107,12 @@ class Vec2:
         return Vec2(self.x / l, self.y / l)
 
     def distance_to(self, other):
-        return (self - other).length()
+        return math.hypot(self.x - other.x, self.y - other.y)
+
+    def distance_squared_to(self, other):
+        dx = self.x - other.x
+        dy = self.y - other.y
+        return dx * dx + dy * dy
 
     def lerp(self, target, t: float):
         return self + (target - self) * t
\ No newline at end of file
@@ -0,0 +1,122 @@
+# engine/window_geometry.py
+# Keeps the translucent window only as big as the sprite actually needs, the compositor re-blends the whole window on every repaint
+# Rect is relative to the pet anchor (bottom-middle of the sprite): (left, top, width, height), left/top usually negative
+# Grows right away when the sprite would be clipped, shrinks only after it has been too big for a while (so swinging doesnt thrash it)
+
+import math
+
+from data.render_config import RENDER_CONFIG
+
+WINDOW_MARGIN = RENDER_CONFIG.get("window_margin", 4)  # pixels of slack around the sprite
+WINDOW_SHRINK_RATIO = RENDER_CONFIG.get("window_shrink_ratio", 1.3)  # shrink once the window is this much bigger (area) than needed
+WINDOW_SHRINK_DELAY = RENDER_CONFIG.get("window_shrink_delay", 1.5)  # seconds it has to stay too big before shrinking
+WINDOW_STEP = RENDER_CONFIG.get("window_step", 16)  # window edges snap outwards to this grid, so a slowly growing swing resizes in steps
+
+
+def sprite_bounds(w, h, angle=0.0, mirrored=False, pivot_x=0.0, pivot_y=0.0):  # (left, top, right, bottom) of a w*h sprite standing on the anchor
+    corners = [(-w / 2, -h), (w / 2, -h), (-w / 2, 0.0), (w / 2, 0.0)]
+    if mirrored:
+        corners = [(-x, y) for x, y in corners]
+
+    if angle != 0:  # rotated around the pivot, same as the sprite cache / paintEvent
+        c = math.cos(math.radians(angle))
+        s = math.sin(math.radians(angle))
+        corners = [
+            (pivot_x + (x - pivot_x) * c - (y - pivot_y) * s, pivot_y + (x - pivot_x) * s + (y - pivot_y) * c)
+            for x, y in corners
+        ]
+
+    xs = [x for x, _ in corners]
+    ys = [y for _, y in corners]
+    return min(xs), min(ys), max(xs), max(ys)
+
+
+def swing_angles(w, h, angle, mirrored=False, pivot_x=0.0, pivot_y=0.0):  # the angles in [-angle, angle] where some corner is furthest out
+    angle = abs(angle)
+    angles = [-angle, 0.0, angle]
+
+    corners = [(-w / 2, -h), (w / 2, -h), (-w / 2, 0.0), (w / 2, 0.0)]
+    for x, y in corners:
+        dx, dy = (-x if mirrored else x) - pivot_x, y - pivot_y
+        # a corner at (dx, dy) from the pivot is furthest left / right where dx*sin + dy*cos = 0, up / down where dx*cos - dy*sin = 0
+        for extreme in (math.atan2(-dy, dx), math.atan2(dx, dy)):
+            for a in (math.degrees(extreme), math.degrees(extreme) + 180):
+                a = (a + 180) % 360 - 180
+                if -angle <= a <= angle:
+                    angles.append(a)
+    return angles
+
+
+def swing_bounds(w, h, angle=0.0, mirrored=False, pivot_x=0.0, pivot_y=0.0):  # covers the sprite swinging anywhere between -angle and +angle
+    if angle == 0:
+        return sprite_bounds(w, h, 0, mirrored)
+
+    rects = [sprite_bounds(w, h, a, mirrored, pivot_x, pivot_y) for a in swing_angles(w, h, angle, mirrored, pivot_x, pivot_y)]
+    return min(r[0] for r in rects), min(r[1] for r in rects), max(r[2] for r in rects), max(r[3] for r in rects)
+
+
+class WindowGeometry:
+    def __init__(self, margin=WINDOW_MARGIN, shrink_ratio=WINDOW_SHRINK_RATIO, shrink_delay=WINDOW_SHRINK_DELAY, step=WINDOW_STEP):
+        self.margin = margin
+        self.step = max(1, step)
+        self.shrink_ratio = shrink_ratio
+        self.shrink_delay = shrink_delay
+
+        self.rect = None  # (left, top, width, height) relative to the anchor, whole pixels
+        self.too_big_for = 0.0
+
+        # measurements
+        self.resizes = 0
+        self.painted_frames = 0
+        self.painted_area = 0
+        self.fixed_area = 0  # area of the old fixed square window, for comparison
+
+    def update(self, bounds, dt):  # bounds = (left, top, right, bottom) the sprite needs. returns True if self.rect changed
+        left, top, right, bottom = bounds
+
+        if self.rect is None or not self._contains(left, top, right, bottom):
+            if self.rect is not None:  # grow to cover both, a swinging sprite keeps coming back
+                cl, ct, cw, ch = self.rect
+                left, top = min(left, cl), min(top, ct)
+                right, bottom = max(right, cl + cw), max(bottom, ct + ch)
+            self._set(left, top, right, bottom)
+            return True
+
+        needed_area = (right - left + 2 * self.margin + self.step) * (bottom - top + 2 * self.margin + self.step)
+        if self.rect[2] * self.rect[3] > needed_area * self.shrink_ratio:
+            self.too_big_for += dt
+            if self.too_big_for >= self.shrink_delay:
+                self._set(left, top, right, bottom)
+                return True
+        else:
+            self.too_big_for = 0.0
+
+        return False
+
+    def count_paint(self, w, h):
+        self.painted_frames += 1
+        self.painted_area += w * h
+
+    def stats(self):
+        avg = self.painted_area / self.painted_frames if self.painted_frames else 0
+        return {
+            "resizes": self.resizes,
+            "painted_frames": self.painted_frames,
+            "avg_area": avg,
+            "fixed_area": self.fixed_area,
+            "area_ratio": avg / self.fixed_area if self.fixed_area else 0,
+        }
+
+    def _contains(self, left, top, right, bottom):
+        cl, ct, cw, ch = self.rect  # type: ignore
+        return cl <= left and ct <= top and cl + cw >= right and ct + ch >= bottom
+
+    def _set(self, left, top, right, bottom):
+        # snapped outwards, the anchor stays at 0 so a symmetric sprite keeps a symmetric window
+        l = math.floor((left - self.margin) / self.step) * self.step
+        t = math.floor((top - self.margin) / self.step) * self.step
+        r = math.ceil((right + self.margin) / self.step) * self.step
+        b = math.ceil((bottom + self.margin) / self.step) * self.step
+        self.rect = (l, t, r - l, b - t)
+        self.too_big_for = 0.0
+        self.resizes += 1
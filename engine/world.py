@@ -0,0 +1,21 @@
+# engine/world.py
+# The part of the desktop the pet lives on, in logical pixels. pet.py fills it from the primary screen's available
+# geometry (screen minus taskbar), headless runs just make one up
+
+class World:
+    def __init__(self, left=0, top=0, width=1920, height=1040):
+        self.left = left
+        self.top = top
+        self.width = width
+        self.height = height
+
+    @property
+    def right(self):  # last pixel column, same as QRect.right()
+        return self.left + self.width - 1
+
+    @property
+    def bottom(self):  # last pixel row (top of the taskbar), same as QRect.bottom()
+        return self.top + self.height - 1
+
+    def __repr__(self):
+        return f"World({self.left}, {self.top}, {self.width}, {self.height})"
@@ -1,10 +1,10 @@
-# Main script with pet behavior: physics, drawing sprites, retrieving data
+# Main script: draws the pet and feeds it mouse input. The simulation itself is engine/pet_engine.py (no Qt in there)
 
 
-import sys, os, random, time, math
+import sys, os, random, time, math, signal
 from PySide6.QtWidgets import QApplication, QWidget
-from PySide6.QtGui import QPainter, QPixmap, QPen, QColor
-from PySide6.QtCore import Qt, QTimer, QPointF
+from PySide6.QtGui import QPainter, QPixmap, QPen, QColor, QCursor
+from PySide6.QtCore import Qt, QTimer, QPointF, Signal
 
 from enum import Enum, auto
 import warnings
@@ -13,275 +13,406 @@ from data.states import STATES, INITIAL_STATE
 from data.animations import ANIMATIONS
 from data.render_config import RENDER_CONFIG
 
-from engine.state_machine import StateMachine
-from engine.click_detector import ClickDetector
-from engine.mover import Mover
-from engine.animator import Animator
-from engine.enums import Flag, Pulse, MovementType, Facing
+from engine.pet_engine import PetEngine
+from engine.world import World
+from engine.enums import Facing, ThrottleMode
 from engine.vec2 import Vec2
-from engine.behaviour_resolver import BehaviourResolver
-
-
-from data.variables import VARIABLES
-from engine.variable_manager import VariableManager
+from engine.frame_store import FrameStore
+from engine.frame_cache import FrameCache
+from engine.sprite_cache import SpriteCache
+from engine.window_geometry import WindowGeometry, swing_bounds
+from engine.fixed_step import FixedStep
+from engine.scheduler import DeadlineScheduler
+from engine.presence import make_presence_source
+from engine.throttle import Throttle
+from engine.control import ControlServer, prometheus, engine_metrics, execute
+from engine import trace
+from engine.gc_policy import GcPolicy
 
 LOGIC_FPS = RENDER_CONFIG.get("logic_FPS", 60) #fps of logic processes
-
-#region --- HELPERS ---
-# ANIMATION STUFF
-def load_frames(folder):  # function for loading frames, recieves a string path to a folder, returns a list of png files( converted to PixMap ) in name order
-    frames = []
-
-    files = sorted(                # get the png files
-    f for f in os.listdir(folder)
-    if f.lower().endswith(".png")
-    )
-
-    for i, filename in enumerate(files):
-        pix = QPixmap(os.path.join(folder, filename))
-
-        frames.append(pix)
-
-    return frames
-
-def scan_animation_bounds(frames):
-    max_w = 0
-    max_h = 0
-
-    for pix in frames:
-        max_w = max(max_w, pix.width())
-        max_h = max(max_h, pix.height())
-
-    return max_w, max_h
-
-#endregion
-
-class Pet(QWidget): # main logic
-    def __init__(self):
+DISPLAY_FPS = RENDER_CONFIG.get("display_FPS", LOGIC_FPS) #fps of window moves and repaints, position and rotation are interpolated between logic ticks
+SCHEDULER = RENDER_CONFIG.get("scheduler", "deadline") # "deadline" sleeps until something is due, "fixed" wakes every tick
+PRESENCE_SOURCE = RENDER_CONFIG.get("presence_source", "auto") # see engine/presence.py
+WAKE_RADIUS = RENDER_CONFIG.get("wake_radius", 150) # cursor this close to the pet (px) always runs it at full speed
+GC_FREEZE = RENDER_CONFIG.get("gc_freeze", True) # everything loaded at startup is left out of garbage collection
+GC_DEFER_FULL = RENDER_CONFIG.get("gc_defer_full", True) # full collections only when the pet is about to sleep, see engine/gc_policy.py
+CONTROL_SOCKET = os.environ.get("PET_CONTROL") or RENDER_CONFIG.get("control_socket") # unix socket path for engine/control.py, None = off
+
+class Pet(QWidget): # renderer and input adapter over PetEngine
+    control_requested = Signal()  # emitted on the control socket thread, runs wake() on the Qt thread
+
+    def __init__(self, presence=None): # presence: a PresenceSource to use instead of the configured one (FakePresence for trying throttling out)
         super().__init__()
 
         self.setWindowFlags(Qt.FramelessWindowHint | Qt.WindowStaysOnTopHint | Qt.Tool)   # type: ignore # QT stuff idk idc
         self.setAttribute(Qt.WA_TranslucentBackground) # type: ignore
 
-        # get all animations in a dictionary
-        self.animations = {}
+        # frames are decoded already scaled to the size they are drawn at (see engine/frame_store.py)
         base = os.path.dirname(os.path.abspath(__file__))
+        cache_file = RENDER_CONFIG.get("frame_cache_file")
+        frame_cache = FrameCache(os.path.join(base, cache_file)) if cache_file else None  # decoded frames from the last launch
+        self.frame_store = FrameStore(base, ANIMATIONS, cache=frame_cache)
+        self.sprite_cache = SpriteCache()  # mirrored / rotated frames for paintEvent
+        self.window_geometry = WindowGeometry()  # window hugs the sprite instead of a fixed square
+
+        # dirty tracking, the window only moves / repaints when something visible changed
+        self.window_pos = None  # integer position the window was last moved to
+        self.last_look = None  # (facing, rotation bucket) last painted
+        self.last_present = None  # logic clock time update_display last ran on the deadline scheduler
+        self.geometry_dirty = True
+        self.moves_issued = 0
+        self.moves_skipped = 0
+        self.repaints_issued = 0
+        self.repaints_skipped = 0
 
-        max_bounds_w = 0
-        max_bounds_h = 0
-
-        for name in list(ANIMATIONS):
-            cfg = ANIMATIONS[name]
-            folder = os.path.join(base, cfg["folder"])
-
-            frames = []
-
-            frames = load_frames(folder)
-
-            if not frames:
-                raise RuntimeError(f"No frames found for animation '{name}'")
-            
-            bounds_w, bounds_h = scan_animation_bounds(frames)
-            max_bounds_w = max(max_bounds_w, bounds_w)
-            max_bounds_h = max(max_bounds_h, bounds_h)
-
-            self.animations[name] = {
-                "frames": frames,
-                "fps": cfg["fps"],
-                "loop": cfg["loop"],
-                "holds": cfg.get("holds", {}),
-                "bounds": scan_animation_bounds(frames),
-                "times_to_loop": cfg.get("times_to_loop", 1)
-            }
-            print(f"[ANIM LOAD] {name}: {len(frames)} frames")
-
-                  
-        self.variables = VariableManager(VARIABLES)
-        self.animator = Animator(self)
-
-        self.hitbox_width = 0
-        self.hitbox_height = 0
-        
-        self.mover = Mover(self)
-        self.anchor = Vec2(500, 500)
-
-        self.primary_screen = QApplication.primaryScreen()
         screen = QApplication.primaryScreen() # Screen detection
-        self.taskbar_top = screen.availableGeometry().bottom() # Taskbar position detection
-        self.mover.set_position(100, self.taskbar_top + 1) # set initial position
+        available = screen.availableGeometry() # screen without the taskbar
+        world = World(available.left(), available.top(), available.width(), available.height())
 
-        cfg_facing = RENDER_CONFIG.get("default_facing")
-        self.facing = Facing.__members__.get(cfg_facing, Facing.RIGHT)  # type: ignore # defining dacing direction
-
-        self.behaviour_resolver = BehaviourResolver(self)
-
-        h = screen.availableGeometry().height()
         initial_state = INITIAL_STATE.get("default", next(iter(INITIAL_STATE))) #either get the "default" from the INITIAL STATE, or the first item in the STATES dictinary
         
-        self.update_dpi_and_scale(h=h, initial_state=initial_state)
-
-        max_measurement = max(max_bounds_w, max_bounds_h)
-        self.resize_keep_anchor(int(max_measurement * self.scale * 2), int(max_measurement * self.scale * 2))
-
-        self.state_machine = StateMachine(pet=self, configs=STATES, initial=initial_state) # set initial state
-        self.click_detector = ClickDetector(pet=self) #initialising ClickDetector
-
-        self.last_mouse_pos = Vec2()
-
-        self.drag_offset = Vec2(0,0)
-        self.rotation_angle = 0
-
-        self.update_hitbox_size_and_drag_offset() # initial hitbox update
-
-
-        # Timer for updating logic
-        self.timer = QTimer()
-        self.timer.timeout.connect(self.update_logic)
-        self.timer.start(1000 // LOGIC_FPS)
-
-
-    def on_state_enter(self, state): #called in state_machine when entering a new state
-        print("STATE:", state)
-        
-        self.variables.set("times_clicked_this_state", 0)
-        self.variables.set("time_spent_in_this_state", 0)
-
-        cfg = STATES[state]      # gets the config for the state from states.py
-        anim_name = cfg.get("animation")
-
-        movement_settings = cfg.get("settings", {})
-        acceleration = movement_settings.get("acceleration", self.mover.acceleration)
-        max_speed = movement_settings.get("max_speed", self.mover.max_speed)
-        slow_radius = movement_settings.get("slow_radius", self.mover.slow_radius)
-        snap_distance = movement_settings.get("snap_distance", self.mover.snap_distance)
-        jump_velocity = movement_settings.get("jump_velocity", self.mover.jump_velocity)
-        gravity = movement_settings.get("gravity", self.mover.gravity)
-        self.mover.set_settings(acceleration=acceleration, max_speed=max_speed, slow_radius=slow_radius, snap_distance=snap_distance, jump_velocity=jump_velocity,gravity=gravity)
-
-        behaviour_name = cfg.get("behaviour", "STATIONARY")
-        # print(behaviour_name)
-
-        target_x, target_y, type, settings = self.behaviour_resolver.resolve(behaviour_name)
-
-        isAbletoRotate = True if type == MovementType.DRAG else False
-
-        self.play_animation(anim_name=anim_name, cfg=cfg, isAbletoRotate=isAbletoRotate)
-
-        if type == MovementType.STATIONARY: # hardcoded doing nothing for stationary
+        self.update_dpi_and_scale(h=available.height(), initial_state=initial_state)
+
+        # only the first animation is decoded before the window shows up, the rest is prefetched when states are entered
+        load_start = time.perf_counter()
+        self.frame_store.load(STATES[initial_state]["animation"])
+        load_ms = (time.perf_counter() - load_start) * 1000
+        if frame_cache:
+            start_type = "warm" if frame_cache.misses == 0 else "cold"
+            print(f"[ANIM LOAD] {start_type} start: {load_ms:.1f} ms")
+        else:
+            print(f"[ANIM LOAD] {load_ms:.1f} ms (frame cache disabled)")
+
+        max_measurement = max(max(self.frame_store.source_bounds(name)) for name in ANIMATIONS) * self.scale  # png headers only, nothing decoded
+        self.window_geometry.fixed_area = int(max_measurement * 2) ** 2  # what the window used to be, only for the stats
+
+        self.engine = PetEngine(world, self.frame_store, initial_state=initial_state) # the simulation, everything below is drawing and timing
+
+        trace.install_crash_dump()
+        if hasattr(signal, "SIGUSR2"):  # kill -USR2 <pid> writes what happened lately (engine/trace.py)
+            signal.signal(signal.SIGUSR2, lambda *_: print(f"[TRACE] written to {trace.dump()}"))  # type: ignore
+        if self.engine.profiler and hasattr(signal, "SIGUSR1"):  # kill -USR1 <pid> writes the profile without quitting
+            signal.signal(signal.SIGUSR1, lambda *_: print(f"[PROFILE] written to {self.engine.profiler.dump()}"))  # type: ignore
+
+        # what is actually shown, interpolated between the previous and the latest logic tick (see update_display)
+        self.prev_anchor = self.engine.anchor.copy()
+        self.display_anchor = self.engine.anchor.copy()
+        self.prev_angle = 0
+        self.display_angle = 0
+        self.last_display_time = time.perf_counter()
+
+        self.update_window_geometry(0)
+
+
+        # logic always steps by exactly 1 / LOGIC_FPS, timers only wake the accumulator up
+        self.logic_clock = FixedStep(LOGIC_FPS)
+        self.scheduler = None
+        self.planned_steps = 0
+
+        # locked screen, fullscreen app or nobody around -> tick slower or freeze (engine/throttle.py)
+        self.throttle = Throttle(presence or make_presence_source(PRESENCE_SOURCE, lambda: QCursor.pos().toTuple()))
+
+        if SCHEDULER == "fixed":
+            # Timer for updating logic
+            self.timer = QTimer()
+            self.timer.setTimerType(Qt.PreciseTimer)  # type: ignore
+            self.timer.timeout.connect(self.on_logic_timer)
+            self.timer.start(1000 // LOGIC_FPS)
+
+            # Timer for moving / repainting the window
+            self.display_timer = QTimer()
+            self.display_timer.timeout.connect(self.update_display)
+            self.display_timer.start(1000 // DISPLAY_FPS)
+        else:
+            # one single shot timer armed for whatever is due first
+            self.scheduler = DeadlineScheduler(self.logic_clock)
+            for name, deadline in self.engine.deadlines():
+                self.scheduler.add(name, deadline)
+
+            self.wake_timer = QTimer()
+            self.wake_timer.setSingleShot(True)
+            self.wake_timer.setTimerType(Qt.PreciseTimer)  # type: ignore
+            self.wake_timer.timeout.connect(self.on_wake)
+            self.wake_timer.start(0)
+
+        # inspecting / poking the pet from outside, commands are applied between ticks on this thread
+        self.control = None
+        if CONTROL_SOCKET:
+            self.control = ControlServer(CONTROL_SOCKET, wake=self.control_requested.emit)
+            self.control_requested.connect(self.wake)
+            if not self.control.start():
+                self.control = None
+
+        # last, so the freeze covers everything loaded above
+        self.gc_policy = GcPolicy(defer_full=GC_DEFER_FULL)
+        self.gc_policy.install()
+        if GC_FREEZE:
+            self.gc_policy.freeze()
+
+
+    def on_logic_timer(self):  # runs however many fixed steps of wall time passed since the last callback
+        prof = self.engine.profiler
+        if prof and self.scheduler is None:
+            start = prof.start()
+
+        was_frozen = self.throttle.mode == ThrottleMode.FROZEN
+        steps = self.logic_clock.advance(self.planned_steps)  # before update_throttle, planned_steps belongs to the interval that just passed
+        mode = self.update_throttle()
+
+        if was_frozen or mode == ThrottleMode.FROZEN:
+            self.engine.variables.update(steps * self.logic_clock.dt)  # nothing moves or animates, but timers like sleep_timer still count the time
+        else:
+            for _ in range(steps):
+                self.update_logic()
+
+        if self.control and self.control.queue:  # after catching up, so commands land at the current time
+            self.control.drain(self.run_command)
+
+        if prof and self.scheduler is None:  # fixed ticking, every timer callback is a wake up
+            prof.wake(start)
+
+        if self.scheduler is None:  # never really idle, a full collection only runs once it is overdue (or throttled)
+            self.gc_policy.maybe_collect(self.timer.interval() / 1000)
+
+    def on_wake(self):  # deadline scheduler: catch logic up, present, sleep until the next deadline
+        prof = self.engine.profiler
+        if prof:
+            start = prof.start()
+
+        scheduler = self.scheduler
+        assert scheduler is not None  # the wake timer only runs with the deadline scheduler on
+        scheduler.wakeups += 1
+        sleep = 1 / DISPLAY_FPS  # what the timer gets re-armed with if anything below raises, the pet keeps running
+        try:
+            self.on_logic_timer()
+
+            mode = self.throttle.mode
+            display_in = None
+            if mode != ThrottleMode.FROZEN:
+                # mouse events wake the pet at their own rate, only a new frame / facing is presented right away,
+                # movement waits for the next display_FPS slot
+                now = self.logic_clock.clock()
+                wait = 0.0 if self.last_present is None else 1 / DISPLAY_FPS - (now - self.last_present)
+                if wait <= 0.001 or self.engine.animator.dirty or self.engine.facing != (self.last_look or (None,))[0]:
+                    self.update_display()
+                    self.last_present = now
+                    display_in = self.display_deadline()
+                else:
+                    display_in = wait  # something moved since the last present, it still has to go out
+
+            min_sleep = self.throttle.min_sleep()
+            max_sleep = None if mode == ThrottleMode.FULL else max(min_sleep, self.throttle.poll_interval)  # keep checking presence
+            sleep, self.planned_steps = scheduler.plan(display_in, min_sleep, max_sleep)
+        finally:
+            self.wake_timer.start(math.ceil(sleep * 1000))
+
+        if prof:
+            prof.wake(start)
+
+        self.gc_policy.maybe_collect(sleep)  # the timer is already running, a full collection eats into the sleep instead of a frame
+
+    def run_command(self, line):  # a control socket command, see engine/control.py
+        return execute(self.engine, line, self.metrics)
+
+    def metrics(self):  # everything worth watching, prometheus text
+        clock = self.logic_clock.stats()
+        window = self.window_geometry.stats()
+        frames = self.frame_store.stats()
+        sprites = self.sprite_cache.stats()
+        metrics = engine_metrics(self.engine) + [
+            ("pet_logic_steps_total", "counter", "fixed logic steps run", [({}, clock["steps"])]),
+            ("pet_dropped_steps_total", "counter", "logic steps dropped when too far behind", [({}, clock["dropped_steps"])]),
+            ("pet_timer_callbacks_total", "counter", "logic timer callbacks / wake ups", [({}, clock["callbacks"])]),
+            ("pet_repaints_total", "counter", "repaints asked for", [({"result": "issued"}, self.repaints_issued), ({"result": "skipped"}, self.repaints_skipped)]),
+            ("pet_window_moves_total", "counter", "window moves", [({"result": "issued"}, self.moves_issued), ({"result": "skipped"}, self.moves_skipped)]),
+            ("pet_paints_total", "counter", "paintEvents", [({}, window["painted_frames"])]),
+            ("pet_window_resizes_total", "counter", "window resizes", [({}, window["resizes"])]),
+            ("pet_window_area_pixels", "gauge", "average painted window area", [({}, round(window["avg_area"]))]),
+            ("pet_frame_cache_total", "counter", "decoded animation lookups", [({"result": "hit"}, frames["hits"]), ({"result": "miss"}, frames["misses"]), ({"result": "eviction"}, frames["evictions"])]),
+            ("pet_frame_cache_bytes", "gauge", "decoded frame memory", [({"kind": "used"}, frames["used_bytes"]), ({"kind": "budget"}, frames["budget_bytes"])]),
+            ("pet_sprite_cache_total", "counter", "rotated / mirrored sprite lookups", [({"result": "hit"}, sprites["hits"]), ({"result": "miss"}, sprites["misses"]), ({"result": "uncached"}, sprites["uncached"])]),
+            ("pet_sprite_cache_size", "gauge", "sprites cached", [({"kind": "used"}, sprites["size"]), ({"kind": "capacity"}, sprites["capacity"])]),
+            ("pet_sprite_cache_bytes", "gauge", "cached sprite memory", [({}, sprites["bytes"])]),
+            ("pet_gc_collections_total", "counter", "garbage collections", [({"generation": g}, n) for g, n in enumerate(self.gc_policy.collections)]),
+            ("pet_gc_pause_seconds_total", "counter", "time spent in garbage collection", [({"generation": g}, round(t, 6)) for g, t in enumerate(self.gc_policy.pause_total)]),
+            ("pet_gc_pause_max_seconds", "gauge", "longest garbage collection pause", [({"generation": g}, round(t, 6)) for g, t in enumerate(self.gc_policy.pause_max)]),
+            ("pet_throttle_mode", "gauge", "1 for the current throttle mode", [({"mode": m.name}, int(m == self.throttle.mode)) for m in ThrottleMode]),
+        ]
+        if self.scheduler:
+            metrics.append(("pet_wakeups_total", "counter", "deadline scheduler wake ups", [({}, self.scheduler.wakeups)]))
+
+        prof = self.engine.profiler
+        if prof:  # PET_PROFILE=1
+            for phase in ("tick", "paint", "wake"):
+                hist = prof.phases.get(phase)
+                if hist and hist.count:
+                    quantiles = [({"quantile": str(q)}, round(hist.percentile(q) / 1e9, 6)) for q in (0.5, 0.95, 0.99)]
+                    totals = [({}, round(hist.total / 1e9, 6), "_sum"), ({}, hist.count, "_count")]
+                    metrics.append((f"pet_{phase}_seconds", "summary", f"{phase} duration", quantiles + totals))
+            metrics.append(("pet_tick_overruns_total", "counter", "logic ticks over their budget", [({}, prof.tick_overruns)]))
+        return prometheus(metrics)
+
+    def cursor_near(self):
+        r = WAKE_RADIUS
+        return self.frameGeometry().adjusted(-r, -r, r, r).contains(QCursor.pos())
+
+    def resume(self):  # mouse activity near a throttled pet: back to full speed now
+        if self.throttle.mode == ThrottleMode.FULL:
             return
-
-        if type == MovementType.DRAG:  # hardcoded behaviour for drag
-            self.mover.movement_type = MovementType.DRAG
-
-            if not self.click_detector.press_pos: #safe check
-                self.mover.end_drag()
-                return
-            
-            pos = Vec2(self.click_detector.press_pos.x(), self.click_detector.press_pos.y())
-            self.mover.begin_drag(pos)
-            return
-
-        self.mover.set_position(self.anchor) #type: ignore
-        self.mover.move_to(target_x, target_y, type)
-
-       
-    def on_state_exit(self, state): #just does nothing when the state is done
-        pass
-
-    def play_animation(self, anim_name, cfg, isTransitionAnimation = False, isAbletoRotate = False):
-        anim_name = anim_name
-
-        if anim_name not in ANIMATIONS:
-            raise Exception("ANIMATION", anim_name, "NOT FOUND")  #no idea what this does will add user notification that error occured
-
-        anim_cfg = ANIMATIONS[anim_name]
-
-        frames = self.animations[anim_name]["frames"]
-        fps = cfg.get("fps", anim_cfg.get("fps", 6)) # safestate, will default to the latter
-        loop_option = RENDER_CONFIG.get("default_loop_option", False)
-        loop = cfg.get("loop", anim_cfg.get("loop", loop_option)) # safestate, will default to the latter
-        times_to_loop = cfg.get("times_to_loop", anim_cfg.get("times_to_loop", 1))
-        holds = cfg.get("holds", anim_cfg.get("holds", {}))  # safestate, will default to empty directory
-
-        bounds_w, bounds_h = self.animations[anim_name]["bounds"]
-
-        # if not isAbletoRotate:
-        #     self.resize_keep_anchor(int(bounds_w * self.scale), int(bounds_h * self.scale))
-        # else: 
-        #     self.resize_keep_anchor(int(bounds_h * self.scale * 2), int(bounds_h * self.scale * 2))
-
-        if isTransitionAnimation: 
-            loop = False  #if receiving a transition animation, looping is disabled
-            # print("transition animation playing")
-
-        # print("starting animation", anim_name, " Frame count:", len(frames), " loop:", loop, " times to loop:", times_to_loop, " holds:", holds)
-        self.animator.set(frames=frames, fps=fps, loop=loop, times_to_loop=times_to_loop, holds=holds) #sets animation in animator
-
-    def _mouse_vec(self, event):   #helper function for converting Qt points to Vec2
-        p = event.globalPosition()
-        return Vec2(p.x(), p.y())
+        if self.scheduler:
+            self.wake()  # on_wake runs update_throttle, which sees the cursor
+        else:
+            self.on_logic_timer()  # same, and puts the fixed timers back to full rate
+
+    def update_throttle(self):  # mode for this wake up, the cursor near the pet always means full speed
+        # no separate cursor polling: throttled wake ups check the cursor at their own (slow) rate, the cursor entering
+        # the window wakes the pet right away (enterEvent)
+        near = self.cursor_near()
+
+        old = self.throttle.mode
+        mode = self.throttle.update(near)
+
+        if mode != old and self.scheduler is None:  # fixed ticking just slows its timers down
+            if mode == ThrottleMode.FULL:
+                self.timer.setInterval(1000 // LOGIC_FPS)
+                self.display_timer.setInterval(1000 // DISPLAY_FPS)
+                self.planned_steps = 0
+            else:
+                interval = self.throttle.min_sleep()
+                self.timer.setInterval(int(interval * 1000))
+                self.display_timer.setInterval(int(interval * 1000))
+                self.planned_steps = math.ceil(interval / self.logic_clock.dt)
+        return mode
+
+    def catch_up(self):  # input is about to change things, run the steps that were due before it first
+        if self.scheduler:
+            self.on_logic_timer()
+            self.planned_steps = 0
+
+    def wake(self):  # input changed things, dont wait for the armed deadline
+        if self.scheduler:
+            self.wake_timer.start(0)
+
+    def display_deadline(self):  # seconds until the window has to be presented again on its own, None if it is settled
+        if (self.engine.mover.active or self.engine.rotation_angle != 0 or self.display_angle != self.engine.rotation_angle
+                or self.display_anchor.x != self.engine.anchor.x or self.display_anchor.y != self.engine.anchor.y):
+            return 1 / DISPLAY_FPS  # moving, keep interpolating
+
+        if self.window_geometry.too_big_for > 0:
+            return max(0.0, self.window_geometry.shrink_delay - self.window_geometry.too_big_for)
+
+        return None
+
+    def update_logic(self):  # UPDATE LOGIC, one fixed step
+        # the display interpolates from this state to the one this tick ends in
+        self.prev_anchor.x, self.prev_anchor.y = self.engine.anchor.x, self.engine.anchor.y
+        self.prev_angle = self.engine.rotation_angle
+
+        self.engine.update(self.logic_clock.dt)
+
+    def update_display(self):  # UPDATE DISPLAY, runs at display_FPS
+        prof = self.engine.profiler
+        if prof:
+            start = prof.start()
+
+        now = time.perf_counter()
+        dt = now - self.last_display_time
+        self.last_display_time = now
+
+        # how far we are into the current logic tick, one tick behind the simulation but smooth at any rate
+        alpha = self.logic_clock.alpha()
+
+        self.display_anchor.x = self.prev_anchor.x + (self.engine.anchor.x - self.prev_anchor.x) * alpha
+        self.display_anchor.y = self.prev_anchor.y + (self.engine.anchor.y - self.prev_anchor.y) * alpha
+
+        turn = (self.engine.rotation_angle - self.prev_angle + 180) % 360 - 180  # shortest way round, free spin wraps at +-180
+        self.display_angle = self.prev_angle + turn * alpha
+
+        self.update_window_geometry(dt)
+        self.apply_window_position()  # only if the integer position changed
+
+        if self.needs_repaint():
+            self.update()  # repaint
+            self.repaints_issued += 1
+        else:
+            self.repaints_skipped += 1
+
+        if prof:
+            prof.lap("display", start)  # moving the window and asking for a repaint, painting itself is "paint"
     
-    def update_logic(self):  # UPDATE LOGIC
-        dt = 1 / LOGIC_FPS
 
-        # --- INPUT PHASE ---
-        if self.mover.movement_type == MovementType.DRAG:
-            self.mover.update_drag_target(self.last_mouse_pos, dt)
-    
-        self.click_detector.update()
-        self.variables.update(dt)
-    
-        # --- STATE / SIMULATION PHASE ---
-        self.animator.update(dt)
-        arrived = self.mover.update(dt)
+    def apply_window_position(self):
+        left, top, _, _ = self.window_geometry.rect  # type: ignore
+        pos = (math.floor(self.display_anchor.x + left), math.floor(self.display_anchor.y + top))
+        if pos == self.window_pos:
+            self.moves_skipped += 1
+            return
 
-        
-        if arrived:
-            self.click_detector.release()
-            self.state_machine.raise_flag(Flag.MOVEMENT_FINISHED)
+        self.move(*pos)
+        self.window_pos = pos
+        self.moves_issued += 1
 
-        self.state_machine.update(dt)
+    def needs_repaint(self):  # new animation frame, facing, rotation step or window size. moving alone doesnt need a repaint
+        look = (self.engine.facing, self.sprite_cache.bucket(self.display_angle))
+        dirty = self.engine.animator.dirty or self.geometry_dirty or look != self.last_look
 
-        # print("position is", self.mover.pos.x, self.mover.pos.y)
-        # print("facing is", self.facing)
-    
-        # --- POSITION SYNC PHASE ---
-        self.anchor.x = self.mover.pos.x
-        self.anchor.y = self.mover.pos.y
-    
-        self.apply_window_position()
+        self.engine.animator.dirty = False
+        self.geometry_dirty = False
+        self.last_look = look
+        return dirty
 
-        self.update()  # repaint
-    
+    def update_window_geometry(self, dt):  # resizes the window to what the current animation / rotation needs
+        if not self.engine.animator.name:
+            return
 
-    def apply_window_position(self):
-        self.move(
-            int(self.anchor.x - self.width() / 2),
-            int(self.anchor.y - self.height())
+        bounds_w, bounds_h = self.frame_store.get_bounds(self.engine.animator.name)  # already scaled, biggest frame of the animation
+        needed = swing_bounds(  # rotation is checked against both sides of the swing, it keeps coming back
+            bounds_w, bounds_h, self.display_angle, self.engine.facing == Facing.LEFT,
+            self.engine.drag_offset.x, self.engine.drag_offset.y
         )
 
-    def resize_keep_anchor(self, new_w, new_h):
-        old_pos = self.pos()
-        old_w = self.width()
-        old_h = self.height()
-
-        # world-space anchor (bottom-middle)
-        self.anchor.x = old_pos.x() + old_w // 2
-        self.anchor.y = old_pos.y() + old_h
-
-        new_x = self.anchor.x - new_w // 2
-        new_y = self.anchor.y - new_h
+        if not self.window_geometry.update(needed, dt):
+            return
 
-        self.setGeometry(new_x, new_y, new_w, new_h)
+        left, top, w, h = self.window_geometry.rect  # type: ignore
+        self.window_pos = (math.floor(self.display_anchor.x + left), math.floor(self.display_anchor.y + top))  # not int(), monitors left of / above the primary one are negative
+        self.setGeometry(*self.window_pos, w, h)
+        self.geometry_dirty = True
+        if trace.window: trace.emit(trace.WINDOW_RESIZE, (w, h), self.engine.animator.name)  # counted in window_geometry.resizes, printed on quit
+
+    def on_quit(self):
+        stats = self.window_geometry.stats()
+        print(f"[WINDOW] avg composited area {stats['avg_area']:.0f} px per frame, fixed square was {stats['fixed_area']} px "
+              f"({stats['area_ratio'] * 100:.0f}%), {stats['resizes']} resizes")
+        print(f"[SPRITE CACHE] {self.sprite_cache.stats()}")
+        print(f"[REPAINT] {self.repaints_issued} repaints, {self.repaints_skipped} skipped; "
+              f"{self.moves_issued} window moves, {self.moves_skipped} skipped")
+        clock = self.logic_clock.stats()
+        print(f"[CLOCK] {clock['steps']} steps in {clock['callbacks']} callbacks, simulated {clock['simulated_s']:.3f} s of "
+              f"{clock['wall_s']:.3f} s (drift {clock['drift_s'] * 1000:.1f} ms, one step per callback would be "
+              f"{clock['fixed_dt_drift_s'] * 1000:.0f} ms), {clock['late_callbacks']} late, {clock['dropped_steps']} steps dropped, "
+              f"longest gap {clock['longest_gap_ms']:.0f} ms")
+        print(f"[THROTTLE] {self.throttle.stats()}")
+        if self.scheduler:
+            sched = self.scheduler.stats()
+            print(f"[SCHEDULER] {sched['wakeups']} wakeups ({sched['wakeups_per_s']:.1f}/s, fixed ticking is {LOGIC_FPS + DISPLAY_FPS}/s), "
+                  f"woken by {sched['woken_by']}")
+        print(f"[GC] {self.gc_policy.stats()}")
+        print(f"[TRACE] {trace.ring.total} events ({', '.join(trace.enabled()) or 'off'})")
+        if self.control:
+            print(f"[CONTROL] {self.control.stats()}")
+            self.control.stop()
+        if self.engine.profiler:
+            print(f"[PROFILE] {self.engine.profiler.summary_line()}, written to {self.engine.profiler.dump()}")
     
     def update_dpi_and_scale(self, h, initial_state):
         percentage = RENDER_CONFIG["pet_size_on_screen"] / 100
         
         self.dpi_scale = self.devicePixelRatioF()
-        first_frame = self.animations[STATES[initial_state]["animation"]]["frames"][0]
-        self.pixel_ratio = (h * percentage) / first_frame.height() / self.dpi_scale
+        _, first_frame_h = self.frame_store.source_size(STATES[initial_state]["animation"])  # only reads the png header
+        self.pixel_ratio = (h * percentage) / first_frame_h / self.dpi_scale
         print("screen height", h)
-        print("dirst frame h:", first_frame.height())
+        print("dirst frame h:", first_frame_h)
         print("pixel ratio", self.pixel_ratio)
 
         self.scale = self.pixel_ratio * self.dpi_scale
@@ -289,42 +420,43 @@ class Pet(QWidget): # main logic
         print("screen dpi", self.dpi_scale)
         print("new scale", self.scale)
 
-    def update_hitbox_size_and_drag_offset(self):
-            frame = self.animator.frame()
-            if not frame:
-                return
-                      
-            self.hitbox_width = frame.width() * self.scale
-            self.hitbox_height = frame.height() * self.scale
-
-            # print(self.hitbox_height)
-            # print(self.hitbox_width)
-
-            self.drag_offset = Vec2(self.hitbox_width * RENDER_CONFIG["drag_offset_x"], self.hitbox_height * RENDER_CONFIG["drag_offset_y"])
-            self.mover.drag_offset = self.drag_offset
+        self.frame_store.set_scale(self.scale, self.dpi_scale)  # frames get rescaled from the mipmap chain if already loaded
+        self.sprite_cache.clear()
+        self.geometry_dirty = True  # repaint with the new frames
 
     def mousePressEvent(self, event):
+        self.catch_up()
         if event.button() == Qt.LeftButton: # type: ignore
-            self.click_detector.press(event.globalPosition())
-            self.last_mouse_pos = self._mouse_vec(event)
+            p = event.globalPosition()
+            self.engine.press(p.x(), p.y())
+        self.wake()
 
 
     def mouseMoveEvent(self, event):
-        self.click_detector.move(event.globalPosition())
-
-        self.last_mouse_pos = self._mouse_vec(event)
+        self.catch_up()
+        p = event.globalPosition()
+        self.engine.move(p.x(), p.y())
+        self.wake()
 
 
     def mouseReleaseEvent(self, event):
-        self.click_detector.release()
-        if self.mover.movement_type == MovementType.DRAG:
-            self.mover.end_drag()      
+        self.catch_up()
+        self.engine.release()
+        self.wake()
 
     def focusOutEvent(self, event):
-        self.mover.end_drag()  
+        self.catch_up()
+        self.engine.cancel_drag()
+        self.wake()
+
+    def enterEvent(self, event):
+        if self.throttle.mode != ThrottleMode.FULL:
+            self.resume()
 
     def leaveEvent(self, event):
-        self.mover.end_drag()  
+        self.catch_up()
+        self.engine.cancel_drag()
+        self.wake()
 
     # def moveEvent(self, e):
     #     print("Move:", self.pos())
@@ -333,30 +465,30 @@ class Pet(QWidget): # main logic
     #     print("Resize:", self.size())
 
     def paintEvent(self, e): #draws the frame reveived from Animator 
+        frame = self.engine.animator.frame()
+        if not frame:
+            return
+
+        prof = self.engine.profiler
+        if prof:
+            start = prof.start()
+
         p = QPainter(self)
-        p.setRenderHint(QPainter.SmoothPixmapTransform, True) # pyright: ignore[reportAttributeAccessIssue]
 
         # p.fillRect(self.rect(), QColor(80, 80, 80))  # dark gray
 
-        frame = self.animator.frame()
-        if not frame:
-            return
+        self.window_geometry.count_paint(self.width(), self.height())
 
-        # draw sprite so its bottom-middle is at (self.x, self.y)
-        anchor_x = self.width() / 2
-        anchor_y = self.height()
+        # draw sprite so its bottom-middle is at (self.x, self.y), the window rect is relative to that anchor
+        left, top, _, _ = self.window_geometry.rect  # type: ignore
+        anchor_x = -left
+        anchor_y = -top
 
-        offset_x = frame.width() / 2
-        offset_y = frame.height()
+        offset_x = frame.width / 2
+        offset_y = frame.height
 
         p.save()
 
-        sx = self.scale
-        if self.facing == Facing.LEFT:
-            sx *= -1
-
-        # p.scale(sx, self.scale)
-
         p.translate(anchor_x, anchor_y)
 
         # draws pets hitbox, pretty neat
@@ -371,24 +503,28 @@ class Pet(QWidget): # main logic
         # p.drawLine(self.width(), 0, 0, self.height())
         # p.drawLine(offset_x, offset_y, anchor_x, anchor_y)
 
-        if self.rotation_angle != 0:
-            cx, cy = self.drag_offset
-            # // translate point back to origin:
-            p.translate(cx, cy)
-            # // rotate
-            p.rotate(self.rotation_angle)
-            # // translate point back:
-            p.translate(-cx, -cy)
-
-        p.scale(sx, self.scale)
-        p.drawPixmap(-offset_x, -offset_y, frame)
+        if self.display_angle != 0 or self.engine.facing == Facing.LEFT:
+            # mirrored / rotated frames come pre-rendered from the sprite cache, rotation snapped to rotation_step
+            pix, offset = self.sprite_cache.get(
+                self.engine.animator.name, self.engine.animator.index, frame, self.engine.facing,
+                self.display_angle, self.engine.drag_offset, self.frame_store.dpr, anchor_x, anchor_y,
+                len(self.engine.animator.frames)
+            )
+            p.drawPixmap(offset, pix)
+        else:
+            frame.draw(p, -offset_x, -offset_y)
 
         p.restore()
+        p.end()
+
+        if prof:
+            prof.lap("paint", start)
 
 
 if __name__ == "__main__": # QT stuff, idk idc
     app = QApplication(sys.argv)
     pet = Pet()
+    app.aboutToQuit.connect(pet.on_quit)
     # pet.move(300, 900)
     pet.show()
     sys.exit(app.exec())
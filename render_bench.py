@@ -0,0 +1,203 @@
+# render_bench.py
+# Full stack benchmark: the real Pet window on Qt's offscreen platform, going through a scripted scenario
+# (idle, click -> ROLL, drag and swing it, let go -> fall and stand up). Measures paintEvent and update_logic per call and
+# repaints per second, per state, so scaling / rotation / window size changes can be compared in numbers.
+# bench.py covers the engine alone, this is what it costs to draw it.
+#   python render_bench.py [--json] [--display-fps N] [--scheduler fixed|deadline]
+
+import os, sys, time, json, math, argparse
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")  # no real window, but QPainter does the same work
+
+from PySide6.QtWidgets import QApplication
+from PySide6.QtCore import QTimer
+
+import pet as petmod
+from engine.presence import FakePresence
+
+SCENARIO_STEP_MS = 10  # how often the script checks what to do next
+
+
+class Stats:  # per state: wall seconds spent, update_logic and paintEvent durations
+    def __init__(self):
+        self.seconds = 0.0
+        self.logic_ns = []
+        self.paint_ns = []
+        self.paint_area = 0
+
+
+def percentile(values, q):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * q))]
+
+
+class BenchPet(petmod.Pet):  # Pet with a stopwatch around logic and painting
+    def __init__(self):
+        self.stats = {}
+        self.key = None
+        self.key_since = time.perf_counter()
+        super().__init__(presence=FakePresence())  # always ACTIVE, nothing gets throttled
+
+    def state_key(self):  # "FALLING > standing_up" while a transition animation plays in a state
+        engine = self.engine
+        anim = engine.animator.name
+        state = engine.state_name
+        if state and anim != engine.states[state]["animation"]:
+            return f"{state} > {anim}"
+        return state
+
+    def current(self):  # Stats of the state right now, closes the time spent in the previous one
+        key = self.state_key()
+        now = time.perf_counter()
+        if key != self.key:
+            if self.key is not None:
+                self.stats[self.key].seconds += now - self.key_since
+            self.key, self.key_since = key, now
+        if key not in self.stats:
+            self.stats[key] = Stats()
+        return self.stats[key]
+
+    def finish(self):
+        if self.key is not None:
+            self.stats[self.key].seconds += time.perf_counter() - self.key_since
+            self.key_since = time.perf_counter()
+
+    def update_logic(self):
+        start = time.perf_counter_ns()
+        super().update_logic()
+        ns = time.perf_counter_ns() - start
+        if hasattr(self, "engine"):
+            self.current().logic_ns.append(ns)
+
+    def paintEvent(self, e):
+        start = time.perf_counter_ns()
+        super().paintEvent(e)
+        ns = time.perf_counter_ns() - start
+        if hasattr(self, "engine"):
+            stats = self.current()
+            stats.paint_ns.append(ns)
+            stats.paint_area += self.width() * self.height()
+
+
+class Scenario:  # (seconds, name, start function) phases, run one after another
+    def __init__(self, pet, app):
+        self.pet = pet
+        self.app = app
+        self.phases = [
+            (3.0, "idle", None),
+            (3.5, "click", self.click),
+            (3.0, "drag", self.grab),
+            (4.0, "fall", self.let_go),
+        ]
+        self.phase = -1
+        self.phase_start = 0.0
+        self.timer = QTimer()
+        self.timer.timeout.connect(self.step)
+
+    def start(self):
+        self.phase_start = time.perf_counter()
+        self.next_phase()
+        self.timer.start(SCENARIO_STEP_MS)
+
+    def input(self, fn, *args):  # the same catch up / wake up the mouse handlers do
+        self.pet.catch_up()
+        fn(*args)
+        self.pet.wake()
+
+    def pet_center(self):
+        engine = self.pet.engine
+        return engine.anchor.x, engine.anchor.y - engine.hitbox_height / 2
+
+    def click(self):
+        engine = self.pet.engine
+        engine.variables.set("worrying_meter", 0)  # would make the click go to VERY_WORRIED instead of ROLL
+        self.input(engine.press, *self.pet_center())
+        QTimer.singleShot(30, lambda: self.input(engine.release))
+
+    def grab(self):
+        world = self.pet.engine.world
+        self.swing_x = world.left + world.width / 2  # pulled to the middle of the screen, dragging past an edge lets go
+        self.swing_y = world.bottom - 300  # and off the taskbar
+        self.input(self.pet.engine.press, *self.pet_center())
+
+    def let_go(self):
+        self.input(self.pet.engine.release)
+
+    def next_phase(self):
+        self.phase += 1
+        if self.phase >= len(self.phases):
+            self.timer.stop()
+            self.pet.finish()
+            self.app.quit()
+            return
+        _, _, start = self.phases[self.phase]
+        if start:
+            start()
+
+    def step(self):
+        now = time.perf_counter()
+        duration, name, _ = self.phases[self.phase]
+
+        if name == "drag":  # swing the pet left and right
+            t = now - self.phase_start
+            if t > 0.2:  # held long enough to count as a drag
+                x = self.swing_x + 250 * math.sin(t * 2 * math.pi * 0.8)
+                self.input(self.pet.engine.move, x, self.swing_y)
+
+        if now - self.phase_start >= duration:
+            self.phase_start = now
+            self.next_phase()
+
+
+def table(stats):
+    rows = []
+    for key, s in stats.items():
+        paints = len(s.paint_ns)
+        rows.append({
+            "state": key,
+            "seconds": round(s.seconds, 2),
+            "logic_ticks": len(s.logic_ns),
+            "logic_us_mean": round(sum(s.logic_ns) / len(s.logic_ns) / 1000, 1) if s.logic_ns else 0.0,
+            "logic_us_p95": round(percentile(s.logic_ns, 0.95) / 1000, 1),
+            "paints": paints,
+            "paints_per_s": round(paints / s.seconds, 1) if s.seconds > 0 else 0.0,
+            "paint_us_mean": round(sum(s.paint_ns) / paints / 1000, 1) if paints else 0.0,
+            "paint_us_p95": round(percentile(s.paint_ns, 0.95) / 1000, 1),
+            "window_px": round(s.paint_area / paints) if paints else 0,
+        })
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="offscreen paintEvent / update_logic benchmark")
+    parser.add_argument("--json", action="store_true", help="print json instead of a table")
+    parser.add_argument("--display-fps", type=int, default=petmod.DISPLAY_FPS)
+    parser.add_argument("--scheduler", choices=["deadline", "fixed"], default=petmod.SCHEDULER)
+    args = parser.parse_args()
+
+    petmod.DISPLAY_FPS = args.display_fps
+    petmod.SCHEDULER = args.scheduler
+
+    app = QApplication(sys.argv)
+    pet = BenchPet()
+    pet.show()
+    scenario = Scenario(pet, app)
+    scenario.start()
+    app.exec()
+
+    rows = table(pet.stats)
+    if args.json:
+        print(json.dumps({"platform": app.platformName(), "display_fps": args.display_fps, "scheduler": args.scheduler, "states": rows}, indent=2))
+        return
+
+    print(f"{'state':<26} {'s':>6} {'ticks':>6} {'logic us':>9} {'p95':>7} {'paints':>7} {'/s':>6} {'paint us':>9} {'p95':>7} {'window px':>10}")
+    for r in rows:
+        print(f"{r['state']:<26} {r['seconds']:>6.2f} {r['logic_ticks']:>6} {r['logic_us_mean']:>9.1f} {r['logic_us_p95']:>7.1f} "
+              f"{r['paints']:>7} {r['paints_per_s']:>6.1f} {r['paint_us_mean']:>9.1f} {r['paint_us_p95']:>7.1f} {r['window_px']:>10}")
+    print(f"[RENDER BENCH] {app.platformName()} platform, display {args.display_fps} fps, {args.scheduler} scheduler")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+# soak.py
+# Runs the pet simulation headless (no Qt, no window) as fast as it goes: random clicks and drags on the pet,
+# prints ticks per second and how often every state was entered. Catches states nothing ever leaves, exceptions deep in
+# some rare transition chain, positions escaping the screen...
+#   python soak.py [simulated seconds] [seed]
+
+import sys, random, time
+from collections import Counter
+
+from data.render_config import RENDER_CONFIG
+
+from engine.pet_engine import headless_engine
+from engine import trace
+
+LOGIC_FPS = RENDER_CONFIG.get("logic_FPS", 60)
+
+
+def poke(engine):  # random input, returns the ticks until the next one and what to do then
+    x, y = engine.anchor.x, engine.anchor.y - engine.hitbox_height / 2  # middle of the pet
+    roll = random.random()
+    if roll < 0.5:  # click, sometimes several in a row
+        engine.press(x, y)
+        engine.release()
+        return random.randint(2, 30)
+    if roll < 0.7:  # drag it somewhere
+        engine.press(x, y)
+        return 0
+    return random.randint(60, 600)  # leave it alone for a while
+
+
+def main():
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 600
+    seed = int(sys.argv[2]) if len(sys.argv) > 2 else 1
+
+    trace.install_crash_dump()  # the last events before an exception end up in cache/trace.json
+    random.seed(seed)
+    engine = headless_engine()
+    world = engine.world
+    dt = 1 / LOGIC_FPS
+    total = int(seconds * LOGIC_FPS)
+
+    entered = Counter()
+    last_state = None
+    next_poke = 0
+    drag_ticks = 0
+    escaped = 0
+
+    start = time.perf_counter()
+    for tick in range(total):
+        if drag_ticks > 0:  # moving the held mouse around
+            drag_ticks -= 1
+            engine.move(random.uniform(world.left, world.right), random.uniform(world.top, world.bottom))
+            if drag_ticks == 0:
+                engine.release()
+        elif tick >= next_poke:
+            wait = poke(engine)
+            if wait == 0:
+                drag_ticks = random.randint(10, 120)
+            next_poke = tick + max(wait, drag_ticks)
+
+        engine.update(dt)
+
+        state = engine.state_name
+        if state != last_state:
+            entered[state] += 1
+            last_state = state
+
+        if not (world.left - 1 <= engine.anchor.x <= world.right + 1 and engine.anchor.y <= world.bottom + 2):
+            escaped += 1
+    elapsed = time.perf_counter() - start
+
+    print(f"[SOAK] {total} ticks ({seconds:.0f} simulated s) in {elapsed:.2f} s, {total / elapsed:.0f} ticks/s "
+          f"({total / elapsed / LOGIC_FPS:.0f}x real time), seed {seed}")
+    print(f"[SOAK] {escaped} ticks with the pet outside {world}")
+    for state, count in entered.most_common():
+        print(f"  {state:<20} {count}")
+    if engine.profiler:  # PET_PROFILE=1
+        print(f"[PROFILE] {engine.profiler.summary_line()}, written to {engine.profiler.dump()}")
+
+
+if __name__ == "__main__":
+    main()
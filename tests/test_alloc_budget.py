@@ -0,0 +1,41 @@
+# tests/test_alloc_budget.py
+# alloc_budget.py as a test: every state held on a headless engine stays within its per tick and kept block budgets.
+#   python -m pytest tests        or        python -m unittest discover -s tests -t .
+
+import unittest
+
+import alloc_budget
+from data.states import STATES
+
+
+class AllocBudgetTest(unittest.TestCase):
+    def test_steady_ticks_within_budget(self):
+        for state in STATES:
+            with self.subTest(state=state):
+                result = alloc_budget.measure(state, alloc_budget.TICKS, seed=1)
+                self.assertEqual(alloc_budget.over_budget(state, result), [])
+
+    def test_catches_a_leak(self):  # one block kept per tick has to show up, or the budgets dont check anything
+        make_engine = alloc_budget.headless_engine
+        leaked = []
+
+        def leaky_engine():
+            engine = make_engine()
+            update = engine.update
+
+            def leaking(dt):
+                update(dt)
+                leaked.append([dt])
+            engine.update = leaking
+            return engine
+
+        alloc_budget.headless_engine = leaky_engine
+        try:
+            result = alloc_budget.measure("IDLE", 1000, seed=1)
+        finally:
+            alloc_budget.headless_engine = make_engine
+        self.assertNotEqual(alloc_budget.over_budget("IDLE", result), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,35 @@
+# tests/test_frame_store.py
+# FrameStore (engine/frame_store.py) over its memory budget: loading an animation may evict others, never itself.
+#   python -m pytest tests        or        python -m unittest discover -s tests -t .
+
+import os, unittest
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")  # pixmaps need a QApplication, no window needs to show up
+
+from PySide6.QtWidgets import QApplication
+
+from data.animations import ANIMATIONS
+from engine.frame_store import FrameStore
+
+app = QApplication.instance() or QApplication([])
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class FrameStoreBudgetTest(unittest.TestCase):
+    def test_loading_over_budget_keeps_the_loaded_animation(self):
+        store = FrameStore(BASE_DIR, ANIMATIONS)
+        store.set_scale(0.2)
+        store.budget = 1  # every animation alone is over it
+
+        for name in ANIMATIONS:
+            with self.subTest(animation=name):
+                self.assertTrue(store.get(name))
+                self.assertIn(name, store.sizes)
+                store.evict(name)
+                self.assertTrue(store.get_bounds(name))
+        self.assertGreater(store.evictions, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,99 @@
+# tests/test_scheduler.py
+# The deadline scheduler (engine/scheduler.py) has to simulate exactly what fixed ticking does, just with fewer wakeups.
+# Both run the real Pet on a fake clock with the same seed and the per step state / anchor / frame sequences are compared.
+
+import random, unittest
+
+from engine.presence import FakePresence
+from tests.test_throttle import FakeClock, FakeTimer
+
+import pet as petmod
+
+SECONDS = 120
+
+
+def run(scheduler, seconds=SECONDS):  # [(animation, frame index, x, y), ...] one per logic step, and the number of wakeups
+    random.seed(1234)
+    saved = petmod.SCHEDULER
+    petmod.SCHEDULER = scheduler
+    try:
+        p = petmod.Pet(presence=FakePresence())
+    finally:
+        petmod.SCHEDULER = saved
+
+    clock = FakeClock()
+    p.logic_clock.clock = clock
+    p.logic_clock.start = p.logic_clock.last = clock.now
+    p.logic_clock.accumulator = 0.0
+    p.throttle.clock = clock
+    p.throttle.mode_since = clock.now
+    p.cursor_near = lambda: False
+    p.engine.variables.set("sitting_still_timer", 90)  # so var only transitions happen inside the run too
+
+    steps = []
+    update_logic = p.update_logic
+
+    def recorded():
+        update_logic()
+        engine = p.engine
+        steps.append((engine.state_name, engine.animator.name, engine.animator.index, round(engine.anchor.x, 6), round(engine.anchor.y, 6)))
+    p.update_logic = recorded
+
+    jitter = random.Random(7)  # timers never fire exactly on time
+    end = clock.now + seconds
+    wakeups = 0
+    try:
+        if scheduler == "fixed":
+            p.timer.stop()
+            p.display_timer.stop()
+            while clock.now < end:
+                clock.now += 1 / petmod.LOGIC_FPS + jitter.uniform(-0.002, 0.004)
+                p.on_logic_timer()
+                wakeups += 1
+        else:
+            p.scheduler.started = clock.now  # type: ignore
+            p.wake_timer = FakeTimer()
+            while clock.now < end:
+                p.on_wake()
+                wakeups += 1
+                clock.now += p.wake_timer.ms / 1000 + jitter.uniform(0, 0.002)
+    finally:
+        p.gc_policy.uninstall()
+    return steps, wakeups
+
+
+class DeadlineSchedulerTest(unittest.TestCase):
+    def test_same_simulation_as_fixed_ticking(self):
+        fixed, fixed_wakeups = run("fixed")
+        deadline, deadline_wakeups = run("deadline")
+
+        n = min(len(fixed), len(deadline))
+        self.assertGreater(n, (SECONDS - 1) * petmod.LOGIC_FPS)  # the deadline run stops up to one sleep short
+        first_diff = next((i for i in range(n) if fixed[i] != deadline[i]), None)
+        self.assertIsNone(first_diff, f"step {first_diff}: {fixed[first_diff or 0]} vs {deadline[first_diff or 0]}")
+        self.assertGreater(len({s[0] for s in fixed}), 1)  # it went through some states, not just idling
+        self.assertLess(deadline_wakeups, fixed_wakeups / 2)
+
+    def test_wake_timer_rearmed_after_an_exception(self):
+        saved = petmod.SCHEDULER
+        petmod.SCHEDULER = "deadline"
+        try:
+            p = petmod.Pet(presence=FakePresence())
+        finally:
+            petmod.SCHEDULER = saved
+        p.wake_timer = FakeTimer()
+        p.wake_timer.ms = None
+
+        def broken():
+            raise RuntimeError("tick failed")
+        p.on_logic_timer = broken
+        try:
+            with self.assertRaises(RuntimeError):
+                p.on_wake()
+            self.assertIsNotNone(p.wake_timer.ms)  # still scheduled, the pet doesnt freeze
+        finally:
+            p.gc_policy.uninstall()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,186 @@
+# tests/test_throttle.py
+# Throttling (engine/throttle.py) driven by FakePresence and a fake clock: mode changes, timers like sleep_timer still
+# counting the time while the pet runs slow or frozen, and a cursor near a throttled pet waking it.
+#   python -m pytest tests        or        python -m unittest discover -s tests -t .
+
+import os, random, unittest
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")  # no window needs to show up
+
+from PySide6.QtWidgets import QApplication
+
+from engine.enums import Presence, ThrottleMode
+from engine.presence import FakePresence
+from engine.throttle import Throttle
+
+app = QApplication.instance() or QApplication([])
+
+import pet as petmod
+
+
+class FakeClock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+class FakeTimer:  # stands in for the wake timer, remembers what it was armed for
+    def __init__(self):
+        self.ms = 0
+
+    def start(self, ms):
+        self.ms = ms
+
+
+class ThrottleTest(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.presence = FakePresence()
+        self.throttle = Throttle(self.presence, away="LOW", hidden="FROZEN", low_fps=4, poll_interval=0.5, clock=self.clock)
+
+    def later(self, seconds):
+        self.clock.now += seconds
+        return self.throttle.update()
+
+    def test_modes_follow_presence(self):
+        self.assertEqual(self.throttle.update(), ThrottleMode.FULL)
+
+        self.presence.set(Presence.AWAY)
+        self.assertEqual(self.later(0.5), ThrottleMode.LOW)
+        self.assertEqual(self.throttle.min_sleep(), 0.25)
+
+        self.presence.set(Presence.HIDDEN)
+        self.assertEqual(self.later(0.5), ThrottleMode.FROZEN)
+        self.assertEqual(self.throttle.min_sleep(), 0.5)
+
+        self.presence.set(Presence.ACTIVE)
+        self.assertEqual(self.later(0.5), ThrottleMode.FULL)
+        self.assertEqual(self.throttle.min_sleep(), 0.0)
+        self.assertEqual(self.throttle.changes, 3)
+
+    def test_presence_only_polled_every_interval(self):
+        self.throttle.update()
+        self.presence.set(Presence.HIDDEN)
+        self.assertEqual(self.later(0.2), ThrottleMode.FULL)  # not asked yet
+        self.assertEqual(self.presence.polls, 1)
+        self.assertEqual(self.later(0.3), ThrottleMode.FROZEN)
+        self.assertEqual(self.presence.polls, 2)
+
+    def test_cursor_near_means_full(self):
+        self.presence.set(Presence.AWAY)
+        self.throttle.update()
+        self.assertEqual(self.throttle.mode, ThrottleMode.LOW)
+        self.clock.now += 0.1  # between polls, the cursor doesnt wait for one
+        self.assertEqual(self.throttle.update(cursor_near=True), ThrottleMode.FULL)
+
+    def test_time_in_modes(self):
+        self.throttle.update()
+        self.presence.set(Presence.AWAY)
+        self.later(2)  # 2 s FULL
+        self.presence.set(Presence.HIDDEN)
+        self.later(3)  # 3 s LOW
+        self.clock.now += 4  # 4 s FROZEN so far
+        self.assertEqual(self.throttle.stats()["seconds_in"], {"FULL": 2.0, "LOW": 3.0, "FROZEN": 4.0})
+
+
+class PetThrottleTest(unittest.TestCase):  # the real Pet on the deadline scheduler, woken by hand on a fake clock
+    def setUp(self):
+        random.seed(1234)
+        self.saved_scheduler = petmod.SCHEDULER
+        petmod.SCHEDULER = "deadline"
+        self.clock = FakeClock()
+        self.presence = FakePresence()
+        self.near = False
+
+        p = self.pet = petmod.Pet(presence=self.presence)
+        p.logic_clock.clock = self.clock
+        p.logic_clock.start = p.logic_clock.last = self.clock.now
+        p.logic_clock.accumulator = 0.0
+        p.scheduler.started = self.clock.now  # type: ignore
+        p.throttle.clock = self.clock
+        p.throttle.mode_since = self.clock.now
+        p.throttle.last_poll = None
+        p.wake_timer = FakeTimer()
+        p.cursor_near = lambda: self.near
+
+        self.steps = 0
+        update_logic = p.update_logic
+
+        def counted():
+            self.steps += 1
+            update_logic()
+        p.update_logic = counted
+
+    def tearDown(self):
+        self.pet.gc_policy.uninstall()
+        petmod.SCHEDULER = self.saved_scheduler
+
+    def run_for(self, seconds):  # wakes up whenever the pet asked to, the last wake up at or after seconds. returns how many
+        end = self.clock.now + seconds
+        wakeups = 0
+        while self.clock.now < end:
+            self.clock.now += self.pet.wake_timer.ms / 1000
+            self.pet.on_wake()
+            wakeups += 1
+        return wakeups
+
+    def timers(self):
+        values = self.pet.engine.variables.values
+        return values["sleep_timer"], values["sitting_still_timer"]
+
+    def assert_timers_advanced(self, before, seconds):  # by the wall time that passed, give or take the step that hasnt run yet
+        for old, new in zip(before, self.timers()):
+            self.assertAlmostEqual(new - old, seconds, delta=1.01 / petmod.LOGIC_FPS)
+
+    def test_timers_count_while_frozen(self):
+        self.presence.set(Presence.HIDDEN)
+        self.pet.on_wake()
+        self.assertEqual(self.pet.throttle.mode, ThrottleMode.FROZEN)
+
+        before, start, steps = self.timers(), self.clock.now, self.steps
+        wakeups = self.run_for(120)
+        self.assertEqual(self.steps, steps)  # no logic ran
+        self.assertLessEqual(wakeups, 120 / self.pet.throttle.poll_interval + 2)
+        self.assert_timers_advanced(before, self.clock.now - start)
+
+    def test_timers_count_while_low(self):
+        self.presence.set(Presence.AWAY)
+        self.pet.on_wake()
+        self.assertEqual(self.pet.throttle.mode, ThrottleMode.LOW)
+
+        before, start, steps = self.timers(), self.clock.now, self.steps
+        wakeups = self.run_for(120)
+        self.assertLessEqual(wakeups, 120 * self.pet.throttle.low_fps + 2)
+        self.assertAlmostEqual(self.steps - steps, 120 * petmod.LOGIC_FPS, delta=petmod.LOGIC_FPS)  # every step still ran
+        self.assert_timers_advanced(before, self.clock.now - start)
+
+    def test_timers_count_across_mode_changes(self):
+        before, start = self.timers(), self.clock.now
+        for presence in (Presence.ACTIVE, Presence.AWAY, Presence.HIDDEN, Presence.AWAY, Presence.ACTIVE):
+            self.presence.set(presence)
+            self.run_for(30)
+        self.assertEqual(self.pet.throttle.mode, ThrottleMode.FULL)
+        self.assert_timers_advanced(before, self.clock.now - start)
+
+    def test_cursor_near_wakes_at_the_next_slow_wake_up(self):  # no polling of its own in between
+        self.presence.set(Presence.AWAY)
+        self.run_for(2)
+        self.assertEqual(self.pet.throttle.mode, ThrottleMode.LOW)
+        self.assertLessEqual(self.pet.wake_timer.ms, 1000 / self.pet.throttle.low_fps)
+
+        self.near = True
+        self.run_for(self.pet.wake_timer.ms / 1000)
+        self.assertEqual(self.pet.throttle.mode, ThrottleMode.FULL)
+
+    def test_entering_the_window_wakes(self):
+        self.presence.set(Presence.AWAY)
+        self.run_for(2)
+        self.pet.wake_timer.ms = 250
+        self.pet.enterEvent(None)
+        self.assertEqual(self.pet.wake_timer.ms, 0)  # woken now, not at the next low fps wake up
+
+
+if __name__ == "__main__":
+    unittest.main()